@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 
+from core.pagination import EstimatedCountPaginator
+
 from .models import (
     User, EmailVerificationToken, UserPreferences, SecuritySettings,
     UserSession, LoginHistory, ProfileAuditLog
@@ -139,7 +141,7 @@ class SecuritySettingsAdmin(admin.ModelAdmin):
     list_filter = ['two_factor_enabled', 'two_factor_method']
     search_fields = ['user__email']
     raw_id_fields = ['user']
-    readonly_fields = ['api_token_created_at', 'api_token_last_used', 'password_changed_at', 'created_at', 'updated_at']
+    readonly_fields = ['api_token_prefix', 'api_token_created_at', 'api_token_last_used', 'password_changed_at', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Usuario', {
@@ -149,7 +151,7 @@ class SecuritySettingsAdmin(admin.ModelAdmin):
             'fields': ('two_factor_enabled', 'two_factor_method', 'two_factor_secret')
         }),
         ('API Token', {
-            'fields': ('api_token', 'api_token_created_at', 'api_token_last_used'),
+            'fields': ('api_token_prefix', 'api_token_created_at', 'api_token_last_used'),
             'classes': ('collapse',)
         }),
         ('Sesiones', {
@@ -202,6 +204,9 @@ class LoginHistoryAdmin(admin.ModelAdmin):
     raw_id_fields = ['user']
     readonly_fields = ['created_at']
     ordering = ['-created_at']
+    list_select_related = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Usuario', {
@@ -230,6 +235,9 @@ class ProfileAuditLogAdmin(admin.ModelAdmin):
     raw_id_fields = ['user']
     readonly_fields = ['created_at']
     ordering = ['-created_at']
+    list_select_related = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Usuario', {
@@ -0,0 +1,226 @@
+"""
+Tokens de API (``SecuritySettings``): solo se guarda el hash.
+
+- ``issue_token`` genera un token aleatorio, guarda su SHA-256 y un prefijo
+  para identificarlo en pantalla, y devuelve el texto en claro una única vez.
+  Al ser 32 bytes aleatorios basta un hash rápido: no hay diccionario que
+  probar, así que no hace falta un KDF lento como con las contraseñas.
+- ``verify_token`` consulta primero una LRU en memoria (por proceso, acotada
+  a ``API_TOKEN_CACHE_SIZE`` entradas y ``API_TOKEN_CACHE_SECONDS`` de vida),
+  de modo que las llamadas repetidas de un ERP no tocan la base de datos.
+- ``revoke_token`` y cualquier guardado de ``SecuritySettings`` o del usuario
+  (señales en ``accounts.signals``) invalidan la caché del proceso. Los demás
+  workers dejan de aceptar el token como tarde al caducar su entrada.
+- El uso (``api_token_last_used``) se acumula en memoria y se vuelca con un
+  único UPDATE (cada token con su propia marca) al terminar la primera
+  petición tras ``API_TOKEN_TOUCH_SECONDS`` (señal ``request_finished``) y al
+  salir el proceso.
+"""
+import atexit
+import copy
+import hashlib
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PREFIX_LENGTH = 8
+
+CACHE_LOOKUPS = metrics.counter(
+    'fenix_api_token_cache_total', 'Verificaciones de token de API por resultado de la caché', ['result'],
+)
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Emisión y revocación
+# ----------------------------------------------------------------------
+
+def issue_token(security) -> str:
+    """Sustituye el token de ``security`` y devuelve el nuevo en claro."""
+    token = secrets.token_urlsafe(32)
+    if security.api_token_hash:
+        _cache.discard(security.api_token_hash)
+    security.api_token_hash = hash_token(token)
+    security.api_token_prefix = token[:TOKEN_PREFIX_LENGTH]
+    security.api_token_created_at = timezone.now()
+    security.api_token_last_used = None
+    security.save()
+    return token
+
+
+def revoke_token(security) -> bool:
+    if not security.api_token_hash:
+        return False
+    _cache.discard(security.api_token_hash)
+    security.api_token_hash = None
+    security.api_token_prefix = ''
+    security.api_token_created_at = None
+    security.api_token_last_used = None
+    security.save()
+    return True
+
+
+# ----------------------------------------------------------------------
+# Verificación con caché LRU
+# ----------------------------------------------------------------------
+
+@dataclass
+class _Entry:
+    security_id: int
+    user: object
+    expires: float
+
+
+class TokenCache:
+    """LRU acotada y con caducidad: ``hash -> (security_id, usuario)``."""
+
+    def __init__(self):
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token_hash: str):
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None:
+                return None
+            if entry.expires < time.monotonic():
+                del self._entries[token_hash]
+                return None
+            self._entries.move_to_end(token_hash)
+            return entry
+
+    def set(self, token_hash: str, security_id: int, user) -> _Entry:
+        entry = _Entry(security_id, user, time.monotonic() + settings.API_TOKEN_CACHE_SECONDS)
+        with self._lock:
+            self._entries[token_hash] = entry
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > settings.API_TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+        return entry
+
+    def discard(self, token_hash: str) -> None:
+        with self._lock:
+            self._entries.pop(token_hash, None)
+
+    def discard_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.user.pk == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = TokenCache()
+
+
+def _is_allowed(user) -> bool:
+    from .models import User
+
+    return user.is_active and user.email_verified and user.status == User.STATUS_ACTIVE
+
+
+def verify_token(token: str):
+    """Usuario dueño de ``token`` si puede usar la API; ``None`` si no."""
+    from .models import SecuritySettings
+
+    if not token:
+        return None
+    token_hash = hash_token(token)
+    entry = _cache.get(token_hash)
+    if entry is not None:
+        CACHE_LOOKUPS.inc(result='hit')
+    else:
+        CACHE_LOOKUPS.inc(result='miss')
+        security = (
+            SecuritySettings.objects.select_related('user')
+            .filter(api_token_hash=token_hash).first()
+        )
+        if security is None or not _is_allowed(security.user):
+            return None
+        entry = _cache.set(token_hash, security.pk, security.user)
+    _usage.note(entry.security_id)
+    # Copia por petición: la instancia cacheada se comparte entre hilos
+    return copy.copy(entry.user)
+
+
+# ----------------------------------------------------------------------
+# api_token_last_used agrupado
+# ----------------------------------------------------------------------
+
+class UsageBuffer:
+    """Acumula ``security_id -> último uso`` y lo vuelca en un UPDATE por intervalo."""
+
+    def __init__(self):
+        self._pending: dict[int, object] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def note(self, security_id: int) -> None:
+        with self._lock:
+            self._pending[security_id] = timezone.now()
+
+    def flush_if_due(self) -> int:
+        with self._lock:
+            due = self._pending and time.monotonic() - self._last_flush >= settings.API_TOKEN_TOUCH_SECONDS
+        return self.flush() if due else 0
+
+    def flush(self) -> int:
+        from .models import SecuritySettings
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        return SecuritySettings.objects.filter(
+            pk__in=list(pending), api_token_hash__isnull=False,
+        ).update(api_token_last_used=Case(
+            *(When(pk=pk, then=Value(used)) for pk, used in pending.items()),
+            output_field=DateTimeField(),
+        ))
+
+
+_usage = UsageBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        _usage.flush()
+    except Exception:
+        logger.exception('Error volcando el uso de tokens de API al salir')
+
+
+def flush_usage() -> int:
+    return _usage.flush()
+
+
+def flush_usage_if_due() -> int:
+    return _usage.flush_if_due()
+
+
+def invalidate_user(user_id: int) -> None:
+    _cache.discard_user(user_id)
+
+
+def clear_cache() -> None:
+    _cache.clear()
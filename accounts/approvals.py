@@ -0,0 +1,152 @@
+"""
+Aprobación y rechazo de solicitudes de alta por lotes.
+
+``review_users`` procesa un conjunto de usuarios pendientes en una transacción:
+
+- bloquea las filas que siguen en PENDIENTE (``select_for_update``) y las
+  cambia con un único UPDATE (``status``, ``pending_approval``, ``is_active``,
+  ``approved_by``/``approved_at`` al aprobar),
+- registra un ``AuditLog`` por usuario con ``bulk_create``,
+- tras el commit envía los emails localizados en un hilo, reutilizando una
+  sola conexión SMTP para todo el lote. Un fallo del servidor de correo se
+  registra en el log y en ``fenix_emails_total`` pero no afecta al resultado.
+
+Devuelve el resultado por usuario (``ReviewResult.outcomes``) para que la
+vista informe de qué se aprobó, qué ya estaba procesado y qué no existe o no
+es visible para quien revisa.
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from django.core import mail
+from django.db import transaction
+from django.utils import timezone
+
+from core.audit import AuditLog
+from .models import User
+from .permissions import get_visible_users_queryset
+from .utils import build_user_approved_email, build_user_rejected_email
+
+logger = logging.getLogger(__name__)
+
+ACTION_APPROVE = 'approve'
+ACTION_REJECT = 'reject'
+
+OUTCOME_APPROVED = 'approved'
+OUTCOME_REJECTED = 'rejected'
+OUTCOME_ALREADY_PROCESSED = 'already_processed'
+OUTCOME_NOT_FOUND = 'not_found'
+
+MAX_BATCH = 500
+
+@dataclass
+class ReviewResult:
+    action: str
+    outcomes: dict[int, str] = field(default_factory=dict)  # user_id -> OUTCOME_*
+
+    def ids(self, outcome: str) -> list[int]:
+        return [pk for pk, value in self.outcomes.items() if value == outcome]
+
+    @property
+    def processed(self) -> list[int]:
+        return self.ids(OUTCOME_APPROVED if self.action == ACTION_APPROVE else OUTCOME_REJECTED)
+
+
+def review_users(reviewer, user_ids, action: str, request=None, login_url: str = '') -> ReviewResult:
+    """Aprueba o rechaza (``action``) los usuarios pendientes de ``user_ids``."""
+    if action not in (ACTION_APPROVE, ACTION_REJECT):
+        raise ValueError(f'Acción no válida: {action}')
+    user_ids = list(dict.fromkeys(int(pk) for pk in user_ids))[:MAX_BATCH]
+    result = ReviewResult(action=action)
+    if not user_ids:
+        return result
+
+    now = timezone.now()
+    visible = get_visible_users_queryset(reviewer, User.objects.filter(pk__in=user_ids))
+    with transaction.atomic():
+        statuses = dict(visible.select_for_update().order_by('pk').values_list('pk', 'status'))
+        pending = [pk for pk, status in statuses.items() if status == User.STATUS_PENDING]
+        if pending:
+            if action == ACTION_APPROVE:
+                changes = dict(
+                    status=User.STATUS_ACTIVE, pending_approval=False, is_active=True,
+                    email_verified=True, approved_by=reviewer, approved_at=now,
+                )
+            else:
+                changes = dict(status=User.STATUS_REJECTED, pending_approval=False, is_active=False)
+            User.objects.filter(pk__in=pending).update(updated_at=now, **changes)
+            _log_reviews(reviewer, pending, action, request)
+            transaction.on_commit(lambda: enqueue_review_emails(pending, action, login_url))
+
+    done = OUTCOME_APPROVED if action == ACTION_APPROVE else OUTCOME_REJECTED
+    for pk in user_ids:
+        if pk not in statuses:
+            result.outcomes[pk] = OUTCOME_NOT_FOUND
+        elif statuses[pk] == User.STATUS_PENDING:
+            result.outcomes[pk] = done
+        else:
+            result.outcomes[pk] = OUTCOME_ALREADY_PROCESSED
+    return result
+
+
+def _log_reviews(reviewer, user_ids, action: str, request) -> None:
+    emails = dict(User.objects.filter(pk__in=user_ids).values_list('pk', 'email'))
+    if action == ACTION_APPROVE:
+        audit_action, verb = AuditLog.ACTION_USER_APPROVED, 'aprobado'
+    else:
+        audit_action, verb = AuditLog.ACTION_USER_REJECTED, 'rechazado'
+    AuditLog.objects.bulk_create([
+        AuditLog.build(
+            reviewer, audit_action, f'Usuario {emails.get(pk, pk)} {verb} (lote de {len(user_ids)})',
+            object_type='User', object_id=pk, request=request,
+        )
+        for pk in user_ids
+    ])
+
+
+# ----------------------------------------------------------------------
+# Emails
+# ----------------------------------------------------------------------
+
+def enqueue_review_emails(user_ids, action: str, login_url: str = '') -> None:
+    """Envía los emails del lote en un hilo (no bloquea la petición)."""
+    threading.Thread(
+        target=_send_review_emails_safe,
+        args=(list(user_ids), action, login_url),
+        name=f'user-review-emails-{len(user_ids)}',
+        daemon=True,
+    ).start()
+
+
+def _send_review_emails_safe(user_ids, action: str, login_url: str) -> None:
+    try:
+        send_review_emails(user_ids, action, login_url)
+    except Exception:
+        logger.exception('Error enviando emails de revisión de usuarios')
+
+
+def send_review_emails(user_ids, action: str, login_url: str = '') -> dict[int, bool]:
+    """Envía un email por usuario con una sola conexión SMTP; devuelve {user_id: enviado}."""
+    # Fuera del arranque del worker (ver core.tests.LazyImportTests)
+    from notifications.services import EMAILS_TOTAL
+
+    event = 'user_approved' if action == ACTION_APPROVE else 'user_rejected'
+    users = User.objects.filter(pk__in=user_ids).order_by('pk')
+    sent = {}
+    with mail.get_connection() as connection:
+        for user in users:
+            if action == ACTION_APPROVE:
+                message = build_user_approved_email(user, login_url=login_url)
+            else:
+                message = build_user_rejected_email(user)
+            message.connection = connection
+            try:
+                message.send(fail_silently=False)
+                sent[user.pk] = True
+                EMAILS_TOTAL.inc(event=event, result='ok')
+            except Exception as exc:
+                sent[user.pk] = False
+                EMAILS_TOTAL.inc(event=event, result='error')
+                logger.warning('Error enviando email de %s a %s: %s', event, user.email, exc)
+    return sent
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     name = 'accounts'
     verbose_name = '6. Cuentas'
+
+    def ready(self):
+        import accounts.signals  # noqa: F401
@@ -2,14 +2,75 @@
 Middleware para controlar el acceso según el estado del usuario.
 Bloquea el acceso si el usuario tiene pending_approval=True (excepto para Super Admin/Manager).
 También establece el idioma del usuario según su preferencia.
+
+Para no repetir trabajo en cada petición:
+- Las rutas se comprueban con expresiones regulares compiladas al arrancar.
+  Estáticos, media y health checks (``SKIP_PREFIXES``) ni siquiera leen la sesión.
+- Los anónimos se detectan por la sesión, sin cargar ``request.user``.
+- El veredicto "aprobado" se guarda en la sesión (``APPROVAL_SESSION_KEY``)
+  junto al idioma, así que un usuario activo no cuesta ninguna consulta.
+  ``forget_approval`` lo borra de las sesiones del usuario cuando un admin
+  cambia su estado (señal ``post_save`` en ``accounts.signals``). Solo se
+  guarda el veredicto positivo: un usuario pendiente se evalúa siempre, así
+  que la aprobación (incluida la masiva con ``update()``) surte efecto al
+  momento. Con ``SESSION_BACKEND=signed_cookies`` no se guarda (no habría
+  forma de borrarlo de la cookie de otro navegador).
 """
-from django.shortcuts import redirect
+import re
+
+from django.conf import settings
 from django.contrib import messages
-from django.urls import reverse
+from django.contrib.auth import SESSION_KEY
+from django.shortcuts import redirect
 from django.utils import translation
 from django.utils.translation import gettext_lazy as _
 from .utils import get_user_language, is_manager_or_admin
 
+APPROVAL_SESSION_KEY = '_approved_user'
+LANGUAGE_SESSION_KEY = 'django_language'
+
+# Rutas que SIEMPRE están permitidas (no requieren aprobación)
+PUBLIC_PREFIXES = (
+    '/accounts/login/',
+    '/accounts/logout/',
+    '/accounts/register/',
+    '/accounts/verify-email/',
+    '/accounts/pending-approval/',
+    '/accounts/email-verification/',
+    '/admin/',
+)
+
+# Rutas que no pasan por el middleware: estáticos, media, health checks y métricas
+SKIP_PREFIXES = ('/_ah/', '/favicon.ico', '/robots.txt', '/metrics')
+
+
+def _prefix_matcher(prefixes):
+    return re.compile('|'.join(re.escape(p) for p in prefixes if p)).match
+
+
+def _url_prefix(url):
+    if not url or '://' in url:
+        return ''
+    return url if url.startswith('/') else f'/{url}'
+
+
+def forget_approval(user_id) -> int:
+    """Borra el veredicto cacheado de todas las sesiones registradas del usuario."""
+    from importlib import import_module
+    from accounts.models import UserSession
+
+    if not settings.SESSIONS_SERVER_SIDE:
+        return 0
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    keys = UserSession.objects.filter(user_id=user_id, is_active=True).values_list('session_key', flat=True)
+    forgotten = 0
+    for session_key in keys:
+        session = store(session_key)
+        if session.pop(APPROVAL_SESSION_KEY, None) is not None:
+            session.save(must_create=False)
+            forgotten += 1
+    return forgotten
+
 
 class UserApprovalMiddleware:
     """
@@ -22,55 +83,62 @@ class UserApprovalMiddleware:
     """
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_public = _prefix_matcher(PUBLIC_PREFIXES)
+        self.is_skipped = _prefix_matcher(
+            SKIP_PREFIXES + (_url_prefix(settings.STATIC_URL), _url_prefix(settings.MEDIA_URL))
+        )
 
     def __call__(self, request):
+        if self.is_skipped(request.path):
+            return self.get_response(request)
+
+        session = request.session
+        user_id = session.get(SESSION_KEY)
+        if user_id is None:
+            return self.get_response(request)
+        # Camino rápido: ya aprobado en esta sesión y con idioma fijado
+        if session.get(APPROVAL_SESSION_KEY) == user_id and LANGUAGE_SESSION_KEY in session:
+            return self.get_response(request)
+
+        user = request.user
+        if not user.is_authenticated:
+            return self.get_response(request)
+
         # El LocaleMiddleware ya maneja el idioma desde cookie/sesión
-        if request.user.is_authenticated and not request.session.get('django_language'):
-            lang = get_user_language(request.user)
+        if not session.get(LANGUAGE_SESSION_KEY):
+            lang = get_user_language(user)
             if lang and lang != 'es':
                 translation.activate(lang)
-                request.session['django_language'] = lang
-        
-        # Rutas que SIEMPRE están permitidas (no requieren aprobación)
-        public_paths = [
-            '/accounts/login/',
-            '/accounts/logout/',
-            '/accounts/register/',
-            '/accounts/verify-email/',
-            '/accounts/pending-approval/',
-            '/accounts/email-verification/',
-            '/admin/',
-        ]
-        
-        # Si el usuario está autenticado
-        if request.user.is_authenticated:
-            user = request.user
-            from accounts.models import User
-            
-            # GATE DE SEGURIDAD: Verificar que tenga email verificado Y status ACTIVE
-            needs_approval = (
-                not user.email_verified or 
-                user.status != User.STATUS_ACTIVE
+            session[LANGUAGE_SESSION_KEY] = lang or 'es'
+
+        from accounts.models import User
+
+        # GATE DE SEGURIDAD: Verificar que tenga email verificado Y status ACTIVE
+        needs_approval = (
+            not user.email_verified or 
+            user.status != User.STATUS_ACTIVE
+        )
+        if not needs_approval:
+            if settings.SESSIONS_SERVER_SIDE:  # con cookies firmadas no se podría invalidar
+                session[APPROVAL_SESSION_KEY] = user_id
+            return self.get_response(request)
+
+        # Admin/Super Admin solo pueden ver admin panel, nada más
+        is_admin = user.is_staff or user.role in ('admin', 'super_admin')
+
+        # Si es admin y está en /admin/, permitir
+        if is_admin and request.path.startswith('/admin/'):
+            return self.get_response(request)
+
+        # Si el path NO está en la lista de rutas públicas, bloquear
+        if not self.is_public(request.path):
+            messages.warning(
+                request,
+                _('Tu cuenta está pendiente de aprobación. Un administrador revisará tu solicitud.')
             )
-            
-            if needs_approval:
-                # Admin/Super Admin solo pueden ver admin panel, nada más
-                is_admin = user.is_staff or user.role in ('admin', 'super_admin')
-                
-                # Si es admin y está en /admin/, permitir
-                if is_admin and request.path.startswith('/admin/'):
-                    return self.get_response(request)
-                
-                # Si el path NO está en la lista de rutas públicas, bloquear
-                if not any(request.path.startswith(p) for p in public_paths):
-                    messages.warning(
-                        request,
-                        _('Tu cuenta está pendiente de aprobación. Un administrador revisará tu solicitud.')
-                    )
-                    return redirect('accounts:pending_approval')
-        
-        response = self.get_response(request)
-        return response
+            return redirect('accounts:pending_approval')
+
+        return self.get_response(request)
 
 
 class SessionTrackingMiddleware:
@@ -81,7 +149,8 @@ class SessionTrackingMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        if request.user.is_authenticated:
+        # Con cookies firmadas la clave de sesión cambia con cada escritura
+        if settings.SESSIONS_SERVER_SIDE and request.user.is_authenticated:
             from accounts.models import UserSession, LoginHistory
             from user_agents import parse
             from django.utils import timezone
@@ -0,0 +1,77 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:51
+
+import logging
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+logger = logging.getLogger(__name__)
+
+TRGM_INDEX = 'accounts_user_search_text_trgm'
+
+
+def normalize_search(*values):
+    """Copia congelada de ``core.search.normalize_search`` tal como estaba en esta migración."""
+    text = ' '.join(str(v) for v in values if v)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
+
+
+def fill_search_text(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    users = []
+    for user in User.objects.only('pk', 'email', 'full_name', 'company').iterator(chunk_size=2000):
+        user.search_text = normalize_search(user.email, user.full_name, user.company)
+        users.append(user)
+    User.objects.bulk_update(users, ['search_text'], batch_size=2000)
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    Índice GIN trigram para ``search_text LIKE '%...%'`` (solo PostgreSQL).
+    Si el usuario de la BD no puede crear la extensión pg_trgm, la búsqueda
+    sigue funcionando sin índice.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRGM_INDEX} '
+                'ON accounts_user USING gin (search_text gin_trgm_ops)'
+            )
+    except Exception as exc:
+        logger.warning('Índice trigram de usuarios no creado (%s)', exc)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TRGM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_alter_securitysettings_api_token'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=700),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['status', '-date_joined', '-id'], name='user_status_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['status', 'role'], name='user_status_role_idx'),
+        ),
+    ]
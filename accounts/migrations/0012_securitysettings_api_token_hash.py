@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:45
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    """Los tokens ya emitidos siguen funcionando: se guarda su hash y se borra el texto."""
+    SecuritySettings = apps.get_model('accounts', 'SecuritySettings')
+    rows = list(SecuritySettings.objects.exclude(api_token__isnull=True).exclude(api_token=''))
+    for security in rows:
+        security.api_token_hash = hashlib.sha256(security.api_token.encode()).hexdigest()
+        security.api_token_prefix = security.api_token[:8]
+    SecuritySettings.objects.bulk_update(rows, ['api_token_hash', 'api_token_prefix'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_user_search_text_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='securitysettings',
+            name='api_token_hash',
+            field=models.CharField(blank=True, default=None, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='securitysettings',
+            name='api_token_prefix',
+            field=models.CharField(blank=True, default='', max_length=8),
+        ),
+        # Sin vuelta atrás: el texto en claro no se puede recuperar del hash
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='securitysettings',
+            name='api_token',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_securitysettings_api_token_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginhistory',
+            index=models.Index(fields=['-created_at'], name='accounts_lo_created_f638c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profileauditlog',
+            index=models.Index(fields=['-created_at'], name='accounts_pr_created_a95f71_idx'),
+        ),
+    ]
@@ -1,11 +1,19 @@
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
 from django.db import models
+from django.db.models import Case, Value, When
+from django.db.models.functions import Length, Trim
+from django.db.models.lookups import GreaterThan
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from datetime import timedelta
+from functools import reduce
+from operator import and_
 import uuid
 
+from core.bulk import get_bulk_state
+from core.search import normalize_search
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email: str, password: str | None = None, **extra_fields):
@@ -27,8 +35,56 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault('status', User.STATUS_ACTIVE)
         return self.create_user(email, password, **extra_fields)
 
+    def refresh_profile_completed(self, user_ids=None) -> int:
+        """
+        Recalcula ``profile_completed`` en un único UPDATE, con la misma regla
+        que ``User.check_profile_completed`` (campo no vacío tras trim).
+        """
+        qs = self.get_queryset()
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            if not user_ids:
+                return 0
+            qs = qs.filter(pk__in=user_ids)
+        complete = reduce(and_, [
+            GreaterThan(Length(Trim(field)), 0)
+            for field in self.model.PROFILE_REQUIRED_FIELDS
+        ])
+        return qs.update(profile_completed=Case(
+            When(complete, then=Value(True)),
+            default=Value(False),
+        ))
+
+    def refresh_search_text(self, user_ids=None, batch_size: int = 2000) -> int:
+        """
+        Recalcula ``search_text`` (normalización en Python, sin equivalente
+        portable en SQL) y escribe solo las filas que cambian.
+        """
+        qs = self.get_queryset().order_by('pk')
+        if user_ids is not None:
+            qs = qs.filter(pk__in=list(user_ids))
+        changed = []
+        for user in qs.only('pk', *self.model.SEARCH_FIELDS, 'search_text').iterator(chunk_size=batch_size):
+            value = user.build_search_text()
+            if value != user.search_text:
+                user.search_text = value
+                changed.append(user)
+        self.bulk_update(changed, ['search_text'], batch_size=batch_size)
+        return len(changed)
+
 
 class User(AbstractBaseUser, PermissionsMixin):
+    # Campos obligatorios del perfil operativo (ver check_profile_completed)
+    PROFILE_REQUIRED_FIELDS = (
+        'telefono_reparto',
+        'direccion_local', 'ciudad', 'provincia', 'codigo_postal',
+        'tipo_entrega',
+        'direccion_entrega', 'ciudad_entrega', 'provincia_entrega', 'codigo_postal_entrega',
+    )
+
+    # Campos que alimentan search_text (búsqueda de la gestión de usuarios)
+    SEARCH_FIELDS = ('email', 'full_name', 'company')
+
     ROLE_SUPER_ADMIN = 'super_admin'
     ROLE_ADMIN = 'admin'
     ROLE_USER = 'user'
@@ -73,6 +129,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     # EMPRESA (legacy - mantener)
     company = models.CharField(max_length=200, blank=True, default='')
+
+    # email + nombre + empresa normalizados (core.search.normalize_search);
+    # se mantiene en save() y con UserManager.refresh_search_text
+    search_text = models.CharField(max_length=700, blank=True, default='', editable=False)
     
     # ============================================================================
     # PERFIL OPERATIVO - Campos obligatorios para realizar pedidos
@@ -245,6 +305,11 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = _('Usuario')
         verbose_name_plural = _('Usuarios')
         ordering = ['-date_joined']
+        indexes = [
+            # Listados de gestión: pestaña/estado ordenados por alta (paginación por cursor)
+            models.Index(fields=['status', '-date_joined', '-id'], name='user_status_joined_idx'),
+            models.Index(fields=['status', 'role'], name='user_status_role_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.email
@@ -309,18 +374,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         - tipo_entrega
         - direccion_entrega, ciudad_entrega, provincia_entrega, codigo_postal_entrega
         """
-        required_fields = [
-            self.telefono_reparto,
-            self.direccion_local,
-            self.ciudad,
-            self.provincia,
-            self.codigo_postal,
-            self.tipo_entrega,
-            self.direccion_entrega,
-            self.ciudad_entrega,
-            self.provincia_entrega,
-            self.codigo_postal_entrega,
-        ]
+        required_fields = [getattr(self, name) for name in self.PROFILE_REQUIRED_FIELDS]
         # Todos los campos deben tener contenido (no vacíos ni None)
         return all(field and str(field).strip() for field in required_fields)
     
@@ -365,14 +419,26 @@ class User(AbstractBaseUser, PermissionsMixin):
 
         return missing
     
+    def build_search_text(self) -> str:
+        return normalize_search(*(getattr(self, name) for name in self.SEARCH_FIELDS))
+
     def save(self, *args, **kwargs):
         """
         Sobrescribe save para actualizar automáticamente profile_completed
-        cada vez que se guarda el usuario.
+        y search_text cada vez que se guarda el usuario.
         """
-        # Actualizar el flag de completitud antes de guardar
-        self.profile_completed = self.check_profile_completed()
+        bulk = get_bulk_state()
+        if bulk is None:
+            # Actualizar el flag de completitud antes de guardar
+            self.profile_completed = self.check_profile_completed()
+        self.search_text = self.build_search_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.SEARCH_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
         super().save(*args, **kwargs)
+        if bulk is not None:
+            # En modo bulk se recalcula al salir con un único UPDATE
+            bulk.users.add(self.pk)
 
 
 class EmailVerificationToken(models.Model):
@@ -469,8 +535,9 @@ class SecuritySettings(models.Model):
     two_factor_method = models.CharField(max_length=20, blank=True)  # 'totp', 'sms', 'email'
     two_factor_secret = models.CharField(max_length=100, blank=True)
     
-    # API
-    api_token = models.CharField(max_length=100, blank=True, null=True, unique=True, default=None)
+    # API: solo el SHA-256 del token (ver accounts.api_tokens) y su prefijo para mostrarlo
+    api_token_hash = models.CharField(max_length=64, blank=True, null=True, unique=True, default=None)
+    api_token_prefix = models.CharField(max_length=8, blank=True, default='')
     api_token_created_at = models.DateTimeField(null=True, blank=True)
     api_token_last_used = models.DateTimeField(null=True, blank=True)
     
@@ -551,6 +618,7 @@ class LoginHistory(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['success']),
+            models.Index(fields=['-created_at']),  # Explorador de auditoría sin filtros
         ]
     
     def __str__(self):
@@ -595,6 +663,7 @@ class ProfileAuditLog(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['action']),
+            models.Index(fields=['-created_at']),  # Explorador de auditoría sin filtros
         ]
     
     def __str__(self):
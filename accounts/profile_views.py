@@ -2,7 +2,6 @@ import secrets
 from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
@@ -10,6 +9,7 @@ from django.utils import timezone
 from django.utils.translation import gettext as _
 from django.views.decorators.http import require_http_methods, require_POST
 
+from .api_tokens import issue_token, revoke_token
 from .models import User, UserSession, LoginHistory, ProfileAuditLog, SecuritySettings
 from .profile_forms import (
     PersonalDataForm, CompanyDataForm, PreferencesForm,
@@ -17,6 +17,8 @@ from .profile_forms import (
 )
 from organizations.models import UserCompany, Company
 from core.audit import log_action
+from core.audit_buffer import record
+from core.pagination import KeysetPaginator
 
 
 def get_client_ip(request):
@@ -30,8 +32,8 @@ def get_client_ip(request):
 
 
 def log_profile_action(user, action, field_changed=None, old_value=None, new_value=None, request=None):
-    """Registrar acción en el log de auditoría del perfil"""
-    ProfileAuditLog.objects.create(
+    """Registrar acción en el log de auditoría del perfil (agrupado por petición, ver core/audit_buffer.py)"""
+    record(ProfileAuditLog(
         user=user,
         action=action,
         field_changed=field_changed or '',
@@ -39,7 +41,7 @@ def log_profile_action(user, action, field_changed=None, old_value=None, new_val
         new_value=str(new_value) if new_value else '',
         ip_address=get_client_ip(request) if request else None,
         user_agent=request.META.get('HTTP_USER_AGENT', '') if request else ''
-    )
+    ))
 
 
 @login_required
@@ -446,12 +448,10 @@ def login_history(request):
     """Ver historial de inicios de sesión"""
     history = LoginHistory.objects.filter(
         user=request.user
-    ).order_by('-created_at')
+    )
     
-    # Paginación
-    paginator = Paginator(history, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Paginación por cursor (índice user, -created_at; sin COUNT ni OFFSET)
+    page_obj = KeysetPaginator(history, ordering=('-created_at', '-pk'), per_page=20).page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
@@ -465,17 +465,15 @@ def audit_log(request):
     """Ver log de auditoría del perfil"""
     logs = ProfileAuditLog.objects.filter(
         user=request.user
-    ).order_by('-created_at')
+    )
     
     # Filtros
     action = request.GET.get('action')
     if action:
         logs = logs.filter(action=action)
     
-    # Paginación
-    paginator = Paginator(logs, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Paginación por cursor (índice user, -created_at; sin COUNT ni OFFSET)
+    page_obj = KeysetPaginator(logs, ordering=('-created_at', '-pk'), per_page=20).page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
@@ -492,12 +490,13 @@ def generate_api_token(request):
     """Generar nuevo token de API"""
     security = request.user.get_or_create_security()
     
-    # Generar nuevo token
-    security.api_token = secrets.token_urlsafe(32)
-    security.api_token_created_at = timezone.now()
-    security.save()
+    # Solo se guarda el hash: el token se muestra una única vez
+    token = issue_token(security)
     
-    messages.success(request, _('Token de API generado correctamente'))
+    messages.success(
+        request,
+        _('Token de API generado. Cópialo ahora, no se volverá a mostrar: %(token)s') % {'token': token},
+    )
     return redirect('accounts:profile_dashboard')
 
 
@@ -507,12 +506,7 @@ def revoke_api_token(request):
     """Revocar token de API"""
     security = request.user.get_or_create_security()
     
-    if security.api_token:
-        security.api_token = None
-        security.api_token_created_at = None
-        security.api_token_last_used = None
-        security.save()
-        
+    if revoke_token(security):
         messages.success(request, _('Token de API revocado correctamente'))
     
     return redirect('accounts:profile_dashboard')
@@ -0,0 +1,49 @@
+"""
+Señales de accounts: invalidan la caché de tokens de API del proceso cuando
+cambia el usuario (estado, baja) o su configuración de seguridad, y el
+veredicto de aprobación guardado en sus sesiones (``UserApprovalMiddleware``).
+Al terminar cada petición vuelcan, si toca, los usos de token y los intentos
+bloqueados pendientes.
+"""
+import logging
+
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .api_tokens import flush_usage_if_due, invalidate_user
+from .middleware import forget_approval
+from .throttling import throttled_attempts
+from .models import SecuritySettings, User
+
+logger = logging.getLogger(__name__)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+# Campos que deciden el acceso en UserApprovalMiddleware
+APPROVAL_FIELDS = frozenset({'status', 'email_verified', 'is_active', 'is_staff', 'role'})
+
+
+@receiver(post_save, sender=User)
+def forget_cached_approval(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not APPROVAL_FIELDS.intersection(update_fields)):
+        return
+    forget_approval(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=SecuritySettings)
+def invalidate_security_tokens(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(request_finished)
+def flush_pending_usage(sender, **kwargs):
+    try:
+        flush_usage_if_due()
+    except Exception:
+        logger.exception('Error volcando el uso de tokens de API')
+    throttled_attempts.flush_if_due()  # registra sus propios errores
@@ -8,7 +8,11 @@ Tests ensure:
 4. Only admins can approve/reject users
 """
 
-from django.test import TestCase, Client
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils import timezone
@@ -213,6 +217,43 @@ class MiddlewareSecurityTests(TestCase):
         # Should not be blocked by middleware
         self.assertEqual(response.status_code, 200)
 
+    def test_approval_is_cached_in_session(self):
+        """El veredicto se guarda en la sesión y las siguientes peticiones no lo recalculan"""
+        from accounts.middleware import APPROVAL_SESSION_KEY
+
+        self.client.force_login(self.approved_user)
+        self.client.get(reverse('catalog:product_list'))
+        self.assertEqual(self.client.session[APPROVAL_SESSION_KEY], str(self.approved_user.pk))
+
+        with mock.patch('accounts.middleware.get_user_language') as language:
+            response = self.client.get(reverse('catalog:product_list'))
+        self.assertEqual(response.status_code, 200)
+        language.assert_not_called()
+
+    def test_status_change_invalidates_cached_approval(self):
+        """Si un admin cambia el estado, la sesión ya abierta vuelve a bloquearse"""
+        self.client.force_login(self.approved_user)
+        self.client.get(reverse('catalog:product_list'))
+
+        self.approved_user.status = User.STATUS_PENDING
+        self.approved_user.save()
+
+        response = self.client.get(reverse('catalog:product_list'))
+        self.assertRedirects(response, reverse('accounts:pending_approval'), fetch_redirect_response=False)
+
+    def test_unapproved_user_is_not_cached(self):
+        from accounts.middleware import APPROVAL_SESSION_KEY
+
+        self.client.force_login(self.unapproved_user)
+        response = self.client.get(reverse('catalog:product_list'))
+        self.assertRedirects(response, reverse('accounts:pending_approval'), fetch_redirect_response=False)
+        self.assertNotIn(APPROVAL_SESSION_KEY, self.client.session)
+
+    def test_static_paths_skip_middleware(self):
+        self.client.force_login(self.unapproved_user)
+        response = self.client.get('/static/css/missing.css')
+        self.assertNotEqual(response.status_code, 302)
+
 
 class AuthorizationTests(TestCase):
     """Test authorization checks for admin-only operations"""
@@ -324,3 +365,77 @@ class StatusTransitionTests(TestCase):
         
         # Should be able to login
         self.assertTrue(login_success)
+
+
+@override_settings(
+    RATELIMIT_RATES={'login_ip': '100/5m', 'login_account': '3/15m', 'resend_ip': '2/h'},
+    RATELIMIT_HISTORY_BATCH_SIZE=2,
+    RATELIMIT_HISTORY_FLUSH_SECONDS=3600,
+)
+class LoginRateLimitTests(TestCase):
+    """Rate limiting of login/resend (core.ratelimit + accounts.throttling)"""
+
+    def setUp(self):
+        from accounts.throttling import throttled_attempts
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(throttled_attempts.flush)
+        self.user = User.objects.create_user(
+            email='target@example.com', password='testpass123',
+            email_verified=True, status=User.STATUS_ACTIVE,
+        )
+
+    def _login(self, password='wrong'):
+        return self.client.post(reverse('accounts:login'), {'username': 'Target@example.com', 'password': password})
+
+    def test_account_is_throttled_before_password_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self._login().status_code, 200)
+        with mock.patch('django.contrib.auth.base_user.check_password') as check:
+            response = self._login(password='testpass123')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response['Retry-After']) > 0)
+        check.assert_not_called()
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_throttled_attempts_are_written_to_login_history_in_batches(self):
+        from accounts.models import LoginHistory
+        from accounts.throttling import throttled_attempts
+
+        for _ in range(4):
+            self._login()
+        self.assertEqual(LoginHistory.objects.filter(user=self.user, success=False).count(), 0)
+        self._login()  # segundo intento bloqueado: se completa el lote
+        rows = LoginHistory.objects.filter(user=self.user, success=False)
+        self.assertEqual(rows.count(), 2)
+        self.assertEqual(rows.first().failure_reason, 'rate_limited:account')
+        self.assertEqual(throttled_attempts.flush(), 0)
+
+    def test_tail_of_a_burst_is_written_when_the_request_finishes(self):
+        from accounts.models import LoginHistory
+
+        for _ in range(3):
+            self._login()
+        with override_settings(RATELIMIT_HISTORY_FLUSH_SECONDS=0):
+            self._login()  # un único intento bloqueado, sin lote completo
+        self.assertEqual(LoginHistory.objects.filter(user=self.user, success=False).count(), 1)
+
+    def test_purge_removes_counters_that_no_longer_count(self):
+        from datetime import timedelta
+        from django.core.management import call_command
+        from core.models import RateLimitCounter
+
+        RateLimitCounter.objects.create(key='login:viejo', window=1, count=3,
+                                        updated_at=timezone.now() - timedelta(days=1))
+        RateLimitCounter.objects.create(key='login:reciente', window=2, count=1)
+        call_command('purge_ratelimit_counters', stdout=StringIO())
+        self.assertEqual(list(RateLimitCounter.objects.values_list('key', flat=True)), ['login:reciente'])
+
+    def test_resend_confirmation_is_limited_per_ip(self):
+        url = reverse('accounts:resend_confirmation')
+        for _ in range(2):
+            self.client.post(url, {'email': 'nadie@example.com'})
+        response = self.client.post(url, {'email': 'nadie@example.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(response.json()['success'])
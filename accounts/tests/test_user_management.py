@@ -0,0 +1,154 @@
+"""
+Tests for the user management dashboard (accounts.views.user_approval_list).
+
+1. search_text normalization kept in sync on save
+2. Accent/case-insensitive search
+3. Cursor pagination forwards and backwards without COUNT/OFFSET
+4. Only the selected tab is queried
+5. Bulk approval/rejection (accounts.approvals)
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class UserManagementListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('root@fenix.test', 'testpass123', full_name='Root')
+        now = timezone.now()
+        for i in range(25):
+            user = User.objects.create_user(
+                f'cliente{i:02d}@fenix.test', 'testpass123',
+                full_name=f'Cliente {i:02d}', company='Distribución Peña' if i == 7 else 'Bazar',
+                status=User.STATUS_ACTIVE, email_verified=True,
+            )
+            # Mismo date_joined en parejas para comprobar el desempate por id
+            User.objects.filter(pk=user.pk).update(date_joined=now - timedelta(days=i // 2))
+        User.objects.create_user('nuevo@fenix.test', 'testpass123', full_name='Nuevo')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('accounts:user_approval_list')
+
+    def test_search_text_is_normalized_and_kept_in_sync(self):
+        user = User.objects.get(email='cliente07@fenix.test')
+        self.assertIn('distribucion pena', user.search_text)
+
+        user.company = 'Ñandú S.L.'
+        user.save(update_fields=['company'])
+        user.refresh_from_db()
+        self.assertIn('nandu s.l.', user.search_text)
+
+    def test_search_ignores_case_and_accents(self):
+        response = self.client.get(self.url, {'search': 'DISTRIBUCION peña'})
+        emails = [u.email for u in response.context['page_registered']]
+        self.assertEqual(emails, ['cliente07@fenix.test'])
+
+    def test_cursor_pagination_walks_all_users_in_order(self):
+        expected = list(
+            User.objects.filter(status=User.STATUS_ACTIVE)
+            .order_by('-date_joined', '-pk').values_list('email', flat=True)
+        )
+        seen, cursor, pages = [], '', []
+        while True:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(self.url, {'per_page': 10, 'cursor': cursor})
+            user_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "accounts_user"' in q['sql']]
+            self.assertFalse(any('OFFSET' in sql for sql in user_queries))
+            self.assertFalse(any('COUNT(*)' in sql and 'active' in sql for sql in user_queries))
+            page = response.context['page_registered']
+            pages.append(page)
+            seen += [u.email for u in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(response.context['page_pending'])
+
+        # Volver atrás desde la última página
+        response = self.client.get(self.url, {'per_page': 10, 'cursor': pages[-1].previous_cursor})
+        self.assertEqual([u.email for u in response.context['page_registered']], expected[10:20])
+
+    def test_pending_tab_only_queries_pending_users(self):
+        response = self.client.get(self.url, {'tab': 'pending'})
+        self.assertIsNone(response.context['page_registered'])
+        self.assertEqual([u.email for u in response.context['page_pending']], ['nuevo@fenix.test'])
+        self.assertEqual(response.context['pending_count'], 1)
+
+    def test_invalid_cursor_returns_first_page(self):
+        response = self.client.get(self.url, {'per_page': 10, 'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_registered']), 10)
+
+
+class BulkReviewTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root@fenix.test', 'testpass123', full_name='Root')
+        self.client.force_login(self.admin)
+        self.pending = [
+            User.objects.create_user(f'feria{i}@fenix.test', 'testpass123', full_name=f'Feria {i}',
+                                     language='zh-hans' if i == 0 else 'es')
+            for i in range(3)
+        ]
+        self.active = User.objects.create_user('ya@fenix.test', 'testpass123', status=User.STATUS_ACTIVE)
+        self.url = reverse('accounts:bulk_review_users')
+
+    def test_bulk_approve_reports_outcomes_and_writes_in_batch(self):
+        from core.audit import AuditLog
+
+        ids = [u.pk for u in self.pending] + [self.active.pk, 999999]
+        with mock.patch('accounts.approvals.enqueue_review_emails') as enqueue, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url, {'action': 'approve', 'user_ids': ','.join(map(str, ids))},
+                HTTP_ACCEPT='application/json',
+            )
+        data = response.json()
+        self.assertEqual(data['processed'], 3)
+        self.assertEqual(data['results'][str(self.active.pk)], 'already_processed')
+        self.assertEqual(data['results']['999999'], 'not_found')
+        self.assertEqual(data['results'][str(self.pending[0].pk)], 'approved')
+
+        approved = User.objects.filter(pk__in=[u.pk for u in self.pending])
+        self.assertTrue(all(
+            u.status == User.STATUS_ACTIVE and not u.pending_approval and u.approved_at and u.approved_by_id == self.admin.pk
+            for u in approved
+        ))
+        self.assertEqual(AuditLog.objects.filter(action=AuditLog.ACTION_USER_APPROVED).count(), 3)
+        enqueue.assert_called_once()
+        self.assertEqual(sorted(enqueue.call_args.args[0]), sorted(u.pk for u in self.pending))
+
+    def test_review_emails_are_localized_and_failures_do_not_raise(self):
+        from accounts.approvals import send_review_emails
+
+        ids = [u.pk for u in self.pending]
+        sent = send_review_emails(ids, 'reject')
+        self.assertEqual(sent, {pk: True for pk in ids})
+        subjects = {m.to[0]: m.subject for m in mail.outbox}
+        self.assertIn('账户', subjects['feria0@fenix.test'])
+        self.assertIn('Estado de solicitud', subjects['feria1@fenix.test'])
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('smtp down')), \
+                self.assertLogs('accounts.approvals', 'WARNING'):
+            self.assertEqual(send_review_emails(ids, 'approve'), {pk: False for pk in ids})
+
+    def test_bulk_reject_form_redirects_with_summary(self):
+        with mock.patch('accounts.approvals.enqueue_review_emails'):
+            response = self.client.post(self.url, {'action': 'reject', 'user_ids': [self.pending[1].pk]})
+        self.assertEqual(response.status_code, 302)
+        self.pending[1].refresh_from_db()
+        self.assertEqual(self.pending[1].status, User.STATUS_REJECTED)
+        self.assertFalse(self.pending[1].is_active)
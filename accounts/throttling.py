@@ -0,0 +1,105 @@
+"""
+Respuestas y registro de los intentos bloqueados por ``core.ratelimit``.
+
+Los intentos de login/reenvío rechazados se anotan en ``LoginHistory``
+(``success=False``, ``failure_reason='rate_limited:<clave>'``) agrupados en
+memoria: un lote se escribe con una consulta de usuarios y un
+``bulk_create`` cuando llega a ``RATELIMIT_HISTORY_BATCH_SIZE``, al terminar
+la primera petición tras ``RATELIMIT_HISTORY_FLUSH_SECONDS`` (señal
+``request_finished``, así el final de una ráfaga no espera a otro intento) y
+al salir el proceso. Así una ráfaga de credential stuffing no
+cuesta un INSERT por intento. Solo se registran emails de cuentas existentes
+(``LoginHistory.user`` es obligatorio).
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib import messages
+from django.shortcuts import render
+from django.utils.translation import gettext as _
+
+from core.ratelimit import client_ip, default_on_limited
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottledAttempts:
+
+    def __init__(self):
+        self._pending: list[dict] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def add(self, email: str, ip: str, user_agent: str, reason: str) -> None:
+        with self._lock:
+            self._pending.append({'email': email, 'ip': ip, 'user_agent': user_agent, 'reason': reason})
+            due = len(self._pending) >= settings.RATELIMIT_HISTORY_BATCH_SIZE
+        if due:
+            self.flush()
+
+    def flush_if_due(self) -> int:
+        with self._lock:
+            due = self._pending and (
+                time.monotonic() - self._last_flush >= settings.RATELIMIT_HISTORY_FLUSH_SECONDS
+            )
+        return self.flush() if due else 0
+
+    def flush(self) -> int:
+        from .models import LoginHistory, User
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            users = dict(
+                User.objects.filter(email__in={p['email'] for p in pending}).values_list('email', 'pk')
+            )
+            rows = LoginHistory.objects.bulk_create([
+                LoginHistory(
+                    user_id=users[p['email']], success=False, failure_reason=p['reason'],
+                    ip_address=p['ip'] or '0.0.0.0', user_agent=p['user_agent'],
+                )
+                for p in pending if p['email'] in users
+            ])
+        except Exception:
+            logger.exception('Error registrando intentos bloqueados en LoginHistory')
+            return 0
+        return len(rows)
+
+
+throttled_attempts = ThrottledAttempts()
+atexit.register(throttled_attempts.flush)
+
+
+def record_throttled(request, result, email: str = '') -> None:
+    email = (email or (result.identifier if result.kind == 'account' else '')).strip().lower()
+    if email:
+        throttled_attempts.add(
+            email, client_ip(request), request.META.get('HTTP_USER_AGENT', '')[:500],
+            f'rate_limited:{result.kind}',
+        )
+
+
+def throttled_page(template: str, form_factory, email_field: str = ''):
+    """``on_limited`` para vistas HTML: la misma página con un aviso y estado 429."""
+    def on_limited(request, result):
+        if email_field:
+            record_throttled(request, result, request.POST.get(email_field, ''))
+        messages.error(request, _('Demasiados intentos. Espera unos minutos antes de volver a intentarlo.'))
+        response = render(request, template, {'form': form_factory(request)}, status=429)
+        response['Retry-After'] = str(result.retry_after)
+        return response
+    return on_limited
+
+
+def throttled_json(email_field: str = ''):
+    def on_limited(request, result):
+        if email_field:
+            record_throttled(request, result, request.POST.get(email_field, ''))
+        return default_on_limited(request, result)
+    return on_limited
@@ -55,6 +55,7 @@ urlpatterns = [
     # Aprobación/rechazo de nuevos usuarios
     path('user-approval/new/<int:user_id>/approve/', views.approve_user_view, name='approve_user'),
     path('user-approval/new/<int:user_id>/reject/', views.reject_user_view, name='reject_user'),
+    path('user-approval/new/bulk/', views.bulk_review_users_view, name='bulk_review_users'),
     path('user-approval/request/update/', views.update_pending_request, name='update_pending_request'),
     
     # Email verification
@@ -296,52 +296,56 @@ def send_new_user_admin_notification(user, request=None):
         logger.error(f'Error sending admin notification: {e}')
 
 
+def build_user_approved_email(user, request=None, login_url=''):
+    """
+    Construye (sin enviar) el email de cuenta aprobada en el idioma del usuario.
+    """
+    from django.core.mail import EmailMessage
+
+    platform = PlatformSettings.get_settings()
+    lang = user.language or platform.default_language or 'es'
+
+    # Construir URL de login
+    if request and not login_url:
+        from django.urls import reverse
+        login_url = request.build_absolute_uri(reverse('accounts:login'))
+
+    if lang == 'zh-hans':
+        subject = 'Fenix - 您的账户已获批准'
+        message = f'您好 {user.full_name},\n\n'
+        message += '好消息！您的 Fenix 账户已被批准。\n\n'
+        message += '现在可以使用您的凭据登录平台了。\n\n'
+        if login_url:
+            message += f'登录链接：{login_url}\n\n'
+        message += '欢迎来到 Fenix！\n\n'
+        message += '此致，\nFenix 团队'
+    else:
+        subject = 'Fenix - Tu cuenta ha sido aprobada'
+        message = f'Hola {user.full_name},\n\n'
+        message += '¡Buenas noticias! Tu cuenta de Fenix ha sido aprobada.\n\n'
+        message += 'Ya puedes iniciar sesión en la plataforma con tus credenciales.\n\n'
+        if login_url:
+            message += f'Iniciar sesión: {login_url}\n\n'
+        message += '¡Bienvenido a Fenix!\n\n'
+        message += 'Saludos,\nEquipo Fenix'
+
+    from_email = platform.email_from or settings.DEFAULT_FROM_EMAIL
+
+    # Usar EmailMessage en lugar de send_mail para mejor soporte UTF-8
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        to=[user.email],
+    )
+
+
 def send_user_approved_email(user, request=None):
     """
     Envía email al usuario notificando que su cuenta ha sido aprobada.
     """
     try:
-        from django.core.mail import EmailMessage
-        
-        platform = PlatformSettings.get_settings()
-        lang = user.language or platform.default_language or 'es'
-        
-        # Construir URL de login
-        login_url = ''
-        if request:
-            from django.urls import reverse
-            login_url = request.build_absolute_uri(reverse('accounts:login'))
-        
-        if lang == 'zh-hans':
-            subject = 'Fenix - 您的账户已获批准'
-            message = f'您好 {user.full_name},\n\n'
-            message += '好消息！您的 Fenix 账户已被批准。\n\n'
-            message += '现在可以使用您的凭据登录平台了。\n\n'
-            if login_url:
-                message += f'登录链接：{login_url}\n\n'
-            message += '欢迎来到 Fenix！\n\n'
-            message += '此致，\nFenix 团队'
-        else:
-            subject = 'Fenix - Tu cuenta ha sido aprobada'
-            message = f'Hola {user.full_name},\n\n'
-            message += '¡Buenas noticias! Tu cuenta de Fenix ha sido aprobada.\n\n'
-            message += 'Ya puedes iniciar sesión en la plataforma con tus credenciales.\n\n'
-            if login_url:
-                message += f'Iniciar sesión: {login_url}\n\n'
-            message += '¡Bienvenido a Fenix!\n\n'
-            message += 'Saludos,\nEquipo Fenix'
-        
-        from_email = platform.email_from or settings.DEFAULT_FROM_EMAIL
-        
-        # Usar EmailMessage en lugar de send_mail para mejor soporte UTF-8
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=from_email,
-            to=[user.email],
-        )
-        email.send(fail_silently=False)
-        
+        build_user_approved_email(user, request).send(fail_silently=False)
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
@@ -349,42 +353,47 @@ def send_user_approved_email(user, request=None):
         raise
 
 
+def build_user_rejected_email(user):
+    """
+    Construye (sin enviar) el email de solicitud rechazada en el idioma del usuario.
+    """
+    from django.core.mail import EmailMessage
+
+    platform = PlatformSettings.get_settings()
+    lang = user.language or platform.default_language or 'es'
+
+    if lang == 'zh-hans':
+        subject = 'Fenix - 账户申请状态'
+        message = f'您好 {user.full_name},\n\n'
+        message += '感谢您对 Fenix 的关注。\n\n'
+        message += '我们已审核您的申请，遗憾地通知您，目前我们无法批准您的账户。\n\n'
+        message += '如有任何疑问，请联系我们的支持团队。\n\n'
+        message += '此致，\nFenix 团队'
+    else:
+        subject = 'Fenix - Estado de solicitud de cuenta'
+        message = f'Hola {user.full_name},\n\n'
+        message += 'Gracias por tu interés en Fenix.\n\n'
+        message += 'Hemos revisado tu solicitud y lamentablemente no podemos aprobar tu cuenta en este momento.\n\n'
+        message += 'Si tienes alguna pregunta, por favor contacta a nuestro equipo de soporte.\n\n'
+        message += 'Saludos,\nEquipo Fenix'
+
+    from_email = platform.email_from or settings.DEFAULT_FROM_EMAIL
+
+    # Usar EmailMessage en lugar de send_mail para mejor soporte UTF-8
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        to=[user.email],
+    )
+
+
 def send_user_rejected_email(user, request=None):
     """
     Envía email al usuario notificando que su solicitud ha sido rechazada.
     """
     try:
-        from django.core.mail import EmailMessage
-        
-        platform = PlatformSettings.get_settings()
-        lang = user.language or platform.default_language or 'es'
-        
-        if lang == 'zh-hans':
-            subject = 'Fenix - 账户申请状态'
-            message = f'您好 {user.full_name},\n\n'
-            message += '感谢您对 Fenix 的关注。\n\n'
-            message += '我们已审核您的申请，遗憾地通知您，目前我们无法批准您的账户。\n\n'
-            message += '如有任何疑问，请联系我们的支持团队。\n\n'
-            message += '此致，\nFenix 团队'
-        else:
-            subject = 'Fenix - Estado de solicitud de cuenta'
-            message = f'Hola {user.full_name},\n\n'
-            message += 'Gracias por tu interés en Fenix.\n\n'
-            message += 'Hemos revisado tu solicitud y lamentablemente no podemos aprobar tu cuenta en este momento.\n\n'
-            message += 'Si tienes alguna pregunta, por favor contacta a nuestro equipo de soporte.\n\n'
-            message += 'Saludos,\nEquipo Fenix'
-        
-        from_email = platform.email_from or settings.DEFAULT_FROM_EMAIL
-        
-        # Usar EmailMessage en lugar de send_mail para mejor soporte UTF-8
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=from_email,
-            to=[user.email],
-        )
-        email.send(fail_silently=False)
-        
+        build_user_rejected_email(user).send(fail_silently=False)
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
@@ -7,9 +7,13 @@ from django.utils import timezone
 from django.db.models import Q
 from django.http import JsonResponse
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.views.decorators.http import require_POST
+from core.ratelimit import ratelimit
+from . import approvals
 from .models import User, EmailVerificationToken
 from .forms import LoginForm, RegisterForm
+from .throttling import throttled_json, throttled_page
 from .utils import send_verification_email, send_approval_notification, is_manager_or_admin
 from .permissions import (
     can_manage_users,
@@ -79,6 +83,10 @@ def dashboard_view(request):
     return render(request, 'dashboard/index.html', context)
 
 
+@ratelimit(
+    'login', keys={'ip': 'ip', 'account': 'username'},
+    on_limited=throttled_page('accounts/login.html', LoginForm, email_field='username'),
+)
 def login_view(request):
     """Vista de inicio de sesión con verificación de email"""
     if request.user.is_authenticated:
@@ -124,6 +132,10 @@ def login_view(request):
     return render(request, 'accounts/login.html', {'form': form})
 
 
+@ratelimit(
+    'register', keys={'ip': 'ip'},
+    on_limited=throttled_page('accounts/register.html', lambda request: RegisterForm()),
+)
 def register_view(request):
     """Vista de registro de nuevos usuarios"""
     if request.user.is_authenticated:
@@ -220,6 +232,7 @@ def verify_email(request):
 
 
 @require_POST
+@ratelimit('resend', keys={'ip': 'ip', 'account': 'email'}, on_limited=throttled_json(email_field='email'))
 def resend_confirmation(request):
     """Reenviar email de confirmación"""
     email = request.POST.get('email')
@@ -281,16 +294,19 @@ def profile_view(request):
 @admin_required
 def user_approval_list(request):
     """
-    Vista MEJORADA: Dashboard de gestión de usuarios con paginación moderna.
-    
+    Dashboard de gestión de usuarios con paginación por cursor.
+
     Features:
-    - PAGINACIÓN: query params ?per_page=10&page=2
-    - FILTROS: status, search (preservados en paginación)
+    - PAGINACIÓN: ?per_page=10&cursor=... (keyset sobre -date_joined, -id; sin COUNT ni OFFSET)
+    - FILTROS: status, search (sobre search_text normalizado, preservados en paginación)
     - RBAC: SUPER_ADMIN ve todos, ADMIN ve todos menos super_admin
-    - TABS: Usuarios registrados | Nuevos usuarios pendientes (aprobación)
+    - TABS: Usuarios registrados | Nuevos usuarios pendientes (aprobación).
+      Solo se consulta la pestaña seleccionada; de la otra solo el contador
+      de pendientes (índice status, role).
     """
-    from django.core.paginator import Paginator
-    
+    from core.pagination import KeysetPaginator
+    from core.search import normalize_search
+
     # Obtener parámetros
     per_page = request.GET.get('per_page', '10')
     try:
@@ -299,73 +315,51 @@ def user_approval_list(request):
             per_page = 10
     except (ValueError, TypeError):
         per_page = 10
-    
-    current_page = request.GET.get('page', '1')
+
+    cursor = request.GET.get('cursor', '')
     status_filter = request.GET.get('status', '')
-    search_query = request.GET.get('search', '')
-    active_tab = request.GET.get('tab', 'registered')
-    
-    # ========== TAB 1: USUARIOS REGISTRADOS ==========
-    base_registered = User.objects.filter(
-        status__in=[User.STATUS_ACTIVE, User.STATUS_DISABLED, User.STATUS_REJECTED]
-    )
-    
-    # Filtrar según RBAC
-    registered_users = get_visible_users_queryset(request.user, base_registered)
-    registered_users = registered_users.order_by('-date_joined')
-    
-    # Aplicar filtros
-    if status_filter and status_filter in [User.STATUS_ACTIVE, User.STATUS_DISABLED, User.STATUS_REJECTED]:
-        registered_users = registered_users.filter(status=status_filter)
-    
-    if search_query:
-        registered_users = registered_users.filter(
-            Q(email__icontains=search_query) |
-            Q(full_name__icontains=search_query) |
-            Q(company__icontains=search_query)
+    search_query = request.GET.get('search', '').strip()
+    active_tab = 'pending' if request.GET.get('tab') == 'pending' else 'registered'
+
+    pending_new_users = User.objects.filter(status=User.STATUS_PENDING, role=User.ROLE_USER)
+    page_registered = page_pending = None
+
+    if active_tab == 'registered':
+        # ========== TAB 1: USUARIOS REGISTRADOS ==========
+        registered_statuses = [User.STATUS_ACTIVE, User.STATUS_DISABLED, User.STATUS_REJECTED]
+        if status_filter in registered_statuses:
+            registered_statuses = [status_filter]
+        registered_users = get_visible_users_queryset(
+            request.user, User.objects.filter(status__in=registered_statuses),
         )
-    
-    # PAGINACIÓN TAB 1
-    paginator_registered = Paginator(registered_users, per_page)
-    try:
-        page_registered = paginator_registered.page(current_page)
-    except Exception:
-        page_registered = paginator_registered.page(1)
-    
-    # ========== TAB 2: USUARIOS PENDIENTES ==========
-    pending_new_users = User.objects.filter(
-        status=User.STATUS_PENDING,
-        role=User.ROLE_USER
-    ).order_by('-date_joined')
-    
-    # PAGINACIÓN TAB 2
-    paginator_pending = Paginator(pending_new_users, per_page)
-    try:
-        page_pending = paginator_pending.page(current_page)
-    except Exception:
-        page_pending = paginator_pending.page(1)
-    
-    # Construir query string para preservar filtros
+        if search_query:
+            registered_users = registered_users.filter(search_text__contains=normalize_search(search_query))
+        page_registered = KeysetPaginator(
+            registered_users, ordering=('-date_joined', '-pk'), per_page=per_page,
+        ).page(cursor)
+    else:
+        # ========== TAB 2: USUARIOS PENDIENTES ==========
+        page_pending = KeysetPaginator(
+            pending_new_users, ordering=('-date_joined', '-pk'), per_page=per_page,
+        ).page(cursor)
+
+    # Query string para preservar filtros (sin cursor)
     query_params = {
         'per_page': per_page,
         'status': status_filter,
         'search': search_query,
         'tab': active_tab,
     }
-    query_string = '&'.join(f'{k}={v}' for k, v in query_params.items() if v)
-    
+    query_string = urlencode({k: v for k, v in query_params.items() if v})
+
     # Obtener opciones de roles
     available_role_choices = get_role_choices_for_user(request.user)
-    
+
     context = {
-        # TAB 1: Usuarios registrados (paginado)
         'page_registered': page_registered,
-        'paginator_registered': paginator_registered,
-        
-        # TAB 2: Usuarios pendientes (paginado)
         'page_pending': page_pending,
-        'paginator_pending': paginator_pending,
-        
+        'pending_count': pending_new_users.count(),
+
         # Parámetros
         'per_page': per_page,
         'per_page_choices': [10, 20, 50, 100],
@@ -373,7 +367,7 @@ def user_approval_list(request):
         'search_query': search_query,
         'query_string': query_string,
         'active_tab': active_tab,
-        
+
         # Opciones
         'status_choices': [
             (User.STATUS_ACTIVE, _('Activo')),
@@ -549,42 +543,91 @@ def user_delete_view(request, user_id):
 def approve_user_view(request, user_id):
     """
     Aprueba un nuevo usuario pendiente.
-    Cambia status='active', activa acceso, envía email de notificación.
+    Cambia status='active', activa acceso y encola el email de notificación
+    (ver accounts.approvals).
     
     IMPORTANTE: El role NO cambia automáticamente (sigue siendo 'user').
     """
-    user_to_approve = get_object_or_404(User, pk=user_id)
-    
-    # Solo se pueden aprobar usuarios con status='pending'
-    if user_to_approve.status != User.STATUS_PENDING:
-        messages.warning(request, _('Este usuario ya fue procesado.'))
-        return redirect(f"{reverse('accounts:user_approval_dashboard')}?tab=pending")
-    
-    # Cambiar estado a activo (el role permanece como 'user')
-    user_to_approve.status = User.STATUS_ACTIVE
-    user_to_approve.pending_approval = False
-    user_to_approve.is_active = True
-    user_to_approve.email_verified = True  # Asegurar que está verificado
-    user_to_approve.approved_by = request.user
-    user_to_approve.approved_at = timezone.now()
-    user_to_approve.save()
-    
-    # Enviar email al usuario
-    try:
-        from .utils import send_user_approved_email
-        send_user_approved_email(user_to_approve, request)
+    return _review_single_user(request, user_id, approvals.ACTION_APPROVE)
+
+
+def _review_single_user(request, user_id, action):
+    user_to_review = get_object_or_404(User, pk=user_id)
+    result = approvals.review_users(
+        request.user, [user_to_review.pk], action,
+        request=request, login_url=request.build_absolute_uri(reverse('accounts:login')),
+    )
+    outcome = result.outcomes[user_to_review.pk]
+    if outcome == approvals.OUTCOME_APPROVED:
+        messages.success(
+            request,
+            _('Usuario %(email)s aprobado exitosamente. Se enviará un email de notificación.') %
+            {'email': user_to_review.email}
+        )
+    elif outcome == approvals.OUTCOME_REJECTED:
         messages.success(
             request,
-            _('Usuario %(email)s aprobado exitosamente. Se ha enviado un email de notificación.') % 
-            {'email': user_to_approve.email}
+            _('Solicitud de %(email)s rechazada. Se enviará un email de notificación.') %
+            {'email': user_to_review.email}
         )
-    except Exception as e:
+    elif outcome == approvals.OUTCOME_ALREADY_PROCESSED:
+        messages.warning(request, _('Este usuario ya fue procesado.'))
+    else:
+        messages.error(request, _('No tienes permiso para editar este usuario.'))
+    return redirect(f"{reverse('accounts:user_approval_dashboard')}?tab=pending")
+
+
+@login_required
+@admin_required
+@require_POST
+def bulk_review_users_view(request):
+    """
+    Aprueba o rechaza en bloque las solicitudes seleccionadas
+    (POST ``action=approve|reject`` y ``user_ids`` repetido o separado por comas).
+
+    Responde JSON con el resultado por usuario si se pide
+    (``Accept: application/json``); si no, resume con mensajes y redirige.
+    """
+    action = request.POST.get('action')
+    raw_ids = [v for value in request.POST.getlist('user_ids') for v in value.split(',')]
+    try:
+        user_ids = [int(v) for v in raw_ids if v.strip()]
+    except ValueError:
+        user_ids = None
+    wants_json = 'application/json' in request.headers.get('Accept', '')
+
+    if action not in (approvals.ACTION_APPROVE, approvals.ACTION_REJECT) or user_ids is None:
+        if wants_json:
+            return JsonResponse({'error': 'invalid_request'}, status=400)
+        messages.error(request, _('Solicitud no válida.'))
+        return redirect(f"{reverse('accounts:user_approval_dashboard')}?tab=pending")
+
+    result = approvals.review_users(
+        request.user, user_ids, action,
+        request=request, login_url=request.build_absolute_uri(reverse('accounts:login')),
+    )
+    if wants_json:
+        return JsonResponse({
+            'action': action,
+            'results': {str(pk): outcome for pk, outcome in result.outcomes.items()},
+            'processed': len(result.processed),
+        })
+
+    processed = len(result.processed)
+    skipped = len(result.outcomes) - processed
+    if processed:
+        if action == approvals.ACTION_APPROVE:
+            msg = _('%(count)s usuario(s) aprobado(s). Los emails de notificación se están enviando.')
+        else:
+            msg = _('%(count)s solicitud(es) rechazada(s). Los emails de notificación se están enviando.')
+        messages.success(request, msg % {'count': processed})
+    if skipped:
         messages.warning(
             request,
-            _('Usuario %(email)s aprobado, pero hubo un error al enviar el email: %(error)s') % 
-            {'email': user_to_approve.email, 'error': str(e)}
+            _('%(count)s usuario(s) omitido(s): ya procesados o sin permiso.') % {'count': skipped}
         )
-    
+    if not result.outcomes:
+        messages.warning(request, _('No se ha seleccionado ningún usuario.'))
     return redirect(f"{reverse('accounts:user_approval_dashboard')}?tab=pending")
 
 
@@ -667,38 +710,9 @@ def update_pending_request(request):
 def reject_user_view(request, user_id):
     """
     Rechaza un nuevo usuario pendiente.
-    Cambia status='rejected', desactiva acceso, envía email de notificación.
+    Cambia status='rejected', desactiva acceso y encola el email de notificación.
     """
-    user_to_reject = get_object_or_404(User, pk=user_id)
-    
-    # Solo se pueden rechazar usuarios con status='pending'
-    if user_to_reject.status != User.STATUS_PENDING:
-        messages.warning(request, _('Este usuario ya fue procesado.'))
-        return redirect(f"{reverse('accounts:user_approval_dashboard')}?tab=pending")
-    
-    # Cambiar estado a rechazado
-    user_to_reject.status = User.STATUS_REJECTED
-    user_to_reject.pending_approval = False
-    user_to_reject.is_active = False
-    user_to_reject.save()
-    
-    # Enviar email al usuario
-    try:
-        from .utils import send_user_rejected_email
-        send_user_rejected_email(user_to_reject, request)
-        messages.success(
-            request,
-            _('Solicitud de %(email)s rechazada. Se ha enviado un email de notificación.') % 
-            {'email': user_to_reject.email}
-        )
-    except Exception as e:
-        messages.warning(
-            request,
-            _('Solicitud rechazada, pero hubo un error al enviar el email: %(error)s') % 
-            {'error': str(e)}
-        )
-    
-    return redirect(f"{reverse('accounts:user_approval_dashboard')}?tab=pending")
+    return _review_single_user(request, user_id, approvals.ACTION_REJECT)
 
 
 # Vista antigua de user_approve eliminada - usar approve_user_view y reject_user_view
@@ -0,0 +1,19 @@
+"""
+Borra las claves de idempotencia de la API caducadas
+(``API_IDEMPOTENCY_TTL_HOURS``): la caducidad solo se comprueba al reutilizar
+la misma clave, así que sin esto la tabla crece sin límite.
+
+Pensado para ejecutarse periódicamente (cron de App Engine), p.ej. cada hora:
+    python manage.py purge_idempotency_keys
+"""
+from django.core.management.base import BaseCommand
+
+from api.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Borra las claves de idempotencia caducadas'
+
+    def handle(self, *args, **options):
+        deleted = IdempotencyKey.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'OK - {deleted} claves borradas'))
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta guardada de un POST con cabecera ``Idempotency-Key``.
+
+    Mientras ``response_status`` es nulo la petición original sigue en curso,
+    como mucho ``API_IDEMPOTENCY_LEASE_SECONDS``: pasado ese plazo se da por
+    muerta (worker caído) y un reintento puede reclamar la clave. Un reintento
+    con la misma clave y el mismo cuerpo recibe la respuesta guardada; con otro
+    cuerpo, un error 422. ``purge_expired`` borra las caducadas.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='api_idempotency_keys',
+        verbose_name=_('Usuario'),
+    )
+    key = models.CharField(max_length=100, verbose_name=_('Clave'))
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('Clave de idempotencia')
+        verbose_name_plural = _('Claves de idempotencia')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='api_idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user_id}:{self.key}'
+
+    @property
+    def is_expired(self) -> bool:
+        ttl = timedelta(hours=settings.API_IDEMPOTENCY_TTL_HOURS)
+        return self.created_at < timezone.now() - ttl
+
+    @property
+    def is_abandoned(self) -> bool:
+        """Reserva en curso más antigua que el plazo: la petición original no terminó."""
+        lease = timedelta(seconds=settings.API_IDEMPOTENCY_LEASE_SECONDS)
+        return self.response_status is None and self.created_at < timezone.now() - lease
+
+    @classmethod
+    def purge_expired(cls) -> int:
+        cutoff = timezone.now() - timedelta(hours=settings.API_IDEMPOTENCY_TTL_HOURS)
+        deleted, _ = cls.objects.filter(created_at__lt=cutoff).delete()
+        return deleted
@@ -0,0 +1,254 @@
+"""
+Tests de la API B2B (api/).
+
+1. Autenticación por token hasheado, caché de verificación y revocación
+2. Catálogo con ETag / 304
+3. Envío de varios pedidos por petición (place_orders)
+4. Idempotency-Key: repetición, cuerpo distinto y petición en curso
+5. Sondeo de pedidos con updated_since
+"""
+import hashlib
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.api_tokens import clear_cache, flush_usage, hash_token, issue_token, revoke_token
+from accounts.models import SecuritySettings
+from catalog.models import Product
+from orders.models import Order
+
+from .models import IdempotencyKey
+
+User = get_user_model()
+
+PROFILE = {field: 'x' for field in User.PROFILE_REQUIRED_FIELDS}
+
+
+class ApiTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'erp@fenix.test', 'testpass123', full_name='Grupo Restaurantes',
+            status=User.STATUS_ACTIVE, email_verified=True, **PROFILE,
+        )
+        clear_cache()
+        self.addCleanup(clear_cache)
+        flush_usage()
+        self.addCleanup(flush_usage)
+        self.security = SecuritySettings.objects.create(user=self.user)
+        self.token = issue_token(self.security)
+        self.jamon = Product.objects.create(name_es='Jamón', name_zh_hans='火腿', price=Decimal('90.00'), stock_available=5)
+        self.queso = Product.objects.create(name_es='Queso', name_zh_hans='奶酪', price=Decimal('12.50'), stock_available=100)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+
+    def post_orders(self, payload, **headers):
+        with mock.patch('orders.services.checkout.enqueue_order_confirmation_emails'), \
+                self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('api:orders'), json.dumps(payload), content_type='application/json',
+                **self.auth, **headers,
+            )
+
+
+class ApiAuthTests(ApiTestCase):
+
+    def test_missing_or_invalid_token_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('api:catalog')).status_code, 401)
+        response = self.client.get(reverse('api:catalog'), HTTP_AUTHORIZATION='Bearer nope')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+    def test_inactive_user_cannot_use_token(self):
+        User.objects.filter(pk=self.user.pk).update(status=User.STATUS_REJECTED, is_active=False)
+        self.assertEqual(self.client.get(reverse('api:catalog'), **self.auth).status_code, 401)
+
+    def test_only_the_hash_is_stored(self):
+        self.security.refresh_from_db()
+        self.assertEqual(self.security.api_token_hash, hash_token(self.token))
+        self.assertEqual(self.security.api_token_prefix, self.token[:8])
+        self.assertFalse(SecuritySettings.objects.filter(api_token_hash=self.token).exists())
+
+    @override_settings(API_TOKEN_TOUCH_SECONDS=300)
+    def test_repeated_calls_skip_token_lookup_and_last_used_writes(self):
+        url = reverse('api:orders')
+        self.client.get(url, **self.auth)
+        with self.assertNumQueries(1):  # solo el listado de pedidos
+            self.client.get(url, **self.auth)
+        self.assertIsNone(SecuritySettings.objects.get(pk=self.security.pk).api_token_last_used)
+
+        self.assertEqual(flush_usage(), 1)
+        self.assertIsNotNone(SecuritySettings.objects.get(pk=self.security.pk).api_token_last_used)
+
+    @override_settings(API_TOKEN_TOUCH_SECONDS=0)
+    def test_single_use_is_written_when_the_request_finishes(self):
+        self.client.get(reverse('api:catalog'), **self.auth)
+        self.assertIsNotNone(SecuritySettings.objects.get(pk=self.security.pk).api_token_last_used)
+
+    def test_flush_writes_each_token_its_own_timestamp(self):
+        from accounts.api_tokens import _usage
+
+        other = User.objects.create_user('erp2@test.com', 'x', status=User.STATUS_ACTIVE, email_verified=True)
+        other_security = other.get_or_create_security()
+        issue_token(other_security)
+        earlier = timezone.now() - timedelta(minutes=4)
+        with mock.patch('accounts.api_tokens.timezone.now', return_value=earlier):
+            _usage.note(self.security.pk)
+        _usage.note(other_security.pk)
+
+        self.assertEqual(flush_usage(), 2)
+        used = dict(SecuritySettings.objects.values_list('pk', 'api_token_last_used'))
+        self.assertEqual(used[self.security.pk], earlier)
+        self.assertGreater(used[other_security.pk], earlier)
+
+    def test_revocation_and_user_changes_invalidate_cache(self):
+        url = reverse('api:catalog')
+        self.assertEqual(self.client.get(url, **self.auth).status_code, 200)
+        revoke_token(SecuritySettings.objects.get(pk=self.security.pk))
+        self.assertEqual(self.client.get(url, **self.auth).status_code, 401)
+
+        token = issue_token(SecuritySettings.objects.get(pk=self.security.pk))
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        self.assertEqual(self.client.get(url, **auth).status_code, 200)
+        self.user.status = User.STATUS_REJECTED
+        self.user.save()
+        self.assertEqual(self.client.get(url, **auth).status_code, 401)
+
+    def test_profile_views_issue_and_revoke(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('accounts:generate_api_token'), follow=True)
+        shown = [str(m) for m in response.context['messages']][0].rsplit(' ', 1)[-1]
+        self.assertEqual(self.client.get(reverse('api:catalog'), HTTP_AUTHORIZATION=f'Bearer {shown}').status_code, 200)
+        self.assertEqual(self.client.get(reverse('api:catalog'), **self.auth).status_code, 401)
+
+        self.client.post(reverse('accounts:revoke_api_token'))
+        self.assertEqual(
+            self.client.get(reverse('api:catalog'), HTTP_AUTHORIZATION=f'Bearer {shown}').status_code, 401,
+        )
+
+
+class ApiCatalogTests(ApiTestCase):
+
+    def test_catalog_pages_and_supports_conditional_get(self):
+        Product.objects.create(name_es='Oculto', name_zh_hans='-', price=1, is_active=False)
+        response = self.client.get(reverse('api:catalog'), {'limit': 1}, **self.auth)
+        data = response.json()
+        self.assertEqual([p['id'] for p in data['results']], [self.jamon.pk])
+        self.assertEqual(data['results'][0]['stock_free'], 5)
+
+        second = self.client.get(reverse('api:catalog'), {'limit': 1, 'cursor': data['next_cursor']}, **self.auth).json()
+        self.assertEqual([p['id'] for p in second['results']], [self.queso.pk])
+        self.assertIsNone(second['next_cursor'])
+
+        etag = self.client.get(reverse('api:catalog'), **self.auth)['ETag']
+        not_modified = self.client.get(reverse('api:catalog'), HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(not_modified.status_code, 304)
+
+        Product.objects.filter(pk=self.queso.pk).update(price=Decimal('13.00'))
+        changed = self.client.get(reverse('api:catalog'), HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+
+class ApiOrderSubmissionTests(ApiTestCase):
+
+    def test_bulk_submission_creates_orders_and_rejects_without_stock(self):
+        payload = {'orders': [
+            {'reference': 'R-1', 'items': [{'product_id': self.jamon.pk, 'quantity': 3},
+                                           {'product_id': self.queso.pk, 'quantity': 2}]},
+            {'reference': 'R-2', 'items': [{'product_id': self.jamon.pk, 'quantity': 3}]},
+            {'reference': 'R-3', 'items': [{'product_id': 999999, 'quantity': 1}]},
+            {'reference': 'R-4', 'items': [{'product_id': self.queso.pk, 'quantity': 4}]},
+        ]}
+        response = self.post_orders(payload)
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['created'], data['rejected']), (2, 2))
+        statuses = {r['reference']: (r['status'], r.get('error')) for r in data['results']}
+        self.assertEqual(statuses['R-2'], ('rejected', 'insufficient_stock'))
+        self.assertEqual(statuses['R-3'], ('rejected', 'unavailable_products'))
+        self.assertEqual(data['results'][0]['order']['total_amount'], '295.00')
+
+        self.assertEqual(Order.objects.filter(customer=self.user).count(), 2)
+        self.jamon.refresh_from_db()
+        self.assertEqual(self.jamon.stock_reserved, 3)
+
+    def test_invalid_payload_and_incomplete_profile(self):
+        response = self.post_orders({'orders': [{'items': [{'product_id': self.jamon.pk, 'quantity': 0}]}]})
+        self.assertEqual(response.status_code, 400)
+        with override_settings(API_MAX_ORDERS_PER_REQUEST=1):
+            payload = {'orders': [{'items': [{'product_id': self.queso.pk, 'quantity': 1}]}] * 2}
+            self.assertEqual(self.post_orders(payload).status_code, 400)
+
+        self.user.telefono_reparto = ''
+        self.user.save()
+        response = self.post_orders({'orders': [{'items': [{'product_id': self.queso.pk, 'quantity': 1}]}]})
+        self.assertEqual(response.status_code, 403)
+
+    def test_idempotency_key_replays_and_detects_reuse(self):
+        payload = {'orders': [{'reference': 'R-1', 'items': [{'product_id': self.queso.pk, 'quantity': 1}]}]}
+        first = self.post_orders(payload, HTTP_IDEMPOTENCY_KEY='lote-1')
+        again = self.post_orders(payload, HTTP_IDEMPOTENCY_KEY='lote-1')
+        self.assertEqual(again.status_code, 201)
+        self.assertEqual(again['Idempotent-Replayed'], 'true')
+        self.assertEqual(again.json(), first.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+        payload['orders'][0]['reference'] = 'R-2'
+        self.assertEqual(self.post_orders(payload, HTTP_IDEMPOTENCY_KEY='lote-1').status_code, 422)
+
+    def test_in_progress_key_returns_conflict(self):
+        body = json.dumps({'orders': [{'items': [{'product_id': self.queso.pk, 'quantity': 1}]}]})
+        IdempotencyKey.objects.create(user=self.user, key='lote-3', request_hash=hashlib.sha256(body.encode()).hexdigest())
+        response = self.client.post(
+            reverse('api:orders'), body, content_type='application/json',
+            HTTP_IDEMPOTENCY_KEY='lote-3', **self.auth,
+        )
+        self.assertEqual(response.status_code, 409)
+
+        # Reserva abandonada (worker caído): el reintento la reclama
+        IdempotencyKey.objects.filter(key='lote-3').update(created_at=timezone.now() - timedelta(minutes=10))
+        response = self.client.post(
+            reverse('api:orders'), body, content_type='application/json',
+            HTTP_IDEMPOTENCY_KEY='lote-3', **self.auth,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get(key='lote-3').response_status, 201)
+
+    def test_purge_command_removes_expired_keys(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        IdempotencyKey.objects.create(user=self.user, key='vieja', request_hash='x', response_status=201)
+        IdempotencyKey.objects.create(user=self.user, key='nueva', request_hash='x', response_status=201)
+        IdempotencyKey.objects.filter(key='vieja').update(created_at=timezone.now() - timedelta(hours=25))
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['nueva'])
+
+
+class ApiOrderPollingTests(ApiTestCase):
+
+    def test_updated_since_returns_changed_orders(self):
+        from orders.services.transitions import transition
+
+        self.post_orders({'orders': [
+            {'items': [{'product_id': self.queso.pk, 'quantity': 1}]},
+            {'items': [{'product_id': self.queso.pk, 'quantity': 2}]},
+        ]})
+        listing = self.client.get(reverse('api:orders'), **self.auth).json()
+        self.assertEqual(len(listing['results']), 2)
+
+        changed = Order.objects.order_by('pk').first()
+        transition(changed, Order.STATUS_CONFIRMED, self.user)
+        polled = self.client.get(
+            reverse('api:orders'), {'updated_since': listing['server_time']}, **self.auth,
+        ).json()
+        self.assertEqual([(o['id'], o['status']) for o in polled['results']], [(changed.pk, 'confirmed')])
+
+        bad = self.client.get(reverse('api:orders'), {'updated_since': 'ayer'}, **self.auth)
+        self.assertEqual(bad.status_code, 400)
@@ -0,0 +1,13 @@
+"""
+URLs de la API B2B, montadas en /api/v1/.
+"""
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('catalog/', views.catalog, name='catalog'),
+    path('orders/', views.orders, name='orders'),
+]
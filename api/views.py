@@ -0,0 +1,242 @@
+"""
+API JSON v1 para integraciones B2B (ERP de clientes).
+
+- ``GET  catalog/``  productos activos, paginados por cursor, con ETag.
+- ``GET  orders/``   pedidos del cliente; ``?updated_since=`` para sondear cambios.
+- ``POST orders/``   varios pedidos por petición sobre ``place_orders``;
+  admite ``Idempotency-Key`` para reintentos seguros.
+"""
+import hashlib
+import json
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+
+from catalog.models import Product
+from core.pagination import KeysetPaginator
+from orders.models import Order
+from orders.services.checkout import place_orders
+
+from .auth import api_error, api_view
+from .models import IdempotencyKey
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def _page_size(request) -> int:
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    return max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+
+def _serialize_product(product) -> dict:
+    return {
+        'id': product.pk,
+        'name_es': product.name_es,
+        'name_zh_hans': product.name_zh_hans,
+        'price': str(product.price),
+        'unit_display': product.unit_display,
+        'stock_status': product.stock_status,
+        'stock_free': product.stock_free,
+    }
+
+
+def _serialize_order(order) -> dict:
+    return {
+        'id': order.pk,
+        'status': order.status,
+        'total_amount': str(order.total_amount),
+        'created_at': order.created_at,
+        'updated_at': order.updated_at,
+        'delivered_at': order.delivered_at,
+    }
+
+
+# ----------------------------------------------------------------------
+# Catálogo
+# ----------------------------------------------------------------------
+
+@api_view(['GET'])
+def catalog(request):
+    """
+    Catálogo activo. El ETag es el hash del contenido de la página: si el
+    cliente envía ``If-None-Match`` con el mismo valor recibe 304 sin cuerpo.
+    """
+    qs = Product.objects.filter(is_active=True).only(
+        'pk', 'name_es', 'name_zh_hans', 'price', 'unit_display',
+        'stock_status', 'stock_available', 'stock_reserved',
+    )
+    page = KeysetPaginator(qs, ordering=('pk',), per_page=_page_size(request)).page(request.GET.get('cursor'))
+    payload = {
+        'results': [_serialize_product(p) for p in page],
+        'next_cursor': page.next_cursor,
+    }
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+# ----------------------------------------------------------------------
+# Pedidos
+# ----------------------------------------------------------------------
+
+@api_view(['GET', 'POST'])
+def orders(request):
+    if request.method == 'POST':
+        return _submit_orders(request)
+    return _list_orders(request)
+
+
+def _list_orders(request):
+    """Pedidos del cliente ordenados por (updated_at, id); ``server_time`` sirve de próximo ``updated_since``."""
+    server_time = timezone.now()
+    qs = Order.objects.filter(customer=request.user)
+    updated_since = request.GET.get('updated_since')
+    if updated_since:
+        since = parse_datetime(updated_since.replace(' ', '+'))
+        if since is None:
+            return api_error(400, 'invalid_updated_since', 'Fecha ISO 8601 no válida')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, dt_timezone.utc)
+        qs = qs.filter(updated_at__gt=since)
+
+    page = KeysetPaginator(
+        qs, ordering=('updated_at', 'pk'), per_page=_page_size(request),
+    ).page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [_serialize_order(o) for o in page],
+        'next_cursor': page.next_cursor,
+        'server_time': server_time,
+    })
+
+
+class _InvalidPayload(ValueError):
+    pass
+
+
+def _parse_orders_payload(body: bytes) -> list[dict]:
+    """Valida ``{"orders": [{"reference", "items": [{"product_id", "quantity"}]}]}``."""
+    try:
+        data = json.loads(body or b'null')
+    except (ValueError, UnicodeDecodeError):
+        raise _InvalidPayload('JSON inválido')
+    entries = data.get('orders') if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise _InvalidPayload('Se espera una lista "orders" no vacía')
+    if len(entries) > settings.API_MAX_ORDERS_PER_REQUEST:
+        raise _InvalidPayload(f'Máximo {settings.API_MAX_ORDERS_PER_REQUEST} pedidos por petición')
+
+    parsed = []
+    for index, entry in enumerate(entries):
+        items = entry.get('items') if isinstance(entry, dict) else None
+        if not isinstance(items, list) or not items:
+            raise _InvalidPayload(f'orders[{index}]: se espera una lista "items" no vacía')
+        cart = {}
+        for item in items:
+            try:
+                product_id, quantity = int(item['product_id']), int(item['quantity'])
+            except (KeyError, TypeError, ValueError):
+                raise _InvalidPayload(f'orders[{index}]: cada línea necesita product_id y quantity enteros')
+            if quantity <= 0:
+                raise _InvalidPayload(f'orders[{index}]: quantity debe ser mayor que 0')
+            cart[product_id] = cart.get(product_id, 0) + quantity
+        parsed.append({'reference': str(entry.get('reference') or '')[:100], 'cart': cart})
+    return parsed
+
+
+def _submit_orders(request):
+    if not request.user.profile_completed:
+        return api_error(403, 'profile_incomplete', 'Completa el perfil operativo antes de hacer pedidos')
+
+    key = request.headers.get('Idempotency-Key', '').strip()
+    if not key:
+        status, body = _create_orders(request)
+        return JsonResponse(body, status=status)
+    if len(key) > 100:
+        return api_error(400, 'invalid_idempotency_key', 'Idempotency-Key admite como máximo 100 caracteres')
+
+    request_hash = hashlib.sha256(request.body).hexdigest()
+    record, replay = _claim_idempotency_key(request.user, key, request_hash)
+    if replay is not None:
+        return replay
+    try:
+        status, body = _create_orders(request)
+    except Exception:
+        record.delete()
+        raise
+    if status >= 500:
+        record.delete()
+    else:
+        IdempotencyKey.objects.filter(pk=record.pk).update(response_status=status, response_body=body)
+    return JsonResponse(body, status=status)
+
+
+def _claim_idempotency_key(user, key: str, request_hash: str):
+    """
+    Reserva la clave (fila con ``response_status`` nulo). Devuelve
+    ``(registro, None)`` si esta petición debe procesarse, o
+    ``(None, respuesta)`` para repetir la respuesta guardada o rechazar.
+    """
+    for _attempt in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user=user, key=key, request_hash=request_hash), None
+        except IntegrityError:
+            pass
+        existing = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if existing is None:
+            continue
+        if existing.is_expired or existing.is_abandoned:
+            # Condicionado a la fila leída: si otro reintento la reclamó antes, no se toca
+            IdempotencyKey.objects.filter(pk=existing.pk, created_at=existing.created_at).delete()
+            continue
+        if existing.request_hash != request_hash:
+            return None, api_error(422, 'idempotency_key_reused', 'La clave ya se usó con otro cuerpo')
+        if existing.response_status is None:
+            return None, api_error(409, 'request_in_progress', 'La petición original aún se está procesando')
+        response = JsonResponse(existing.response_body, status=existing.response_status)
+        response['Idempotent-Replayed'] = 'true'
+        return None, response
+    return None, api_error(409, 'request_in_progress', 'La petición original aún se está procesando')
+
+
+def _create_orders(request) -> tuple[int, dict]:
+    try:
+        entries = _parse_orders_payload(request.body)
+    except _InvalidPayload as exc:
+        return 400, {'error': 'invalid_payload', 'message': str(exc)}
+
+    outcomes = place_orders(request.user, [entry['cart'] for entry in entries])
+    results = []
+    for entry, outcome in zip(entries, outcomes):
+        if outcome.order is not None:
+            results.append({
+                'reference': entry['reference'], 'status': 'created',
+                'order': _serialize_order(outcome.order),
+            })
+        else:
+            results.append({
+                'reference': entry['reference'], 'status': 'rejected',
+                'error': outcome.error, 'product_id': outcome.product_id,
+            })
+    created = sum(1 for r in results if r['status'] == 'created')
+    body = json.loads(json.dumps(
+        {'created': created, 'rejected': len(results) - created, 'results': results},
+        cls=DjangoJSONEncoder,
+    ))
+    return (201 if created else 422), body
@@ -0,0 +1,60 @@
+"""
+Dataset sintético para los benchmarks de vistas.
+
+Usa el mismo generador que ``seed_fenix`` (``core.seeding``) con una semilla
+fija: dos ejecuciones producen los mismos datos y, por tanto, los mismos
+recuentos de consultas.
+"""
+from dataclasses import dataclass
+
+from django.db.models import Count
+
+from accounts.models import User
+from catalog.models import Product
+from core.seeding import SEED_PASSWORD, FenixSeeder, SeedConfig
+from orders.models import Order
+
+PASSWORD = SEED_PASSWORD
+
+BENCHMARK_CONFIG = SeedConfig(
+    companies=30,
+    users=1000,
+    products=2000,
+    orders=3000,
+    recurring=50,
+    notifications=1500,
+    sessions=500,
+    days=180,
+    seed=2026,
+)
+
+
+@dataclass
+class Dataset:
+    super_admin: User
+    admin: User
+    customer: User
+    products: list
+    orders: list
+
+
+def build_dataset(config: SeedConfig = BENCHMARK_CONFIG) -> Dataset:
+    result = FenixSeeder(config).run()
+    super_admin = User.objects.create_superuser('bench-super@fenix.test', PASSWORD, full_name='Bench Super')
+
+    # Cliente activo con más pedidos (el caso más pesado de sus vistas)
+    top = (
+        Order.objects.filter(customer__status=User.STATUS_ACTIVE, customer__is_staff=False)
+        .values('customer').annotate(n=Count('pk')).order_by('-n', 'customer')
+        .first()
+    )
+    customer = User.objects.get(pk=top['customer'])
+    return Dataset(
+        super_admin=super_admin,
+        admin=User.objects.get(pk=result.staff_ids[0]),
+        customer=customer,
+        products=list(
+            Product.objects.filter(pk__in=result.product_ids[:50], stock_available__gte=100).order_by('pk')
+        ),
+        orders=list(Order.objects.filter(customer=customer).order_by('-created_at')),
+    )
@@ -0,0 +1,39 @@
+from django.test import TestCase
+
+from catalog.models import Product
+from core.seeding import FenixSeeder, SeedConfig
+from orders.models import Order, OrderItem
+
+SMALL = dict(companies=3, users=20, products=30, orders=60, recurring=5,
+             notifications=40, sessions=10, batch_size=25)
+
+
+class SeedFenixTests(TestCase):
+    """Tests del generador de datos sintéticos (core.seeding)"""
+
+    def test_counts_and_consistency(self):
+        result = FenixSeeder(SeedConfig(**SMALL)).run()
+
+        self.assertEqual(result.counts['orders'], 60)
+        self.assertEqual(Order.objects.count(), 60)
+        self.assertEqual(result.counts['order_items'], OrderItem.objects.count())
+        # Total del pedido = suma de sus líneas; libro de stock cuadrado
+        for order in Order.objects.prefetch_related('items')[:10]:
+            self.assertEqual(order.total_amount, sum(i.line_total for i in order.items.all()))
+        for product in Product.objects.prefetch_related('stock_movements'):
+            self.assertEqual(product.stock_available, sum(m.quantity for m in product.stock_movements.all()))
+
+    def test_same_seed_same_data(self):
+        from catalog.models import StockMovement
+
+        config = SeedConfig(companies=0, users=0, products=40, orders=0, recurring=0, sessions=0, seed=7)
+
+        def snapshot():
+            return list(Product.objects.order_by('pk').values_list('name_es', 'price', 'stock_available'))
+
+        FenixSeeder(config).run()
+        first = snapshot()
+        StockMovement.objects.all().delete()
+        Product.objects.all().delete()
+        FenixSeeder(config).run()
+        self.assertEqual(snapshot(), first)
@@ -0,0 +1,203 @@
+"""
+Benchmarks de consultas y latencia de las vistas principales.
+
+Se omiten en la ejecución normal de tests. Para ejecutarlos (SQLite, sin
+servicios externos):
+
+    USE_SQLITE_DEV=1 FENIX_BENCHMARK=1 python manage.py test benchmarks
+
+Cada vista se compara con ``baselines.json``: falla si hace más consultas que
+la línea base o si la mediana de tiempo supera la base multiplicada por
+``FENIX_BENCHMARK_TOLERANCE`` (2.0 por defecto). Con
+``FENIX_BENCHMARK_UPDATE=1`` se reescriben las líneas base con los valores
+medidos.
+"""
+import json
+import os
+import statistics
+import time
+import unittest
+from pathlib import Path
+
+from django.contrib.auth import get_user
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+from orders.services.cart import UserCart
+
+from .dataset import build_dataset
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+ENABLED = os.getenv('FENIX_BENCHMARK', '').lower() in ('1', 'true', 'yes')
+UPDATE = os.getenv('FENIX_BENCHMARK_UPDATE', '').lower() in ('1', 'true', 'yes')
+TOLERANCE = float(os.getenv('FENIX_BENCHMARK_TOLERANCE', '2.0'))
+RUNS = int(os.getenv('FENIX_BENCHMARK_RUNS', '5'))
+
+
+def load_baselines() -> dict:
+    if BASELINES_PATH.exists():
+        return json.loads(BASELINES_PATH.read_text(encoding='utf-8'))
+    return {}
+
+
+@unittest.skipUnless(ENABLED, 'Benchmarks desactivados (FENIX_BENCHMARK=1 para ejecutarlos)')
+class ViewBenchmarks(TestCase):
+    results: dict = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+        cls.baselines = load_baselines()
+
+    @classmethod
+    def tearDownClass(cls):
+        if UPDATE and cls.results:
+            baselines = load_baselines()
+            baselines.update(cls.results)
+            BASELINES_PATH.write_text(
+                json.dumps(dict(sorted(baselines.items())), indent=2) + '\n', encoding='utf-8',
+            )
+        super().tearDownClass()
+
+    def _measure(self, name, user, method, url, data=None, before=None, expected_status=200, headers=None):
+        self.client.force_login(user)
+        request = getattr(self.client, method)
+        if before:
+            before()
+        request(url, data)  # calentamiento: registro de sesión, cachés
+        headers = headers(url) if callable(headers) else headers or {}
+        timings = []
+        for _ in range(RUNS):
+            if before:
+                before()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = request(url, data, **headers)
+                timings.append((time.perf_counter() - start) * 1000)
+            self.assertEqual(response.status_code, expected_status, name)
+        self._check(name, len(ctx), timings)
+
+    def _check(self, name, queries, timings):
+        measured = {'queries': queries, 'ms': round(statistics.median(timings), 1)}
+        type(self).results[name] = measured
+        baseline = self.baselines.get(name)
+        if UPDATE or baseline is None:
+            return
+        self.assertLessEqual(
+            measured['queries'], baseline['queries'],
+            f'{name}: {measured["queries"]} consultas (línea base {baseline["queries"]})',
+        )
+        self.assertLessEqual(
+            measured['ms'], baseline['ms'] * TOLERANCE,
+            f'{name}: {measured["ms"]} ms (línea base {baseline["ms"]} ms x {TOLERANCE})',
+        )
+
+    def _fill_cart(self):
+        UserCart(self.data.customer).update({p.pk: 2 for p in self.data.products[:5]})
+
+    def test_product_list(self):
+        self._measure('product_list', self.data.customer, 'get', reverse('catalog:product_list'))
+
+    def _if_none_match(self, url):
+        return {'HTTP_IF_NONE_MATCH': self.client.get(url)['ETag']}
+
+    def test_product_list_not_modified(self):
+        self._measure(
+            'product_list_304', self.data.customer, 'get', reverse('catalog:product_list'),
+            headers=self._if_none_match, expected_status=304,
+        )
+
+    def test_cart_view(self):
+        self._measure('cart_view', self.data.customer, 'get', reverse('orders:cart'), before=self._fill_cart)
+
+    def test_order_create(self):
+        from orders.models import Order
+
+        before = Order.objects.count()
+        self._measure(
+            'order_create', self.data.customer, 'post', reverse('orders:order_create'),
+            before=self._fill_cart, expected_status=302,
+        )
+        self.assertEqual(Order.objects.count(), before + RUNS + 1)
+
+    def test_order_list_user(self):
+        self._measure('order_list_user', self.data.customer, 'get', reverse('orders:order_list'))
+
+    def test_order_list_admin(self):
+        self._measure('order_list_admin', self.data.admin, 'get', reverse('orders:order_list'))
+
+    def test_order_manage_list(self):
+        self._measure('order_manage_list', self.data.admin, 'get', reverse('orders:order_manage_list'))
+
+    def test_order_detail(self):
+        order = self.data.orders[0]
+        self._measure('order_detail', self.data.customer, 'get', reverse('orders:order_detail', args=[order.pk]))
+
+    def test_order_detail_not_modified(self):
+        order = self.data.orders[0]
+        self._measure(
+            'order_detail_304', self.data.customer, 'get', reverse('orders:order_detail', args=[order.pk]),
+            headers=self._if_none_match, expected_status=304,
+        )
+
+    def test_global_search(self):
+        self._measure('global_search', self.data.admin, 'get', reverse('global_search'), data={'q': 'Producto 01'})
+
+    def test_dashboard_view(self):
+        self._measure('dashboard_view', self.data.customer, 'get', reverse('accounts:dashboard'))
+
+    def test_user_approval_list(self):
+        self._measure('user_approval_list', self.data.super_admin, 'get', reverse('accounts:user_approval_list'))
+
+    def _measure_middleware(self, name, middleware_class, path, user=None, calls=1000):
+        """Coste del middleware solo (sin vista): ms por ``calls`` peticiones."""
+        middleware = middleware_class(lambda request: HttpResponse())
+        session = SessionStore()
+        if user is not None:
+            self.client.force_login(user)
+            session = SessionStore(self.client.session.session_key)
+        session.load()
+
+        def run():
+            for _ in range(calls):
+                request = RequestFactory().get(path)
+                request.session = session
+                request.user = SimpleLazyObject(lambda: get_user(request))
+                middleware(request)
+
+        run()  # calentamiento: veredicto e idioma en la sesión
+        timings = []
+        for _ in range(RUNS):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+        self._check(name, len(ctx), timings)
+
+    def test_approval_middleware_active_user(self):
+        from accounts.middleware import UserApprovalMiddleware
+
+        self._measure_middleware(
+            'approval_middleware_active_x1000', UserApprovalMiddleware,
+            reverse('catalog:product_list'), user=self.data.customer,
+        )
+
+    def test_approval_middleware_anonymous(self):
+        from accounts.middleware import UserApprovalMiddleware
+
+        self._measure_middleware(
+            'approval_middleware_anonymous_x1000', UserApprovalMiddleware, reverse('catalog:product_list'),
+        )
+
+    def test_approval_middleware_static(self):
+        from accounts.middleware import UserApprovalMiddleware
+
+        self._measure_middleware(
+            'approval_middleware_static_x1000', UserApprovalMiddleware, '/static/css/app.css',
+            user=self.data.customer,
+        )
@@ -1,29 +1,72 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.helpers import ActionForm
+from django.utils import timezone
 from django.utils.html import format_html, mark_safe
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 import logging
-from .models import Product
+
+from .alerts import invalidate_low_stock_cache
+from .models import Product, StockMovement, StockReservation
+from .stock import adjust_stock, record_stock_set
 from .utils import translate_product_fields
 
 logger = logging.getLogger(__name__)
 
 
+class ProductActionForm(ActionForm):
+    """Formulario de acciones con el ajuste para 'Ajustar stock'."""
+    stock_adjustment = forms.IntegerField(
+        required=False,
+        label='Ajuste de stock (+/-)',
+        widget=forms.NumberInput(attrs={'style': 'width: 6em;'}),
+    )
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = (
         'id', 'name_es', 'name_zh_hans', 'price', 'unit_display', 'stock_available',
-        'stock_min_threshold', 'stock_status', 'is_active', 'created_at',
+        'stock_min_threshold', 'stock_reserved', 'stock_status', 'is_active', 'created_at',
     )
     list_filter = ('stock_status', 'is_active')
     search_fields = ('name_es', 'name_zh_hans')
-    readonly_fields = ('stock_status', 'created_at', 'image_preview', 'translate_button')
+    readonly_fields = ('stock_status', 'stock_reserved', 'created_at', 'updated_at', 'image_preview', 'translate_button')
+    action_form = ProductActionForm
+    actions = ('activate_products', 'deactivate_products', 'adjust_stock_bulk')
     fieldsets = (
         (None, {'fields': ('name_es', 'name_zh_hans', 'description_es', 'description_zh_hans', 'translate_button', 'image', 'image_preview', 'price', 'unit_display', 'is_active')}),
-        ('Stock (solo managers)', {'fields': ('stock_available', 'stock_min_threshold', 'stock_status')}),
-        ('Auditoría', {'fields': ('created_at',)}),
+        ('Stock (solo managers)', {'fields': ('stock_available', 'stock_min_threshold', 'stock_reserved', 'stock_status')}),
+        ('Auditoría', {'fields': ('created_at', 'updated_at')}),
     )
     
+    @admin.action(description='Activar productos seleccionados', permissions=['change'])
+    def activate_products(self, request, queryset):
+        updated = queryset.update(is_active=True, updated_at=timezone.now())
+        invalidate_low_stock_cache()
+        self.message_user(request, f'{updated} productos activados.', messages.SUCCESS)
+
+    @admin.action(description='Desactivar productos seleccionados', permissions=['change'])
+    def deactivate_products(self, request, queryset):
+        updated = queryset.update(is_active=False, updated_at=timezone.now())
+        invalidate_low_stock_cache()
+        self.message_user(request, f'{updated} productos desactivados.', messages.SUCCESS)
+
+    @admin.action(description='Ajustar stock (+/-) de los seleccionados', permissions=['change'])
+    def adjust_stock_bulk(self, request, queryset):
+        try:
+            adjustment = int(request.POST.get('stock_adjustment') or 0)
+        except ValueError:
+            adjustment = 0
+        if not adjustment:
+            self.message_user(request, 'Indica un ajuste de stock distinto de 0.', messages.WARNING)
+            return
+        updated = adjust_stock(queryset, adjustment, user=request.user, note='Ajuste masivo desde admin')
+        self.message_user(
+            request, f'Stock ajustado en {adjustment:+d} para {updated} productos.', messages.SUCCESS,
+        )
+
     def image_preview(self, obj):
         """Muestra una vista previa de la imagen en el admin"""
         if obj is None:
@@ -179,5 +222,49 @@ class ProductAdmin(admin.ModelAdmin):
             except Exception as e:
                 messages.warning(request, _('No se pudo traducir automáticamente: %(error)s') % {'error': str(e)})
         
+        previous_stock = form.initial.get('stock_available', 0) if change else 0
         super().save_model(request, obj, form, change)
+        # El saldo editado a mano queda registrado en el libro de stock
+        record_stock_set(
+            obj, previous_stock, user=request.user,
+            kind=StockMovement.KIND_MANUAL_ADJUSTMENT if change else StockMovement.KIND_IMPORT,
+            note='Edición desde admin' if change else 'Stock inicial',
+        )
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('id', 'product', 'kind', 'quantity', 'order', 'created_by', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('product__name_es', 'note')
+    raw_id_fields = ('product', 'order', 'created_by')
+    date_hierarchy = 'created_at'
+
+    # Libro de solo inserción: no se edita ni se borra desde el admin
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'product', 'order', 'quantity', 'status', 'expires_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('product__name_es',)
+    raw_id_fields = ('product', 'order')
+
+    # Se gestionan desde catalog.reservations (checkout, transiciones y caducidad)
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
+    def has_delete_permission(self, request, obj=None):
+        return False
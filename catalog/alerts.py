@@ -0,0 +1,152 @@
+"""
+Alertas de bajo stock.
+
+Se disparan por transiciones de ``Product.stock_status`` (no por el estado en
+sí) detectadas en los dos caminos que lo recalculan:
+
+- ``catalog.stock.refresh_stock_status`` (libro de stock, modo bulk, acciones
+  masivas): compara el estado guardado con el calculado antes del UPDATE.
+- ``Product.save``: compara con el estado cargado de la base de datos.
+
+Cada transición hacia BAJO/SIN STOCK se agrupa por producto y ventana
+(``STOCK_ALERT_WINDOW_MINUTES``) con ``cache.add``: un producto que oscila
+alrededor del umbral genera una sola alerta por ventana. Las alertas de un
+mismo cambio se envían juntas (un email y/o un WhatsApp) en un hilo tras el
+commit.
+
+La lista de productos en alerta del dashboard se cachea y se invalida cuando
+cambia el estado o el saldo de un producto en alerta.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+ALERT_STATUSES = (Product.STOCK_LOW, Product.STOCK_OUT)
+LOW_STOCK_CACHE_KEY = 'catalog:low_stock_products'
+LOW_STOCK_CACHE_TIMEOUT = 60 * 60
+DASHBOARD_LIMIT = 10
+
+
+def _alert_key(product_id: int) -> str:
+    return f'catalog:stock_alert:{product_id}'
+
+
+def alert_window_seconds() -> int:
+    return getattr(settings, 'STOCK_ALERT_WINDOW_MINUTES', 360) * 60
+
+
+def alert_channels() -> set[str]:
+    return set(getattr(settings, 'STOCK_ALERT_CHANNELS', ('email',)))
+
+
+# ----------------------------------------------------------------------
+# Lista cacheada para el dashboard
+# ----------------------------------------------------------------------
+
+def get_low_stock_products() -> list[dict]:
+    """Productos activos en BAJO/SIN STOCK (máx. ``DASHBOARD_LIMIT``), desde caché."""
+    products = cache.get(LOW_STOCK_CACHE_KEY)
+    if products is None:
+        products = list(
+            Product.objects.filter(stock_status__in=ALERT_STATUSES, is_active=True)
+            .order_by('stock_available', 'name_es')
+            .values('pk', 'name_es', 'stock_available', 'stock_status')[:DASHBOARD_LIMIT]
+        )
+        cache.set(LOW_STOCK_CACHE_KEY, products, LOW_STOCK_CACHE_TIMEOUT)
+    return products
+
+
+def invalidate_low_stock_cache() -> None:
+    transaction.on_commit(lambda: cache.delete(LOW_STOCK_CACHE_KEY))
+
+
+# ----------------------------------------------------------------------
+# Transiciones
+# ----------------------------------------------------------------------
+
+def handle_status_changes(changes) -> None:
+    """
+    Procesa ``[(product_id, old_status, new_status)]`` de productos cuyo estado
+    o saldo ha cambiado (``old_status == new_status`` si solo cambió el saldo).
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    if any(old in ALERT_STATUSES or new in ALERT_STATUSES for _pk, old, new in changes):
+        invalidate_low_stock_cache()
+
+    alerts = [
+        (pk, new) for pk, old, new in changes
+        if new in ALERT_STATUSES and old != new and _severity(new) > _severity(old)
+    ]
+    if alerts:
+        transaction.on_commit(lambda: _dispatch(alerts))
+
+
+def _severity(status: str | None) -> int:
+    return {Product.STOCK_LOW: 1, Product.STOCK_OUT: 2}.get(status, 0)
+
+
+def _dispatch(alerts) -> None:
+    """Filtra por ventana (``cache.add`` es atómico) y envía en un hilo."""
+    window = alert_window_seconds()
+    pending = [(pk, status) for pk, status in alerts if cache.add(_alert_key(pk), status, window)]
+    if not pending:
+        return
+    threading.Thread(
+        target=_send_alerts_safe,
+        args=(pending,),
+        name=f'stock-alerts-{len(pending)}',
+        daemon=True,
+    ).start()
+
+
+def _send_alerts_safe(alerts) -> None:
+    try:
+        send_stock_alerts(alerts)
+    except Exception:
+        logger.exception('Error enviando alertas de stock')
+
+
+def send_stock_alerts(alerts) -> None:
+    """Envía un único mensaje con todos los productos de ``[(product_id, status)]``."""
+    products = Product.objects.in_bulk([pk for pk, _status in alerts])
+    labels = dict(Product.STOCK_STATUS_CHOICES)
+    lines = [
+        f'- {products[pk].name_es}: {labels[status]} (stock {products[pk].stock_available}, '
+        f'mínimo {products[pk].stock_min_threshold})'
+        for pk, status in alerts if pk in products
+    ]
+    if not lines:
+        return
+    text = 'Alerta de stock FENIX:\n' + '\n'.join(lines)
+    channels = alert_channels()
+
+    if 'email' in channels:
+        from django.core.mail import send_mail
+        from core.models import PlatformSettings
+
+        platform = PlatformSettings.get_settings()
+        send_mail(
+            subject=f'Alerta de stock: {len(lines)} producto(s)',
+            message=text,
+            from_email=platform.email_from or settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[platform.order_notification_email],
+            fail_silently=False,
+        )
+
+    if 'whatsapp' in channels:
+        from whatsapp.services import send_whatsapp_message
+
+        result = send_whatsapp_message(text)
+        if not result.get('success'):
+            logger.warning('Alerta de stock por WhatsApp no enviada: %s', result.get('error'))
+
+    logger.info('Alerta de stock enviada (%s productos, canales %s)', len(lines), sorted(channels))
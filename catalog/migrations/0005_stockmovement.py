@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_product_unit_display'),
+        ('orders', '0004_alter_order_options_alter_orderevent_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('order_deduction', 'Descuento por pedido'), ('order_cancellation', 'Devolución por cancelación'), ('manual_adjustment', 'Ajuste manual'), ('import', 'Carga / importación')], max_length=20, verbose_name='Tipo')),
+                ('quantity', models.IntegerField(help_text='Variación aplicada al stock (+ entrada, - salida)', verbose_name='Cantidad')),
+                ('note', models.CharField(blank=True, max_length=255, verbose_name='Nota')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='orders.order', verbose_name='Pedido')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='catalog.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de stock',
+                'verbose_name_plural': 'Movimientos de stock',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['product', 'created_at'], name='catalog_sto_product_3ba182_idx'), models.Index(fields=['order', 'kind'], name='catalog_sto_order_i_c9e86e_idx')],
+            },
+        ),
+    ]
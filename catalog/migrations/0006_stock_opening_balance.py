@@ -0,0 +1,40 @@
+# Generated migration: saldo de apertura del libro de stock
+from django.db import migrations
+
+
+def create_opening_balances(apps, schema_editor):
+    """
+    Un movimiento 'import' por producto con el stock actual, para que la suma
+    del libro coincida con stock_available desde el primer día.
+    """
+    Product = apps.get_model('catalog', 'Product')
+    StockMovement = apps.get_model('catalog', 'StockMovement')
+
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                product_id=pk,
+                kind='import',
+                quantity=stock,
+                note='Saldo de apertura',
+            )
+            for pk, stock in Product.objects.exclude(stock_available=0).values_list('pk', 'stock_available').iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+def delete_opening_balances(apps, schema_editor):
+    StockMovement = apps.get_model('catalog', 'StockMovement')
+    StockMovement.objects.filter(kind='import', note='Saldo de apertura').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_stockmovement'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_opening_balances, delete_opening_balances),
+    ]
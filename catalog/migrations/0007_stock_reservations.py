@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_stock_opening_balance'),
+        ('orders', '0004_alter_order_options_alter_orderevent_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_reserved',
+            field=models.IntegerField(default=0, help_text='Unidades retenidas por pedidos aún no preparados (ver StockReservation)', verbose_name='Stock Reservado'),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('status', models.CharField(choices=[('active', 'Activa'), ('converted', 'Convertida en descuento'), ('released', 'Liberada'), ('expired', 'Caducada')], default='active', max_length=10, verbose_name='Estado')),
+                ('expires_at', models.DateTimeField(verbose_name='Caduca')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='orders.order', verbose_name='Pedido')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservations', to='catalog.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Reserva de stock',
+                'verbose_name_plural': 'Reservas de stock',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='catalog_sto_status_a1027a_idx'), models.Index(fields=['order', 'status'], name='catalog_sto_order_i_e94836_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from core.bulk import get_bulk_state
+
 
 class Product(models.Model):
     STOCK_OK = 'ok'
@@ -35,6 +37,11 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True, verbose_name=_('Activo'))
     stock_available = models.IntegerField(default=0, verbose_name=_('Stock Disponible'))
     stock_min_threshold = models.IntegerField(default=0, verbose_name=_('Stock Mínimo'))
+    stock_reserved = models.IntegerField(
+        default=0,
+        verbose_name=_('Stock Reservado'),
+        help_text='Unidades retenidas por pedidos aún no preparados (ver StockReservation)'
+    )
     stock_status = models.CharField(
         max_length=10,
         choices=STOCK_STATUS_CHOICES,
@@ -42,12 +49,20 @@ class Product(models.Model):
         verbose_name=_('Estado Stock')
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Fecha Creación'))
+    # Validador del GET condicional del catálogo (core.conditional): los
+    # update() que cambian lo que muestra el catálogo también lo actualizan.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name=_('Última Actualización'))
 
     class Meta:
         verbose_name = _('Producto')
         verbose_name_plural = _('Productos')
         ordering = ['name_es']
 
+    @property
+    def stock_free(self) -> int:
+        """Stock vendible: disponible menos lo reservado por pedidos pendientes."""
+        return max(self.stock_available - self.stock_reserved, 0)
+
     def update_stock_status(self) -> None:
         if self.stock_available <= 0:
             self.stock_status = self.STOCK_OUT
@@ -56,9 +71,156 @@ class Product(models.Model):
         else:
             self.stock_status = self.STOCK_OK
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado y saldo cargados: save() detecta transiciones para catalog.alerts
+        instance._loaded_stock = (
+            instance.__dict__.get('stock_status'),
+            instance.__dict__.get('stock_available'),
+            instance.__dict__.get('is_active'),
+        )
+        return instance
+
     def save(self, *args, **kwargs):
-        self.update_stock_status()
-        return super().save(*args, **kwargs)
+        bulk = get_bulk_state()
+        if bulk is None:
+            self.update_stock_status()
+            result = super().save(*args, **kwargs)
+            loaded = getattr(self, '_loaded_stock', (None, None, None))
+            current = (self.stock_status, self.stock_available, self.is_active)
+            if current != loaded:
+                from .alerts import handle_status_changes
+                handle_status_changes([(self.pk, loaded[0], self.stock_status)])
+                self._loaded_stock = current
+            return result
+        # Modo bulk: stock_status se recalcula al salir con un único UPDATE
+        result = super().save(*args, **kwargs)
+        bulk.products.add(self.pk)
+        return result
 
     def __str__(self) -> str:
         return f'{self.name_es} / {self.name_zh_hans}'
+
+
+class StockMovement(models.Model):
+    """
+    Libro de movimientos de stock (solo inserción).
+
+    ``Product.stock_available`` es el saldo materializado: la suma de
+    ``quantity`` de los movimientos de un producto debe coincidir con él
+    (comando ``reconcile_stock``). Se escribe desde ``catalog.stock``.
+    """
+    KIND_ORDER_DEDUCTION = 'order_deduction'
+    KIND_ORDER_CANCELLATION = 'order_cancellation'
+    KIND_MANUAL_ADJUSTMENT = 'manual_adjustment'
+    KIND_IMPORT = 'import'
+
+    KIND_CHOICES = [
+        (KIND_ORDER_DEDUCTION, _('Descuento por pedido')),
+        (KIND_ORDER_CANCELLATION, _('Devolución por cancelación')),
+        (KIND_MANUAL_ADJUSTMENT, _('Ajuste manual')),
+        (KIND_IMPORT, _('Carga / importación')),
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        related_name='stock_movements',
+        verbose_name=_('Producto')
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name=_('Tipo'))
+    quantity = models.IntegerField(
+        verbose_name=_('Cantidad'),
+        help_text='Variación aplicada al stock (+ entrada, - salida)'
+    )
+    order = models.ForeignKey(
+        'orders.Order',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='stock_movements',
+        verbose_name=_('Pedido')
+    )
+    note = models.CharField(max_length=255, blank=True, verbose_name=_('Nota'))
+    created_by = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements',
+        verbose_name=_('Creado por')
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Fecha'))
+
+    class Meta:
+        verbose_name = _('Movimiento de stock')
+        verbose_name_plural = _('Movimientos de stock')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'created_at']),
+            models.Index(fields=['order', 'kind']),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.get_kind_display()} {self.quantity:+d} - {self.product_id}'
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError('StockMovement es de solo inserción')
+        return super().save(*args, **kwargs)
+
+
+class StockReservation(models.Model):
+    """
+    Reserva de stock de un pedido desde el checkout hasta que pasa a
+    PREPARANDO (se convierte en descuento), se cancela o caduca.
+
+    ``Product.stock_reserved`` es la suma de las reservas activas; se mantiene
+    con UPDATE condicionados en ``catalog.reservations``.
+    """
+    STATUS_ACTIVE = 'active'
+    STATUS_CONVERTED = 'converted'
+    STATUS_RELEASED = 'released'
+    STATUS_EXPIRED = 'expired'
+
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, _('Activa')),
+        (STATUS_CONVERTED, _('Convertida en descuento')),
+        (STATUS_RELEASED, _('Liberada')),
+        (STATUS_EXPIRED, _('Caducada')),
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        related_name='reservations',
+        verbose_name=_('Producto')
+    )
+    order = models.ForeignKey(
+        'orders.Order',
+        on_delete=models.CASCADE,
+        related_name='stock_reservations',
+        verbose_name=_('Pedido')
+    )
+    quantity = models.PositiveIntegerField(verbose_name=_('Cantidad'))
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_ACTIVE,
+        verbose_name=_('Estado')
+    )
+    expires_at = models.DateTimeField(verbose_name=_('Caduca'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Fecha'))
+
+    class Meta:
+        verbose_name = _('Reserva de stock')
+        verbose_name_plural = _('Reservas de stock')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['order', 'status']),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.product_id} x{self.quantity} ({self.get_status_display()})'
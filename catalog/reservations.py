@@ -0,0 +1,120 @@
+"""
+Reservas de stock (checkout -> PREPARANDO).
+
+- ``reserve_stock``: un UPDATE condicionado por producto
+  (``WHERE stock_available - stock_reserved >= qty``). Si alguna fila no se
+  actualiza no hay stock libre y se lanza ``InsufficientStock``: la
+  transacción del checkout se revierte entera. Solo se bloquean las filas de
+  los productos del pedido (en orden de pk, para evitar interbloqueos), nunca
+  la tabla.
+- ``convert_reservations`` / ``release_reservations`` / ``expire_reservations``:
+  cierran reservas activas y descuentan ``stock_reserved`` en un único UPDATE.
+  Cada reserva se cierra una sola vez porque el cambio de estado está
+  condicionado a ``status='active'`` sobre filas bloqueadas.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Product, StockReservation
+
+
+class InsufficientStock(Exception):
+    """No hay stock libre suficiente para reservar un producto."""
+
+    def __init__(self, product_id: int, requested: int):
+        self.product_id = product_id
+        self.requested = requested
+        super().__init__(f'Stock insuficiente para el producto {product_id} (solicitado {requested})')
+
+
+def reservation_ttl() -> timedelta:
+    return timedelta(hours=getattr(settings, 'STOCK_RESERVATION_TTL_HOURS', 72))
+
+
+@transaction.atomic
+def reserve_stock(order, quantities: dict[int, int], ttl: timedelta | None = None) -> list[StockReservation]:
+    """Reserva ``{product_id: qty}`` para ``order`` o lanza ``InsufficientStock``."""
+    expires_at = timezone.now() + (ttl or reservation_ttl())
+    reservations = []
+    for product_id in sorted(quantities):
+        qty = quantities[product_id]
+        if qty <= 0:
+            continue
+        reserved = Product.objects.filter(
+            pk=product_id,
+            stock_available__gte=F('stock_reserved') + qty,
+        ).update(stock_reserved=F('stock_reserved') + qty)
+        if not reserved:
+            raise InsufficientStock(product_id, qty)
+        reservations.append(StockReservation(
+            product_id=product_id, order=order, quantity=qty, expires_at=expires_at,
+        ))
+    return StockReservation.objects.bulk_create(reservations)
+
+
+@transaction.atomic
+def _close_reservations(queryset, status: str, skip_locked: bool = False) -> int:
+    rows = list(
+        queryset.filter(status=StockReservation.STATUS_ACTIVE)
+        .select_for_update(skip_locked=skip_locked)
+        .values_list('pk', 'product_id', 'quantity')
+    )
+    if not rows:
+        return 0
+
+    StockReservation.objects.filter(
+        pk__in=[pk for pk, _product_id, _qty in rows],
+        status=StockReservation.STATUS_ACTIVE,
+    ).update(status=status)
+
+    totals: dict[int, int] = {}
+    for _pk, product_id, qty in rows:
+        totals[product_id] = totals.get(product_id, 0) + qty
+    Product.objects.filter(pk__in=totals.keys()).update(
+        stock_reserved=Greatest(
+            F('stock_reserved') - Case(
+                *[When(pk=pid, then=Value(qty)) for pid, qty in totals.items()],
+                default=Value(0),
+            ),
+            Value(0),
+        ),
+    )
+    return len(rows)
+
+
+def convert_reservations(order_ids) -> int:
+    """Las reservas pasan a descuento real (pedido a PREPARANDO)."""
+    return _close_reservations(
+        StockReservation.objects.filter(order_id__in=list(order_ids)),
+        StockReservation.STATUS_CONVERTED,
+    )
+
+
+def release_reservations(order_ids) -> int:
+    """Libera las reservas de pedidos cancelados."""
+    return _close_reservations(
+        StockReservation.objects.filter(order_id__in=list(order_ids)),
+        StockReservation.STATUS_RELEASED,
+    )
+
+
+def expire_reservations(now=None, limit: int = 1000) -> int:
+    """Caduca hasta ``limit`` reservas vencidas; las bloqueadas por otra transacción se saltan."""
+    now = now or timezone.now()
+    expired_ids = (
+        StockReservation.objects.filter(
+            status=StockReservation.STATUS_ACTIVE, expires_at__lte=now,
+        )
+        .order_by('expires_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+    return _close_reservations(
+        StockReservation.objects.filter(pk__in=list(expired_ids)),
+        StockReservation.STATUS_EXPIRED,
+        skip_locked=True,
+    )
@@ -0,0 +1,146 @@
+"""
+Operaciones de stock en SQL por conjuntos.
+
+Todo cambio de ``Product.stock_available`` pasa por ``apply_movements``:
+los movimientos se insertan con ``bulk_create`` en el libro ``StockMovement``
+y el saldo materializado se actualiza en un único UPDATE con ``F()``, dentro
+de la misma transacción. ``refresh_stock_status`` equivale a
+``Product.update_stock_status()`` para muchos productos a la vez y notifica
+las transiciones a ``catalog.alerts``.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from core import metrics
+
+from . import alerts
+from .models import Product, StockMovement
+
+MOVEMENTS_TOTAL = metrics.counter(
+    'fenix_stock_movements_total', 'Movimientos registrados en el libro de stock', ['kind'],
+)
+MOVEMENT_UNITS_TOTAL = metrics.counter(
+    'fenix_stock_movement_units_total', 'Unidades movidas (valor absoluto) por tipo', ['kind'],
+)
+
+
+def stock_status_expression():
+    """Misma regla que ``Product.update_stock_status`` como expresión SQL."""
+    return Case(
+        When(stock_available__lte=0, then=Value(Product.STOCK_OUT)),
+        When(stock_available__lte=F('stock_min_threshold'), then=Value(Product.STOCK_LOW)),
+        default=Value(Product.STOCK_OK),
+    )
+
+
+def refresh_stock_status(product_ids=None) -> int:
+    """
+    Recalcula ``stock_status`` de los productos indicados (o de todos) y
+    devuelve cuántos cambiaron. Solo se escriben las filas que cambian.
+
+    Con ``product_ids`` se asume que su saldo acaba de cambiar: se pasan todos
+    a ``catalog.alerts`` (para refrescar la lista cacheada del dashboard), no
+    solo los que cambian de estado.
+    """
+    qs = Product.objects.annotate(new_stock_status=stock_status_expression())
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return 0
+        qs = qs.filter(pk__in=product_ids)
+    else:
+        qs = qs.exclude(stock_status=F('new_stock_status'))
+
+    rows = list(qs.values_list('pk', 'stock_status', 'new_stock_status'))
+    changed = [pk for pk, old, new in rows if old != new]
+    if changed:
+        Product.objects.filter(pk__in=changed).update(stock_status=stock_status_expression())
+    alerts.handle_status_changes(rows)
+    return len(changed)
+
+
+@transaction.atomic
+def apply_movements(movements: list[StockMovement]) -> list[StockMovement]:
+    """
+    Registra los movimientos (sin guardar) y actualiza los saldos.
+
+    Las salidas nunca dejan el stock por debajo de 0: ``quantity`` se recorta
+    a lo realmente descontado para que el libro cuadre con el saldo. Los
+    productos afectados se bloquean (``select_for_update``) durante el cálculo.
+    Devuelve los movimientos insertados (los de cantidad 0 se descartan).
+    """
+    movements = [m for m in movements if m.quantity]
+    if not movements:
+        return []
+
+    balances = dict(
+        Product.objects.select_for_update()
+        .filter(pk__in={m.product_id for m in movements})
+        .order_by('pk')
+        .values_list('pk', 'stock_available')
+    )
+    applied = []
+    deltas: dict[int, int] = {}
+    for movement in movements:
+        if movement.product_id not in balances:
+            continue
+        balance = balances[movement.product_id]
+        if movement.quantity < 0:
+            movement.quantity = max(movement.quantity, -max(balance, 0))
+        if not movement.quantity:
+            continue
+        balances[movement.product_id] = balance + movement.quantity
+        deltas[movement.product_id] = deltas.get(movement.product_id, 0) + movement.quantity
+        applied.append(movement)
+
+    if not applied:
+        return []
+
+    StockMovement.objects.bulk_create(applied)
+    deltas = {pid: delta for pid, delta in deltas.items() if delta}
+    if deltas:
+        Product.objects.filter(pk__in=deltas.keys()).update(
+            stock_available=F('stock_available') + Case(
+                *[When(pk=pid, then=Value(delta)) for pid, delta in deltas.items()],
+                default=Value(0),
+            ),
+        )
+        refresh_stock_status(deltas.keys())
+    transaction.on_commit(lambda: _count_movements(applied))
+    return applied
+
+
+def _count_movements(movements) -> None:
+    for movement in movements:
+        MOVEMENTS_TOTAL.inc(kind=movement.kind)
+        MOVEMENT_UNITS_TOTAL.inc(abs(movement.quantity), kind=movement.kind)
+
+
+def adjust_stock(queryset, adjustment: int, user=None, note: str = '') -> int:
+    """Aplica el mismo ajuste manual (+/-) a todos los productos del queryset."""
+    if not adjustment:
+        return 0
+    movements = apply_movements([
+        StockMovement(
+            product_id=pk,
+            kind=StockMovement.KIND_MANUAL_ADJUSTMENT,
+            quantity=adjustment,
+            note=note,
+            created_by=user,
+        )
+        for pk in queryset.values_list('pk', flat=True)
+    ])
+    return len({m.product_id for m in movements})
+
+
+def record_stock_set(product: Product, previous: int, user=None,
+                     kind: str = StockMovement.KIND_MANUAL_ADJUSTMENT, note: str = '') -> None:
+    """
+    Registra en el libro un saldo fijado directamente (formularios de producto),
+    donde ``stock_available`` ya se guardó con el valor nuevo.
+    """
+    delta = product.stock_available - (previous or 0)
+    if delta:
+        StockMovement.objects.create(
+            product=product, kind=kind, quantity=delta, note=note, created_by=user,
+        )
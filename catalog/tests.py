@@ -1,3 +1,81 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Product, StockMovement
+from .stock import record_stock_set
+
+
+class CatalogConditionalGetTests(TestCase):
+    """ETag/304 en el catálogo público (core.conditional)"""
+
+    def setUp(self):
+        self.product = Product.objects.create(name_es='Arroz', name_zh_hans='米', price=Decimal('2.50'))
+
+    def test_product_list_304_until_a_product_changes(self):
+        url = reverse('catalog:product_list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.templates)
+
+        self.product.price = Decimal('2.75')
+        self.product.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_product_detail_varies_with_cart_and_product(self):
+        url = reverse('catalog:product_detail', args=[self.product.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        session = self.client.session
+        session['cart'] = {str(self.product.pk): 2}
+        session.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        Product.objects.filter(pk=self.product.pk).update(is_active=False)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ReconcileStockTests(TestCase):
+    """Comando reconcile_stock: saldo materializado frente al libro de movimientos"""
+
+    def setUp(self):
+        self.product = Product.objects.create(
+            name_es='Sal', name_zh_hans='盐', price=Decimal('1.00'), stock_available=10,
+        )
+        record_stock_set(self.product, 0, kind=StockMovement.KIND_IMPORT)
+
+    def reconcile(self, *args):
+        out = StringIO()
+        call_command('reconcile_stock', *args, stdout=out)
+        return out.getvalue()
+
+    def test_balanced_ledger_reports_all_clear(self):
+        self.assertIn('OK - todos los saldos cuadran', self.reconcile())
+
+    def test_drift_is_reported_without_writing(self):
+        Product.objects.filter(pk=self.product.pk).update(stock_available=7)
+
+        output = self.reconcile()
+        self.assertIn(f'#{self.product.pk} Sal: stock=7 libro=10 diferencia=-3', output)
+        self.assertIn('1 productos descuadrados', output)
+        self.assertEqual(StockMovement.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_available, 7)
+
+    def test_fix_records_one_adjustment_and_rerun_is_clean(self):
+        Product.objects.filter(pk=self.product.pk).update(stock_available=7)
 
-# Create your tests here.
+        self.assertIn('1 ajustes de conciliación registrados', self.reconcile('--fix'))
+        self.assertEqual(
+            list(StockMovement.objects.filter(kind=StockMovement.KIND_MANUAL_ADJUSTMENT)
+                 .values_list('product_id', 'quantity')),
+            [(self.product.pk, -3)],
+        )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_available, 7)
+        self.assertIn('OK - todos los saldos cuadran', self.reconcile())
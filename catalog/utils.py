@@ -1,11 +1,21 @@
 """
 Utilidades para el catálogo: traducción automática de productos.
 """
-from deep_translator import GoogleTranslator
 import logging
 
+from core import metrics
+from core.lazy import lazy_module
+
 logger = logging.getLogger(__name__)
 
+# deep_translator (y requests) solo se importan al traducir por primera vez
+deep_translator = lazy_module('deep_translator')
+
+TRANSLATIONS_TOTAL = metrics.counter(
+    'fenix_translation_calls_total', 'Llamadas a Google Translate', ['result'],
+)
+TRANSLATION_SECONDS = metrics.histogram('fenix_translation_seconds', 'Duración de las traducciones')
+
 
 def translate_text(text: str, source_lang: str = 'es', target_lang: str = 'zh-CN') -> str:
     """
@@ -24,10 +34,13 @@ def translate_text(text: str, source_lang: str = 'es', target_lang: str = 'zh-CN
     
     try:
         # deep-translator requiere 'zh-CN' para chino simplificado (no 'zh')
-        translator = GoogleTranslator(source=source_lang, target=target_lang)
-        translated = translator.translate(text)
+        translator = deep_translator.GoogleTranslator(source=source_lang, target=target_lang)
+        with TRANSLATION_SECONDS.time():
+            translated = translator.translate(text)
+        TRANSLATIONS_TOTAL.inc(result='ok')
         return translated
     except Exception as e:
+        TRANSLATIONS_TOTAL.inc(result='error')
         logger.warning(f"Error al traducir texto: {e}")
         # Si falla, retornar el texto original
         return text
@@ -1,12 +1,14 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.utils import translation
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
+from core.conditional import conditional_page
 from core.models import PlatformSettings
-from .models import Product
+from .models import Product, StockMovement
 from .forms import ProductForm, StockUpdateForm
+from .stock import apply_movements, record_stock_set
 from accounts.utils import is_manager_or_admin
 
 
@@ -41,6 +43,20 @@ def activate_user_language(request, user):
     return lang
 
 
+def _catalog_validator(request):
+    """Último cambio y número de productos: cubre altas, bajas y desactivaciones."""
+    state = Product.objects.aggregate(last=Max('updated_at'), total=Count('pk'))
+    return [state['last'], state['total'], get_user_language(request.user)], state['last']
+
+
+def _product_validator(request, pk):
+    updated_at = Product.objects.filter(pk=pk, is_active=True).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return [updated_at, get_user_language(request.user)], updated_at
+
+
+@conditional_page(_catalog_validator)
 def product_list(request):
     """Lista de productos del catálogo"""
     products = Product.objects.filter(is_active=True).order_by('-created_at')
@@ -74,6 +90,7 @@ def product_list(request):
     return render(request, 'catalog/product_list.html', context)
 
 
+@conditional_page(_product_validator)
 def product_detail(request, pk):
     """Detalle de un producto"""
     product = get_object_or_404(Product, pk=pk, is_active=True)
@@ -135,6 +152,10 @@ def product_create(request):
         form = ProductForm(request.POST, request.FILES)
         if form.is_valid():
             product = form.save()
+            record_stock_set(
+                product, 0, user=request.user,
+                kind=StockMovement.KIND_IMPORT, note='Stock inicial',
+            )
             messages.success(request, _('Producto creado exitosamente.'))
             return redirect('catalog:product_manage_detail', pk=product.pk)
     else:
@@ -157,9 +178,11 @@ def product_edit(request, pk):
     product = get_object_or_404(Product, pk=pk)
     
     if request.method == 'POST':
+        previous_stock = product.stock_available
         form = ProductForm(request.POST, request.FILES, instance=product)
         if form.is_valid():
             form.save()
+            record_stock_set(product, previous_stock, user=request.user, note='Edición de producto')
             messages.success(request, _('Producto actualizado exitosamente.'))
             return redirect('catalog:product_manage_detail', pk=product.pk)
     else:
@@ -222,8 +245,14 @@ def product_stock_update(request, pk):
         form = StockUpdateForm(request.POST)
         if form.is_valid():
             adjustment = form.cleaned_data['adjustment']
-            product.stock_available += adjustment
-            product.save()
+            apply_movements([StockMovement(
+                product=product,
+                kind=StockMovement.KIND_MANUAL_ADJUSTMENT,
+                quantity=adjustment,
+                note=form.cleaned_data['notes'][:255],
+                created_by=request.user,
+            )])
+            product.refresh_from_db(fields=['stock_available', 'stock_status'])
             messages.success(
                 request,
                 _('Stock actualizado: %(adj)s. Nuevo stock: %(stock)s') % {
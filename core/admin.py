@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import PlatformSettings, AuditLog
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(PlatformSettings)
@@ -27,6 +28,10 @@ class AuditLogAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'description', 'ip_address']
     readonly_fields = ['user', 'action', 'description', 'object_type', 'object_id', 'ip_address', 'user_agent', 'created_at']
     date_hierarchy = 'created_at'
+    list_select_related = ['user']
+    # Sin COUNT(*) de toda la tabla por página (ver core/pagination.py)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     def has_add_permission(self, request):
         # No permitir crear logs manualmente
@@ -92,8 +92,8 @@ class AuditLog(models.Model):
         return f'{user_str} - {self.get_action_display()} - {self.created_at}'
     
     @classmethod
-    def log(cls, user, action, description, object_type='', object_id=None, request=None):
-        """Helper method para crear un log de auditoría"""
+    def build(cls, user, action, description, object_type='', object_id=None, request=None):
+        """Instancia sin guardar (para ``bulk_create``) con IP y User Agent del request"""
         ip_address = None
         user_agent = ''
         
@@ -108,7 +108,7 @@ class AuditLog(models.Model):
             # Obtener User Agent
             user_agent = request.META.get('HTTP_USER_AGENT', '')[:255]
         
-        return cls.objects.create(
+        return cls(
             user=user,
             action=action,
             description=description,
@@ -118,6 +118,18 @@ class AuditLog(models.Model):
             user_agent=user_agent
         )
 
+    @classmethod
+    def log(cls, user, action, description, object_type='', object_id=None, request=None):
+        """
+        Helper method para crear un log de auditoría. Se escribe agrupado con
+        los demás de la petición (``core/audit_buffer.py``): la instancia
+        devuelta no tiene ``pk`` hasta entonces.
+        """
+        from .audit_buffer import record
+
+        entry = cls.build(user, action, description, object_type, object_id, request)
+        record(entry)
+        return entry
 
 # Helper function for backward compatibility
 def log_action(user, action, description, object_type='', object_id=None, request=None):
@@ -0,0 +1,153 @@
+"""
+Escritura agrupada de registros de auditoría (``AuditLog``, ``ProfileAuditLog``).
+
+``AuditLog.log`` y ``log_profile_action`` ya no hacen un INSERT cada uno:
+pasan la instancia sin guardar a ``record``, que la acumula en el búfer de la
+petición abierto por ``AuditBufferMiddleware``. Al terminar la petición el
+búfer se escribe con un ``bulk_create`` por modelo (p.ej. las N líneas de
+``update_operative_profile`` son una sola consulta).
+
+- Dentro de una transacción la entrada se añade al búfer en ``on_commit``: si
+  la transacción se deshace, el registro desaparece igual que antes.
+- Fuera de una petición (comandos, shell) sin ``buffered()`` se escribe en el
+  momento, como siempre.
+- ``AUDIT_FLUSH_MODE = 'async'`` entrega los lotes a un hilo de fondo
+  (``AsyncWriter``) y la respuesta no espera a la BD. Los lotes pendientes se
+  pierden si el proceso muere antes de escribirlos.
+
+``created_at`` (``auto_now_add``) toma la hora de la escritura, no la de la
+llamada; el orden dentro de un lote se conserva en el id.
+"""
+import atexit
+import contextlib
+import contextvars
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+WRITTEN = metrics.counter(
+    'fenix_audit_entries_written_total', 'Registros de auditoría escritos', ['model'],
+)
+FAILED = metrics.counter(
+    'fenix_audit_write_failures_total', 'Lotes de auditoría que no se pudieron escribir', ['model'],
+)
+
+_buffer: contextvars.ContextVar[list | None] = contextvars.ContextVar('fenix_audit_buffer', default=None)
+
+
+def write_entries(entries) -> int:
+    """``bulk_create`` de ``entries`` agrupadas por modelo (en orden); devuelve las escritas."""
+    by_model = {}
+    for entry in entries:
+        by_model.setdefault(type(entry), []).append(entry)
+    written = 0
+    for model, rows in by_model.items():
+        try:
+            model.objects.bulk_create(rows, batch_size=settings.AUDIT_BATCH_SIZE)
+        except Exception:
+            FAILED.inc(model=model.__name__)
+            logger.exception('Error escribiendo %d registros de %s', len(rows), model.__name__)
+            continue
+        WRITTEN.inc(len(rows), model=model.__name__)
+        written += len(rows)
+    return written
+
+
+class AsyncWriter:
+    """Hilo de fondo que escribe los lotes en orden de llegada."""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, entries: list) -> None:
+        self._ensure_started()
+        self._queue.put(entries)
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Espera a que se escriban los lotes encolados (tests, apagado)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                write_entries(item)
+            finally:
+                close_old_connections()
+
+
+async_writer = AsyncWriter()
+atexit.register(async_writer.drain, 5)
+
+
+def flush(entries: list) -> None:
+    if not entries:
+        return
+    if settings.AUDIT_FLUSH_MODE == 'async':
+        async_writer.submit(list(entries))
+    else:
+        write_entries(entries)
+
+
+def _enqueue(entry) -> None:
+    pending = _buffer.get()
+    if pending is None or not settings.AUDIT_BUFFER_ENABLED:
+        write_entries([entry])
+    else:
+        pending.append(entry)
+
+
+def record(entry) -> None:
+    """Registra ``entry`` (instancia sin guardar) en el búfer activo o al confirmar la transacción."""
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _enqueue(entry))
+    else:
+        _enqueue(entry)
+
+
+@contextlib.contextmanager
+def buffered():
+    """Acumula los registros del bloque y los escribe al salir (anidable)."""
+    if _buffer.get() is not None:
+        yield
+        return
+    pending = []
+    token = _buffer.set(pending)
+    try:
+        yield
+    finally:
+        _buffer.reset(token)
+        flush(pending)
+
+
+class AuditBufferMiddleware:
+    """Un búfer de auditoría por petición, escrito al final (también si la vista falla)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered():
+            return self.get_response(request)
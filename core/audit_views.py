@@ -0,0 +1,164 @@
+"""
+Explorador de auditoría (``/ops/audit/``, solo Super Admin).
+
+Tres fuentes: ``AuditLog``, ``ProfileAuditLog`` y ``LoginHistory``. Los
+filtros se traducen a consultas que usan sus índices:
+
+- usuario: el email se resuelve a id antes (una fila por el único de email)
+  y se filtra por ``user_id`` -> índice ``(user, -created_at)``;
+- acción -> índice ``(action, -created_at)`` (``AuditLog``);
+- fechas: rango sobre ``created_at``.
+
+La paginación es por cursor (``core.pagination.KeysetPaginator`` sobre
+``-created_at, -pk``), el total se estima (``estimated_count``) en lugar de
+un COUNT(*) de la tabla, y la exportación CSV del rango filtrado se envía en
+streaming, leyendo por bloques con ``iterator()``.
+"""
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+
+from django import forms
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.utils.translation import gettext as _, gettext_lazy
+
+from accounts.models import LoginHistory, ProfileAuditLog, User
+from accounts.permissions import super_admin_required
+
+from .audit import AuditLog
+from .pagination import KeysetPaginator, estimated_count
+
+PER_PAGE = 50
+EXPORT_CHUNK_SIZE = 2000
+
+
+@dataclass
+class Source:
+    model: type
+    label: str
+    export_fields: list[str]
+    action_choices: list = field(default_factory=list)
+
+
+SOURCES = {
+    'audit': Source(
+        AuditLog, gettext_lazy('Auditoría'),
+        ['created_at', 'user__email', 'action', 'description', 'object_type', 'object_id', 'ip_address', 'user_agent'],
+        AuditLog.ACTION_CHOICES,
+    ),
+    'profile': Source(
+        ProfileAuditLog, gettext_lazy('Cambios de perfil'),
+        ['created_at', 'user__email', 'action', 'field_changed', 'old_value', 'new_value', 'ip_address', 'user_agent'],
+        ProfileAuditLog.ACTION_CHOICES,
+    ),
+    'login': Source(
+        LoginHistory, gettext_lazy('Inicios de sesión'),
+        ['created_at', 'user__email', 'success', 'failure_reason', 'ip_address', 'location', 'user_agent'],
+    ),
+}
+
+
+class AuditFilterForm(forms.Form):
+    source = forms.ChoiceField(choices=[(key, s.label) for key, s in SOURCES.items()], required=False)
+    user = forms.EmailField(required=False, label=gettext_lazy('Email del usuario'))
+    action = forms.CharField(required=False, max_length=50)
+    date_from = forms.DateField(required=False, label=gettext_lazy('Desde'))
+    date_to = forms.DateField(required=False, label=gettext_lazy('Hasta'))
+
+    def clean(self):
+        data = super().clean()
+        data['source'] = data.get('source') or 'audit'
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise forms.ValidationError(_('La fecha inicial es posterior a la final.'))
+        return data
+
+
+def filtered_queryset(data: dict):
+    """``(source, queryset)`` para los filtros limpios de ``AuditFilterForm``."""
+    source = SOURCES[data['source']]
+    qs = source.model.objects.all()
+    if data.get('user'):
+        user_id = User.objects.filter(email__iexact=data['user']).values_list('pk', flat=True).first()
+        qs = qs.filter(user_id=user_id) if user_id else qs.none()
+    if data.get('action') and source.action_choices:
+        qs = qs.filter(action=data['action'])
+    tz = timezone.get_current_timezone()
+    if data.get('date_from'):
+        qs = qs.filter(created_at__gte=datetime.combine(data['date_from'], time.min, tz))
+    if data.get('date_to'):
+        qs = qs.filter(created_at__lt=datetime.combine(data['date_to'] + timedelta(days=1), time.min, tz))
+    return source, qs
+
+
+@super_admin_required
+def audit_explorer(request):
+    form = AuditFilterForm(request.GET or None)
+    data = form.cleaned_data if form.is_bound and form.is_valid() else {'source': 'audit'}
+    source, qs = filtered_queryset(data)
+
+    page = KeysetPaginator(
+        qs.select_related('user'), ordering=('-created_at', '-pk'), per_page=PER_PAGE,
+    ).page(request.GET.get('cursor'))
+
+    query = request.GET.copy()
+    query.pop('cursor', None)
+    context = {
+        'form': form,
+        'source_key': data['source'],
+        'source': source,
+        'sources': SOURCES,
+        'page': page,
+        'estimate': estimated_count(qs),
+        'query_string': query.urlencode(),
+    }
+    return render(request, 'core/audit_explorer.html', context)
+
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_cell(value):
+    """
+    Valor para una celda CSV. Los textos que empiezan como una fórmula
+    (User-Agent, descripciones, valores de perfil: los controla quien hace la
+    petición) se prefijan con ``'`` para que Excel/Sheets no los evalúen.
+    """
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """Pseudo-fichero para ``csv.writer``: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+@super_admin_required
+def audit_export(request):
+    form = AuditFilterForm(request.GET)
+    if not form.is_valid():
+        return render(request, 'core/audit_explorer.html', {
+            'form': form, 'sources': SOURCES, 'source_key': 'audit', 'source': SOURCES['audit'],
+        }, status=400)
+    source, qs = filtered_queryset(form.cleaned_data)
+    rows = qs.order_by('-created_at', '-pk').values_list(*source.export_fields).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE,
+    )
+
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield writer.writerow(source.export_fields)
+        for row in rows:
+            yield writer.writerow([csv_cell(value) for value in row])
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    filename = f'{source.model._meta.model_name}-{timezone.localdate():%Y%m%d}.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,130 @@
+"""
+Modo bulk: operaciones masivas sin hooks por objeto.
+
+Dentro de ``bulk_operations()`` los hooks que normalmente se ejecutan en cada
+``save()`` se suprimen y se registran los ids afectados:
+
+- ``orders.signals``: descuento/reposición de stock, ``delivered_at`` y notificaciones.
+- ``Product.save``: recálculo de ``stock_status``.
+- ``User.save``: recálculo de ``profile_completed``.
+- ``Company`` (simple_history): un registro histórico por guardado.
+
+Al salir del bloque se aplican los efectos equivalentes en SQL por conjuntos
+(un UPDATE por tipo de efecto, ``bulk_history_create`` para el histórico), dentro
+de la misma transacción. Las notificaciones de pedidos solo se envían si se
+registran explícitamente con ``notify_order`` (el modo bulk no consulta el
+estado anterior de cada pedido) y salen en un hilo tras el commit.
+
+Uso:
+    from core.bulk import bulk_operations
+
+    with bulk_operations() as bulk:
+        for user in users:
+            user.ciudad = user.ciudad.strip()
+            user.save()             # sin recálculo de profile_completed por objeto
+        Order.objects.filter(...).update(status=Order.STATUS_PREPARING)
+        bulk.orders.update(order_ids)   # efectos de pedidos sobre update()
+
+Los bloques anidados reutilizan el estado del bloque exterior.
+"""
+import contextlib
+import contextvars
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_bulk_state: contextvars.ContextVar['BulkState | None'] = contextvars.ContextVar(
+    'fenix_bulk_state', default=None,
+)
+
+
+class BulkState:
+    """Ids pendientes de aplicar al salir de ``bulk_operations``."""
+
+    def __init__(self):
+        self.orders: set[int] = set()
+        self.products: set[int] = set()
+        self.users: set[int] = set()
+        self.companies: dict[int, bool] = {}  # pk -> creado en este bloque
+        self.notifications: list[tuple[int, str]] = []
+
+    def record_company(self, pk: int, created: bool) -> None:
+        self.companies[pk] = self.companies.get(pk, False) or created
+
+    def notify_order(self, order_id: int, status: str) -> None:
+        """Programa la notificación de cambio de estado de un pedido."""
+        self.notifications.append((order_id, status))
+
+    def flush(self) -> None:
+        from orders.models import Order
+        from orders.services.stock import deduct_stock_for_orders, restock_cancelled_orders
+
+        if self.orders:
+            self.products.update(deduct_stock_for_orders(self.orders))
+            self.products.update(restock_cancelled_orders(self.orders))
+            Order.objects.filter(
+                pk__in=self.orders,
+                status=Order.STATUS_DELIVERED,
+                delivered_at__isnull=True,
+            ).update(delivered_at=timezone.now())
+
+        if self.products:
+            from catalog.stock import refresh_stock_status
+            refresh_stock_status(self.products)
+
+        if self.users:
+            from accounts.models import User
+            User.objects.refresh_profile_completed(self.users)
+
+        if self.companies:
+            self._flush_company_history()
+
+        if self.notifications:
+            from orders.services.order_notifications import enqueue_order_status_notifications
+            notifications = list(self.notifications)
+            transaction.on_commit(lambda: enqueue_order_status_notifications(notifications))
+
+        logger.info(
+            'Modo bulk aplicado: %s pedidos, %s productos, %s usuarios, %s empresas, %s notificaciones',
+            len(self.orders), len(self.products), len(self.users),
+            len(self.companies), len(self.notifications),
+        )
+
+    def _flush_company_history(self) -> None:
+        from organizations.models import Company
+
+        companies = Company.objects.in_bulk(list(self.companies))
+        for created in (True, False):
+            objs = [obj for pk, obj in companies.items() if self.companies[pk] is created]
+            if objs:
+                Company.history.bulk_history_create(objs, update=not created)
+
+
+def get_bulk_state() -> BulkState | None:
+    """Estado del bloque ``bulk_operations`` activo, o ``None`` fuera de él."""
+    return _bulk_state.get()
+
+
+def in_bulk_mode() -> bool:
+    return _bulk_state.get() is not None
+
+
+@contextlib.contextmanager
+def bulk_operations():
+    """Context manager del modo bulk (ver docstring del módulo)."""
+    current = _bulk_state.get()
+    if current is not None:
+        yield current
+        return
+
+    state = BulkState()
+    token = _bulk_state.set(state)
+    try:
+        with transaction.atomic():
+            yield state
+            state.flush()
+    finally:
+        _bulk_state.reset(token)
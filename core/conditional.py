@@ -0,0 +1,80 @@
+"""
+GET condicional (ETag / Last-Modified) para páginas HTML.
+
+``conditional_page(validator)`` ejecuta ``validator(request, *args, **kwargs)``
+antes que la vista. El validador hace una consulta barata (agregados
+``Max``/``Count``, sin cargar filas) y devuelve ``(partes, last_modified)``
+o ``None`` si no puede decidir (la vista se ejecuta normalmente, p. ej.
+para responder 404). Si el ETag o la fecha coinciden con lo que envía el
+navegador se responde 304 sin ejecutar la vista ni renderizar la plantilla.
+
+El ETag no depende solo de los datos: la página incluye el usuario (nombre,
+rol), el idioma, el carrito (sesión o ``Cart``) y el token CSRF, así que esos
+valores entran en el hash y la respuesta es ``private`` y varía por Cookie.
+Con mensajes flash pendientes se renderiza siempre para no perderlos.
+``CONDITIONAL_GET_VERSION`` (por defecto la versión desplegada) invalida
+todos los ETag al cambiar plantillas o código.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+from orders.services.cart import cart_for
+
+
+def _request_parts(request) -> list:
+    user = request.user
+    get_token(request)  # garantiza el secreto CSRF que llevará la página
+    return [
+        settings.CONDITIONAL_GET_VERSION,
+        request.get_full_path(),
+        get_language(),
+        user.pk,
+        getattr(user, 'updated_at', None),
+        cart_for(request).version(),
+        request.META.get('CSRF_COOKIE', ''),
+    ]
+
+
+def page_etag(request, parts) -> str:
+    raw = json.dumps([_request_parts(request), list(parts)], default=str, separators=(',', ':'))
+    return '"%s"' % hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def _has_pending_messages(request) -> bool:
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def conditional_page(validator):
+    """Decorador: 304 si el validador dice que la página no ha cambiado."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _has_pending_messages(request):
+                return view(request, *args, **kwargs)
+            validated = validator(request, *args, **kwargs)
+            if validated is None:
+                return view(request, *args, **kwargs)
+
+            parts, last_modified = validated
+            etag = page_etag(request, parts)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                if timestamp and not response.has_header('Last-Modified'):
+                    response['Last-Modified'] = http_date(timestamp)
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
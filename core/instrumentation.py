@@ -0,0 +1,241 @@
+"""
+Instrumentación por petición (opt-in con ``FENIX_INSTRUMENTATION=1``).
+
+``RequestInstrumentationMiddleware`` mide en cada petición:
+
+- número de consultas y tiempo total en base de datos
+  (``connection.execute_wrapper``),
+- tiempo de renderizado de plantillas (envolviendo el backend de plantillas
+  de Django una sola vez, al arrancar),
+- las consultas más lentas con el punto del código que las lanzó (el primer
+  frame del proyecto en la pila, solo se calcula para las que entran en el
+  top).
+
+Escribe una línea JSON en el logger ``fenix.instrumentation`` cuando la
+petición supera alguno de los umbrales (``INSTRUMENTATION_SLOW_REQUEST_MS``,
+``INSTRUMENTATION_MAX_QUERIES``) y otra por cada consulta por encima de
+``INSTRUMENTATION_SLOW_QUERY_MS``. Además mantiene en memoria (por proceso) un
+resumen móvil por vista que se consulta en ``/ops/instrumentation/``
+(solo Super Admin).
+
+Desactivado, el middleware se elimina de la cadena al arrancar
+(``MiddlewareNotUsed``) y no añade ningún coste.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('fenix.instrumentation')
+
+_current: contextvars.ContextVar['RequestProfile | None'] = contextvars.ContextVar(
+    'fenix_request_profile', default=None,
+)
+
+_PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+_IGNORED_PATHS = ('site-packages', 'dist-packages', __file__)
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _code_origin() -> str:
+    """Primer frame del proyecto (fuera de Django y de este módulo) en la pila actual."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_ROOT) and not any(p in filename for p in _IGNORED_PATHS):
+            relative = filename[len(_PROJECT_ROOT):].lstrip('/\\')
+            return f'{relative}:{frame.f_lineno} {frame.f_code.co_name}'
+        frame = frame.f_back
+    return '?'
+
+
+class RequestProfile:
+    """Métricas de una petición."""
+
+    def __init__(self, top_queries: int):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.slowest: list[tuple[float, str, str]] = []  # (ms, sql, origen)
+        self.top_queries = top_queries
+
+    def record_query(self, sql: str, ms: float) -> tuple[float, str, str] | None:
+        self.queries += 1
+        self.db_ms += ms
+        if len(self.slowest) < self.top_queries or ms > self.slowest[-1][0]:
+            entry = (ms, sql[:500], _code_origin())
+            self.slowest.append(entry)
+            self.slowest.sort(key=lambda e: e[0], reverse=True)
+            del self.slowest[self.top_queries:]
+            return entry
+        return None
+
+
+class QueryRecorder:
+    """``execute_wrapper`` que mide cada consulta de la petición en curso."""
+
+    def __init__(self, profile: RequestProfile, slow_query_ms: float):
+        self.profile = profile
+        self.slow_query_ms = slow_query_ms
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            entry = self.profile.record_query(sql, ms)
+            if ms >= self.slow_query_ms:
+                origin = entry[2] if entry else _code_origin()
+                logger.warning(json.dumps({
+                    'event': 'slow_query', 'ms': round(ms, 1), 'origin': origin, 'sql': sql[:500],
+                }))
+
+
+_template_patch_lock = threading.Lock()
+_template_patched = False
+
+
+def _patch_template_render() -> None:
+    """Mide ``render()`` del backend de plantillas (solo el render exterior cuenta)."""
+    global _template_patched
+    with _template_patch_lock:
+        if _template_patched:
+            return
+        from django.template.backends.django import Template
+
+        original = Template.render
+
+        def render(self, *args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return original(self, *args, **kwargs)
+            profile.template_depth += 1
+            start = time.perf_counter()
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                profile.template_depth -= 1
+                if profile.template_depth == 0:
+                    profile.template_ms += (time.perf_counter() - start) * 1000
+
+        Template.render = render
+        _template_patched = True
+
+
+# ----------------------------------------------------------------------
+# Resumen móvil por vista
+# ----------------------------------------------------------------------
+
+class ViewStats:
+    """Últimas ``window`` peticiones por vista (en memoria, por proceso)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._slowest: dict[str, list] = {}
+
+    def add(self, view: str, total_ms: float, profile: RequestProfile) -> None:
+        with self._lock:
+            self._samples[view].append((total_ms, profile.queries, profile.db_ms, profile.template_ms))
+            worst = self._slowest.get(view, []) + profile.slowest
+            self._slowest[view] = sorted(worst, key=lambda e: e[0], reverse=True)[:3]
+
+    def summary(self) -> list[dict]:
+        with self._lock:
+            snapshot = {view: list(samples) for view, samples in self._samples.items()}
+            slowest = dict(self._slowest)
+        rows = []
+        for view, samples in snapshot.items():
+            totals = sorted(s[0] for s in samples)
+            rows.append({
+                'view': view,
+                'count': len(samples),
+                'p50_ms': round(statistics.median(totals), 1),
+                'p95_ms': round(totals[min(len(totals) - 1, int(len(totals) * 0.95))], 1),
+                'max_ms': round(totals[-1], 1),
+                'avg_queries': round(statistics.fmean(s[1] for s in samples), 1),
+                'avg_db_ms': round(statistics.fmean(s[2] for s in samples), 1),
+                'avg_template_ms': round(statistics.fmean(s[3] for s in samples), 1),
+                'slowest_queries': [
+                    {'ms': round(ms, 1), 'sql': sql, 'origin': origin}
+                    for ms, sql, origin in slowest.get(view, [])
+                ],
+            })
+        return sorted(rows, key=lambda r: r['p95_ms'], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._slowest.clear()
+
+
+view_stats = ViewStats(_setting('INSTRUMENTATION_WINDOW', 200))
+
+
+# ----------------------------------------------------------------------
+# Middleware
+# ----------------------------------------------------------------------
+
+class RequestInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not _setting('FENIX_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = _setting('INSTRUMENTATION_SLOW_REQUEST_MS', 500)
+        self.slow_query_ms = _setting('INSTRUMENTATION_SLOW_QUERY_MS', 100)
+        self.max_queries = _setting('INSTRUMENTATION_MAX_QUERIES', 50)
+        self.top_queries = _setting('INSTRUMENTATION_TOP_QUERIES', 5)
+        _patch_template_render()
+
+    def __call__(self, request):
+        profile = RequestProfile(self.top_queries)
+        token = _current.set(profile)
+        recorder = QueryRecorder(profile, self.slow_query_ms)
+        start = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        view_stats.add(view, total_ms, profile)
+
+        if total_ms >= self.slow_request_ms or profile.queries >= self.max_queries:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'ms': round(total_ms, 1),
+                'queries': profile.queries,
+                'db_ms': round(profile.db_ms, 1),
+                'template_ms': round(profile.template_ms, 1),
+                'slowest': [
+                    {'ms': round(ms, 1), 'origin': origin, 'sql': sql[:200]}
+                    for ms, sql, origin in profile.slowest
+                ],
+            }))
+        return response
+
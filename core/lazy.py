@@ -0,0 +1,62 @@
+"""
+Imports diferidos para dependencias pesadas u opcionales.
+
+``lazy_module('xhtml2pdf.pisa')`` devuelve un proxy que importa el módulo real
+en el primer acceso a un atributo. Así el coste de importación (xhtml2pdf +
+reportlab, deep_translator, requests...) no se paga al arrancar el worker sino
+en la primera petición que lo usa:
+
+    from core.lazy import lazy_module
+
+    pisa = lazy_module('xhtml2pdf.pisa')
+
+    def generate(...):
+        pisa.CreatePDF(...)   # aquí se importa
+
+Las asignaciones sobre el proxy (``mock.patch('app.mod.requests.post')``) se
+aplican al módulo real. ``python manage.py startup_profile`` mide el efecto.
+"""
+import importlib
+import threading
+
+_lock = threading.Lock()
+
+
+class LazyModule:
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name: str):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self):
+        module = object.__getattribute__(self, '_module')
+        if module is None:
+            with _lock:
+                module = object.__getattribute__(self, '_module')
+                if module is None:
+                    module = importlib.import_module(object.__getattribute__(self, '_name'))
+                    object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        name = object.__getattribute__(self, '_name')
+        loaded = object.__getattribute__(self, '_module') is not None
+        return f'<LazyModule {name!r} ({"cargado" if loaded else "pendiente"})>'
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Proxy de ``name`` que se importa en el primer uso."""
+    return LazyModule(name)
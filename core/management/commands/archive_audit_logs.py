@@ -0,0 +1,98 @@
+"""
+Archiva por meses los registros de auditoría antiguos y los borra de la tabla,
+para que los índices de ``AuditLog``, ``ProfileAuditLog`` y ``LoginHistory``
+solo cubran el periodo vivo.
+
+Cada mes completo anterior a ``AUDIT_RETENTION_DAYS`` se recorre por PK en
+bloques; cada bloque se sube como un objeto
+``<AUDIT_ARCHIVE_PREFIX>/<app.modelo>/<AAAA-MM>/<pk inicial>-<pk final>.jsonl.gz``
+(una fila por línea) al almacenamiento por defecto (GCS en producción: el
+disco de App Engine es efímero) y solo se borra cuando el objeto existe con
+el tamaño escrito. Una ejecución interrumpida se puede repetir sin perder
+filas. ``--output-dir`` escribe en un directorio local en su lugar.
+
+Pensado para ejecutarse periódicamente (cron de App Engine o de la máquina
+de mantenimiento), p.ej. el día 1 de cada mes:
+    python manage.py archive_audit_logs
+    python manage.py archive_audit_logs core.AuditLog --days 90 --dry-run
+"""
+import gzip
+import json
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+DEFAULT_MODELS = ['core.AuditLog', 'accounts.ProfileAuditLog', 'accounts.LoginHistory']
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value):
+    return month_start(value + timedelta(days=32))
+
+
+class Command(BaseCommand):
+    help = 'Archiva en ficheros mensuales y borra los registros de auditoría antiguos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help=f'Modelos a archivar (por defecto {", ".join(DEFAULT_MODELS)})')
+        parser.add_argument('--days', type=int, default=None, help='Antigüedad mínima (AUDIT_RETENTION_DAYS)')
+        parser.add_argument('--output-dir', default=None, help='Directorio local en vez del almacenamiento por defecto')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por bloque/borrado')
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta lo que se archivaría')
+
+    def handle(self, *args, **options):
+        days = settings.AUDIT_RETENTION_DAYS if options['days'] is None else options['days']
+        if options['output_dir']:
+            storage, prefix = FileSystemStorage(location=options['output_dir']), ''
+        else:
+            storage, prefix = default_storage, settings.AUDIT_ARCHIVE_PREFIX
+        # Solo meses completos: el corte se redondea al inicio del mes
+        cutoff = month_start(timezone.localtime() - timedelta(days=days))
+
+        try:
+            models = [apps.get_model(label) for label in options['models'] or DEFAULT_MODELS]
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        total = 0
+        for model in models:
+            old = model.objects.filter(created_at__lt=cutoff)
+            for month in old.datetimes('created_at', 'month'):
+                rows = old.filter(created_at__gte=month, created_at__lt=min(next_month(month), cutoff))
+                if options['dry_run']:
+                    count = rows.count()
+                else:
+                    folder = '/'.join(p for p in (prefix, model._meta.label_lower, f'{month:%Y-%m}') if p)
+                    count = self._archive(model, rows, storage, folder, options['batch_size'])
+                total += count
+                self.stdout.write(f'{model._meta.label} {month:%Y-%m}: {count}')
+
+        verb = 'se archivarían' if options['dry_run'] else 'archivados'
+        self.stdout.write(self.style.SUCCESS(f'OK - {total} registros {verb} (anteriores a {cutoff:%Y-%m-%d})'))
+
+    def _archive(self, model, rows, storage, folder: str, batch_size: int) -> int:
+        archived, last_pk = 0, 0
+        while True:
+            batch = list(rows.filter(pk__gt=last_pk).order_by('pk').values()[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1]['id']
+            data = gzip.compress(''.join(
+                json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n' for row in batch
+            ).encode('utf-8'))
+            name = storage.save(f'{folder}/{batch[0]["id"]}-{last_pk}.jsonl.gz', ContentFile(data))
+            # Solo se borra lo que ya está escrito entero en el almacenamiento
+            if not storage.exists(name) or storage.size(name) != len(data):
+                raise CommandError(f'No se pudo confirmar la escritura de {name}; no se borra el bloque')
+            model.objects.filter(pk__in=[row['id'] for row in batch]).delete()
+            archived += len(batch)
+        return archived
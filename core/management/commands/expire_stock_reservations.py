@@ -0,0 +1,26 @@
+"""
+Caduca las reservas de stock vencidas y libera ``Product.stock_reserved``.
+
+Pensado para ejecutarse periódicamente (cron / scheduler de Render), p.ej.
+cada 5 minutos:
+    python manage.py expire_stock_reservations
+"""
+from django.core.management.base import BaseCommand
+
+from catalog.reservations import expire_reservations
+
+
+class Command(BaseCommand):
+    help = 'Caduca las reservas de stock vencidas (por lotes, sin bloquear el checkout)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Reservas por lote/transacción')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            expired = expire_reservations(limit=options['batch_size'])
+            total += expired
+            if expired < options['batch_size']:
+                break
+        self.stdout.write(self.style.SUCCESS(f'OK - {total} reservas caducadas'))
@@ -0,0 +1,198 @@
+"""
+Exportación de datos en streaming: un fichero JSONL por modelo, recorrido en
+orden de PK con consultas por bloques (keyset), sin construir el documento
+completo en memoria como hace ``dumpdata``.
+
+Uso:
+    python manage.py export_fenix --output-dir dumps/
+    python manage.py export_fenix orders catalog.Product --chunk-size 5000
+
+El directorio resultante se importa con ``import_fenix``.
+"""
+import datetime
+import json
+import os
+import time
+
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Serializer as PythonSerializer
+
+# Mismas exclusiones que usaba export_data.py
+DEFAULT_EXCLUDES = [
+    'contenttypes',
+    'auth.Permission',
+    'admin.LogEntry',
+    'sessions.Session',
+]
+
+# Los ids de estos modelos cambian entre bases de datos (SQLite -> Supabase),
+# por eso se exportan siempre con su natural key.
+NATURAL_KEY_MODELS = (ContentType, Permission)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class _StreamSerializer(PythonSerializer):
+    """Serializer python que solo usa natural keys para ContentType/Permission."""
+
+    def handle_fk_field(self, obj, field):
+        self.use_natural_foreign_keys = field.remote_field.model in NATURAL_KEY_MODELS
+        super().handle_fk_field(obj, field)
+
+    def handle_m2m_field(self, obj, field):
+        self.use_natural_foreign_keys = field.remote_field.model in NATURAL_KEY_MODELS
+        super().handle_m2m_field(obj, field)
+
+
+class _ExportEncoder(DjangoJSONEncoder):
+    """
+    ``DjangoJSONEncoder`` recorta fechas y horas a milisegundos; la exportación
+    conserva los microsegundos (cursores ``-created_at, -pk``, ETags por
+    ``updated_at``).
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def model_file_name(model) -> str:
+    return f'{model._meta.label_lower}.jsonl'
+
+
+def resolve_models(labels, excludes):
+    """Devuelve los modelos concretos a exportar (app_label o app_label.Model)."""
+    excluded_apps = {e for e in excludes if '.' not in e}
+    excluded_models = {e.lower() for e in excludes if '.' in e}
+
+    if labels:
+        selected = []
+        for label in labels:
+            try:
+                if '.' in label:
+                    selected.append(apps.get_model(label))
+                else:
+                    selected.extend(apps.get_app_config(label).get_models())
+            except LookupError as e:
+                raise CommandError(str(e))
+    else:
+        selected = list(apps.get_models())
+
+    result = []
+    for model in selected:
+        opts = model._meta
+        if opts.proxy or not opts.managed or opts.auto_created:
+            continue
+        if opts.app_label in excluded_apps or opts.label_lower in excluded_models:
+            continue
+        if model not in result:
+            result.append(model)
+    return sort_by_foreign_keys(result)
+
+
+def sort_by_foreign_keys(models):
+    """
+    Ordena los modelos para que cada uno se importe después de aquellos a los
+    que apunta por FK. Las auto-referencias se resuelven en import_fenix.
+    """
+    pending = list(models)
+    ordered = []
+    while pending:
+        for model in pending:
+            deps = {
+                f.related_model
+                for f in model._meta.concrete_fields
+                if f.is_relation and f.related_model is not model
+            }
+            if not any(dep in pending for dep in deps):
+                break
+        else:
+            # Ciclo entre modelos: se respeta el orden original
+            model = pending[0]
+        pending.remove(model)
+        ordered.append(model)
+    return ordered
+
+
+class Command(BaseCommand):
+    help = 'Exporta los datos a un directorio JSONL por modelo (streaming, por bloques de PK)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('labels', nargs='*', help='app_label o app_label.Model (por defecto, todos)')
+        parser.add_argument('--output-dir', default='fenix_export', help='Directorio destino')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Filas por consulta')
+        parser.add_argument(
+            '--exclude', action='append', default=[],
+            help='app_label o app_label.Model a excluir (acumulable)',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        chunk_size = options['chunk_size']
+        if chunk_size <= 0:
+            raise CommandError('--chunk-size debe ser mayor que 0')
+
+        models = resolve_models(options['labels'], DEFAULT_EXCLUDES + options['exclude'])
+        os.makedirs(output_dir, exist_ok=True)
+
+        manifest = {'format': 'fenix-jsonl', 'version': 1, 'models': []}
+        started = time.monotonic()
+        total_rows = 0
+
+        for model in models:
+            file_name = model_file_name(model)
+            rows = self._export_model(model, os.path.join(output_dir, file_name), chunk_size)
+            total_rows += rows
+            manifest['models'].append({
+                'model': model._meta.label_lower,
+                'file': file_name,
+                'count': rows,
+            })
+
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'OK - {total_rows:,} filas de {len(models)} modelos exportadas a {output_dir} '
+            f'en {elapsed:.1f}s'
+        ))
+
+    def _export_model(self, model, path, chunk_size):
+        m2m_fields = [
+            f.name for f in model._meta.many_to_many
+            if f.remote_field.through._meta.auto_created
+        ]
+        base_qs = model._base_manager.order_by('pk')
+        if m2m_fields:
+            base_qs = base_qs.prefetch_related(*m2m_fields)
+
+        serializer = _StreamSerializer()
+        rows = 0
+        last_pk = None
+        started = time.monotonic()
+
+        with open(path, 'w', encoding='utf-8') as out:
+            while True:
+                qs = base_qs if last_pk is None else base_qs.filter(pk__gt=last_pk)
+                chunk = list(qs[:chunk_size])
+                if not chunk:
+                    break
+                for record in serializer.serialize(chunk):
+                    out.write(json.dumps(record, cls=_ExportEncoder, ensure_ascii=False))
+                    out.write('\n')
+                rows += len(chunk)
+                last_pk = chunk[-1].pk
+                if len(chunk) < chunk_size:
+                    break
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'  {model._meta.label_lower}: {rows:,} filas ({rows / elapsed:,.0f} filas/s)'
+        )
+        return rows
@@ -0,0 +1,265 @@
+"""
+Importación de un directorio generado por ``export_fenix``.
+
+- Inserta con ``bulk_create`` por lotes: no se llama a ``save()``, por lo que
+  no se disparan señales (``orders.signals``) ni se generan registros de
+  simple_history; los históricos se importan desde su propio fichero.
+- Conserva ``created_at``/``updated_at`` originales (desactiva auto_now).
+- Guarda un checkpoint tras cada lote: con ``--resume`` continúa donde se quedó.
+  Sin checkpoint, las tablas destino deben estar vacías.
+- Al terminar reinicia las secuencias de PK (PostgreSQL).
+
+Uso:
+    python manage.py import_fenix dumps/
+    python manage.py import_fenix dumps/ --resume --batch-size 5000
+"""
+import contextlib
+import json
+import os
+import time
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+
+from .export_fenix import MANIFEST_NAME
+
+CHECKPOINT_NAME = '.import_checkpoint.json'
+
+
+@contextlib.contextmanager
+def preserve_timestamps(model):
+    """Evita que auto_now/auto_now_add sobrescriban las fechas exportadas."""
+    patched = []
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            patched.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in patched:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Importa un directorio JSONL de export_fenix con bulk_create por lotes y checkpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input_dir', help='Directorio generado por export_fenix')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Filas por lote/transacción')
+        parser.add_argument('--resume', action='store_true', help='Continuar desde el último checkpoint')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        self.input_dir = options['input_dir']
+        self.batch_size = options['batch_size']
+        self.using = options['database']
+        if self.batch_size <= 0:
+            raise CommandError('--batch-size debe ser mayor que 0')
+
+        manifest_path = os.path.join(self.input_dir, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            raise CommandError(f'No se encuentra {manifest_path}')
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        self.checkpoint_path = os.path.join(self.input_dir, CHECKPOINT_NAME)
+        resuming = options['resume'] and os.path.exists(self.checkpoint_path)
+        if resuming:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                self.checkpoint = json.load(f)
+            self.stdout.write('Reanudando desde checkpoint...')
+        else:
+            self.checkpoint = {'files': {}, 'self_refs': {}, 'done': []}
+
+        imported_models = []
+        for entry in manifest['models']:
+            try:
+                imported_models.append((apps.get_model(entry['model']), entry))
+            except LookupError:
+                self.stderr.write(f"  {entry['model']}: SKIP (modelo inexistente)")
+        if not resuming:
+            self._check_empty([model for model, _ in imported_models], options['resume'])
+
+        started = time.monotonic()
+        total_rows = 0
+
+        for model, entry in imported_models:
+            if entry['model'] in self.checkpoint['done']:
+                continue
+            total_rows += self._import_model(model, entry)
+
+        self._reset_sequences([model for model, _ in imported_models])
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'OK - {total_rows:,} filas importadas en {elapsed:.1f}s'
+        ))
+
+    def _check_empty(self, models, resume):
+        """Sin checkpoint solo se importa en tablas vacías (evita un IntegrityError a mitad)."""
+        populated = [
+            model._meta.label_lower for model in models
+            if model._base_manager.using(self.using).exists()
+        ]
+        if not populated:
+            return
+        if resume:
+            hint = (
+                f'No hay checkpoint en {self.input_dir}: la importación anterior terminó '
+                f'o no llegó a empezar, no hay nada que reanudar.'
+            )
+        elif os.path.exists(self.checkpoint_path):
+            hint = 'Hay un checkpoint de una importación interrumpida: usa --resume para continuarla.'
+        else:
+            hint = 'Importa en una base de datos vacía (p.ej. tras "manage.py flush").'
+        raise CommandError(f'Las tablas destino ya tienen datos ({", ".join(populated)}). {hint}')
+
+    # ------------------------------------------------------------------
+    # Importación por modelo
+    # ------------------------------------------------------------------
+
+    def _import_model(self, model, entry):
+        label = entry['model']
+        path = os.path.join(self.input_dir, entry['file'])
+        skip = self.checkpoint['files'].get(entry['file'], 0)
+        expected = entry.get('count') or 0
+        self_ref_fields = [
+            f for f in model._meta.concrete_fields
+            if f.is_relation and f.related_model is model and f.null
+        ]
+
+        rows = skip
+        started = time.monotonic()
+        batch = []
+        first_batch = True
+
+        with preserve_timestamps(model), open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f):
+                if line_no < skip or not line.strip():
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= self.batch_size:
+                    rows += self._flush(model, batch, self_ref_fields, check_existing=first_batch and skip > 0)
+                    first_batch = False
+                    self._save_progress(entry['file'], rows)
+                    self._report(label, rows, expected, started, skip)
+                    batch = []
+            if batch:
+                rows += self._flush(model, batch, self_ref_fields, check_existing=first_batch and skip > 0)
+                self._save_progress(entry['file'], rows)
+
+        self._apply_self_refs(model, label)
+        self.checkpoint['done'].append(label)
+        self._write_checkpoint()
+        self._report(label, rows, expected, started, skip, final=True)
+        return rows - skip
+
+    def _flush(self, model, records, self_ref_fields, check_existing=False):
+        """Inserta un lote en una transacción. Devuelve el nº de líneas consumidas."""
+        label = model._meta.label_lower
+        objects = []
+        m2m_rows = []
+        pending_refs = self.checkpoint['self_refs'].setdefault(label, [])
+
+        for deserialized in serializers.deserialize(
+            'python', records, using=self.using, ignorenonexistent=True,
+        ):
+            obj = deserialized.object
+            # Auto-referencias (p.ej. User.approved_by): se insertan a NULL y se
+            # rellenan al final del modelo, cuando todas las filas existen.
+            for field in self_ref_fields:
+                value = getattr(obj, field.attname)
+                if value is not None:
+                    pending_refs.append([obj.pk, field.attname, value])
+                    setattr(obj, field.attname, None)
+            objects.append(obj)
+            if deserialized.m2m_data:
+                m2m_rows.append((obj.pk, deserialized.m2m_data))
+
+        if check_existing:
+            # Tras un corte entre commit y checkpoint, el lote puede existir ya
+            existing = set(
+                model._base_manager.using(self.using)
+                .filter(pk__in=[o.pk for o in objects])
+                .values_list('pk', flat=True)
+            )
+            objects = [o for o in objects if o.pk not in existing]
+
+        with transaction.atomic(using=self.using):
+            model._base_manager.using(self.using).bulk_create(objects, batch_size=self.batch_size)
+            self._insert_m2m(model, m2m_rows)
+        return len(records)
+
+    def _insert_m2m(self, model, m2m_rows):
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            links = [
+                through(**{f'{source}_id': pk, f'{target}_id': related_pk})
+                for pk, data in m2m_rows
+                for related_pk in data.get(field.name, [])
+            ]
+            if links:
+                through._default_manager.using(self.using).bulk_create(
+                    links, batch_size=self.batch_size, ignore_conflicts=True,
+                )
+
+    def _apply_self_refs(self, model, label):
+        pending = self.checkpoint['self_refs'].pop(label, [])
+        if not pending:
+            return
+        by_pk = {}
+        for pk, attname, value in pending:
+            by_pk.setdefault(pk, {})[attname] = value
+        objs = list(model._base_manager.using(self.using).filter(pk__in=by_pk.keys()))
+        attnames = set()
+        for obj in objs:
+            for attname, value in by_pk[obj.pk].items():
+                setattr(obj, attname, value)
+                attnames.add(attname)
+        with preserve_timestamps(model), transaction.atomic(using=self.using):
+            model._base_manager.using(self.using).bulk_update(
+                objs, [model._meta.get_field(a).name for a in sorted(attnames)],
+                batch_size=self.batch_size,
+            )
+
+    def _reset_sequences(self, models):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    # ------------------------------------------------------------------
+    # Checkpoint y progreso
+    # ------------------------------------------------------------------
+
+    def _save_progress(self, file_name, rows):
+        self.checkpoint['files'][file_name] = rows
+        self._write_checkpoint()
+
+    def _write_checkpoint(self):
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _report(self, label, rows, expected, started, skip, final=False):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = (rows - skip) / elapsed
+        progress = f'{rows:,}/{expected:,}' if expected else f'{rows:,}'
+        line = f'  {label}: {progress} filas ({rate:,.0f} filas/s)'
+        if final:
+            self.stdout.write(line)
+        else:
+            self.stdout.write(line, ending='\r')
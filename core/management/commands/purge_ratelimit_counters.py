@@ -0,0 +1,18 @@
+"""
+Borra los contadores de ``core.ratelimit`` en BD (``RATELIMIT_STORE=db`` o
+caída de la caché) que ya no cuentan para ningún límite.
+
+Pensado para ejecutarse periódicamente (cron de App Engine), p.ej. cada hora:
+    python manage.py purge_ratelimit_counters
+"""
+from django.core.management.base import BaseCommand
+
+from core.ratelimit import purge_counters
+
+
+class Command(BaseCommand):
+    help = 'Borra los contadores de rate limit caducados'
+
+    def handle(self, *args, **options):
+        deleted = purge_counters()
+        self.stdout.write(self.style.SUCCESS(f'OK - {deleted} contadores borrados'))
@@ -0,0 +1,59 @@
+"""
+Verifica que ``Product.stock_available`` coincide con la suma del libro
+``StockMovement`` de cada producto, en una sola consulta agregada.
+
+Uso:
+    python manage.py reconcile_stock
+    python manage.py reconcile_stock --fix    # registra un ajuste que cuadra el libro
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from catalog.models import Product, StockMovement
+
+
+class Command(BaseCommand):
+    help = 'Compara el stock de cada producto con su libro de movimientos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Registra un ajuste manual por la diferencia para que el libro cuadre con el saldo',
+        )
+
+    def handle(self, *args, **options):
+        # Un único GROUP BY ... HAVING sobre productos y movimientos
+        mismatches = list(
+            Product.objects.order_by('pk')
+            .annotate(ledger_balance=Coalesce(Sum('stock_movements__quantity'), Value(0)))
+            .exclude(stock_available=F('ledger_balance'))
+            .values_list('pk', 'name_es', 'stock_available', 'ledger_balance')
+        )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('OK - todos los saldos cuadran con el libro'))
+            return
+
+        for pk, name, stock, balance in mismatches:
+            self.stdout.write(
+                f'  #{pk} {name}: stock={stock} libro={balance} diferencia={stock - balance:+d}'
+            )
+
+        if options['fix']:
+            with transaction.atomic():
+                StockMovement.objects.bulk_create([
+                    StockMovement(
+                        product_id=pk,
+                        kind=StockMovement.KIND_MANUAL_ADJUSTMENT,
+                        quantity=stock - balance,
+                        note='Ajuste de conciliación (reconcile_stock)',
+                    )
+                    for pk, _name, stock, balance in mismatches
+                ])
+            self.stdout.write(self.style.SUCCESS(f'{len(mismatches)} ajustes de conciliación registrados'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'{len(mismatches)} productos descuadrados (usa --fix para registrar ajustes)'
+            ))
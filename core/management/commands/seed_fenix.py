@@ -0,0 +1,66 @@
+"""
+Genera datos sintéticos realistas para pruebas de carga y de escala
+(ver ``core/seeding.py``).
+
+Uso:
+    python manage.py seed_fenix
+    python manage.py seed_fenix --orders 1000000 --users 20000 --products 5000
+    python manage.py seed_fenix --seed 7 --days 730 --batch-size 10000
+
+La misma ``--seed`` genera los mismos datos; los usuarios generados llevan el
+prefijo ``seed<seed>-`` en el email, así que una semilla solo se carga una vez
+por base de datos. Contraseña de todos los usuarios: ``fenix-seed-2026``.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seeding import SEED_PASSWORD, FenixSeeder, SeedConfig
+
+
+class Command(BaseCommand):
+    help = 'Genera empresas, usuarios, productos, pedidos, notificaciones y sesiones sintéticos'
+
+    def add_arguments(self, parser):
+        defaults = SeedConfig()
+        for name in ('companies', 'users', 'products', 'orders', 'recurring', 'notifications', 'sessions'):
+            parser.add_argument(
+                f'--{name}', type=int, default=getattr(defaults, name),
+                help=f'Número de {name} a generar (por defecto {getattr(defaults, name)})',
+            )
+        parser.add_argument('--days', type=int, default=defaults.days,
+                            help='Antigüedad máxima de los pedidos en días')
+        parser.add_argument('--seed', type=int, default=defaults.seed,
+                            help='Semilla del generador (determinista)')
+        parser.add_argument('--batch-size', type=int, default=defaults.batch_size,
+                            help='Filas por bulk_create y por transacción')
+        parser.add_argument('--force', action='store_true',
+                            help='Permite ejecutar con DEBUG=False (p.ej. en una base de staging)')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('seed_fenix solo se ejecuta con DEBUG=True (o con --force)')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor que 0')
+
+        config = SeedConfig(**{
+            name: options[name]
+            for name in ('companies', 'users', 'products', 'orders', 'recurring',
+                         'notifications', 'sessions', 'days', 'seed', 'batch_size')
+        })
+        seeder = FenixSeeder(config, stdout=self.stdout)
+        if seeder.already_seeded():
+            raise CommandError(
+                f'La semilla {config.seed} ya está cargada en esta base de datos; usa otra --seed'
+            )
+
+        started = time.monotonic()
+        result = seeder.run()
+        elapsed = time.monotonic() - started
+
+        for key, count in result.counts.items():
+            self.stdout.write(f'  {key}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'OK - datos generados en {elapsed:.1f}s (contraseña de los usuarios: {SEED_PASSWORD})'
+        ))
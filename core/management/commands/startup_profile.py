@@ -0,0 +1,157 @@
+"""
+Mide el coste de importación del arranque de un worker (``-X importtime``).
+
+Lanza un intérprete nuevo que hace lo mismo que gunicorn al arrancar
+(``fenix.wsgi`` -> ``django.setup()``) y, salvo ``--no-urls``, carga también
+el URLconf (lo que paga la primera petición). Agrupa el tiempo propio de cada
+módulo por app del proyecto, Django, dependencias de terceros y stdlib, y
+lista los módulos más caros con la app del proyecto que los importó.
+
+Uso:
+    python manage.py startup_profile
+    python manage.py startup_profile --runs 5 --top 25
+    python manage.py startup_profile --json > startup.json
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$')
+
+_SCRIPT = '''
+import time
+start = time.perf_counter()
+import fenix.wsgi
+if {urls}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+print(round((time.perf_counter() - start) * 1000, 1))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Perfil de importación del arranque (tiempo por app y módulos más caros)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3,
+                            help='Arranques a medir; se informa del más rápido (por defecto 3)')
+        parser.add_argument('--top', type=int, default=15, help='Módulos más caros a listar')
+        parser.add_argument('--no-urls', action='store_true',
+                            help='No cargar el URLconf (solo django.setup())')
+        parser.add_argument('--json', action='store_true', help='Salida en JSON')
+
+    def handle(self, *args, **options):
+        runs = [self._run(not options['no_urls']) for _ in range(max(options['runs'], 1))]
+        wall_ms, lines = min(runs, key=lambda run: run[0])
+        modules = _parse(lines)
+        groups = _group_totals(modules, self._local_apps())
+        heaviest = sorted(modules, key=lambda m: m['cumulative_us'], reverse=True)
+        heaviest = [m for m in heaviest if m['group'] not in ('stdlib',)][:options['top']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'wall_ms': wall_ms,
+                'runs': [ms for ms, _lines in runs],
+                'groups': groups,
+                'heaviest': heaviest,
+            }, indent=2))
+            return
+
+        self.stdout.write(f'Arranque: {wall_ms} ms (mejor de {len(runs)}: {[ms for ms, _ in runs]})')
+        self.stdout.write('(el tiempo propio de fenix incluye la ejecución de django.setup())')
+        self.stdout.write(f'\n{"Grupo":<28}{"ms propios":>12}{"módulos":>10}')
+        for row in groups[:options['top']]:
+            self.stdout.write(f'{row["group"]:<28}{row["self_ms"]:>12.1f}{row["modules"]:>10}')
+
+        self.stdout.write(f'\n{"Módulo":<44}{"ms acum.":>10}  importado desde')
+        for module in heaviest:
+            self.stdout.write(
+                f'{module["name"]:<44}{module["cumulative_us"] / 1000:>10.1f}  {module["imported_by"] or "-"}'
+            )
+
+    def _run(self, load_urls: bool):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'fenix.settings')}
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _SCRIPT.format(urls=load_urls)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f'El arranque falló:\n{proc.stderr[-2000:]}')
+        return float(proc.stdout.strip().splitlines()[-1]), proc.stderr.splitlines()
+
+    def _local_apps(self) -> dict[str, str]:
+        """Paquete raíz -> etiqueta, para las apps que viven en el proyecto."""
+        base = Path(settings.BASE_DIR).resolve()
+        local = {}
+        for config in apps.get_app_configs():
+            if Path(config.path).resolve().is_relative_to(base):
+                local[config.name.split('.')[0]] = config.name
+        local['fenix'] = 'fenix'
+        return local
+
+
+def _parse(lines) -> list[dict]:
+    """
+    Convierte la salida de ``-X importtime`` en módulos con su importador.
+    Cada línea aparece después de las de sus hijos (indentados un nivel más).
+    """
+    modules = []
+    pending: dict[int, list[dict]] = defaultdict(list)
+    for line in lines:
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = {
+            'name': name,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'children': pending.pop(depth + 1, []),
+            'parent': None,
+        }
+        for child in node['children']:
+            child['parent'] = node
+        pending[depth].append(node)
+        modules.append(node)
+    return modules
+
+
+def _group_totals(modules, local_apps: dict[str, str]) -> list[dict]:
+    stdlib = sys.stdlib_module_names
+    totals: dict[str, list] = defaultdict(lambda: [0, 0])
+    for module in modules:
+        root = module['name'].split('.')[0]
+        if root in local_apps:
+            group = local_apps[root]
+        elif root == 'django':
+            group = 'django'
+        elif root in stdlib or root.startswith('_'):
+            group = 'stdlib'
+        else:
+            group = f'terceros: {root}'
+        module['group'] = group
+
+    for module in modules:
+        importer = module['parent']
+        while importer is not None and importer['name'].split('.')[0] not in local_apps:
+            importer = importer['parent']
+        module['imported_by'] = importer['name'] if importer else None
+        totals[module['group']][0] += module['self_us']
+        totals[module['group']][1] += 1
+
+    for module in modules:
+        del module['children'], module['parent']
+    return sorted(
+        ({'group': group, 'self_ms': round(us / 1000, 1), 'modules': count}
+         for group, (us, count) in totals.items()),
+        key=lambda row: row['self_ms'], reverse=True,
+    )
@@ -0,0 +1,405 @@
+"""
+Registro ligero de métricas (counters, gauges, histogramas) con exposición en
+formato de texto de Prometheus (``/metrics``, ver ``core.views.metrics``).
+
+Uso en los módulos instrumentados:
+
+    from core import metrics
+
+    EMAILS = metrics.counter('fenix_emails_total', 'Emails de pedidos', ['event', 'result'])
+    EMAILS.inc(event='order_created', result='ok')
+
+    PDF_SECONDS = metrics.histogram('fenix_pdf_render_seconds', 'Generación de PDF')
+    with PDF_SECONDS.time():
+        ...
+
+Multiproceso (gunicorn): con ``METRICS_MULTIPROC_DIR`` cada proceso vuelca su
+estado a ``<dir>/<pid>-<arranque>.json`` (como mucho cada
+``METRICS_FLUSH_SECONDS`` y al salir) y ``/metrics`` suma los ficheros de todos
+los procesos. El arranque del proceso (``/proc``, o un uuid donde no existe) va
+en el nombre: un pid reciclado tras reiniciar el contenedor no pisa el fichero
+de otro proceso. Los counters e histogramas de procesos terminados se compactan
+en ``accumulated.json`` y sus ficheros se borran; los gauges solo cuentan de
+procesos vivos. Sin directorio configurado se expone solo el proceso actual.
+"""
+import atexit
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo no se compacta
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.RLock()
+_metrics: dict[str, '_Metric'] = {}
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name}: etiquetas {sorted(labels)} != {list(self.labelnames)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def dump(self) -> dict:
+        return {
+            'type': self.kind,
+            'help': self.documentation,
+            'labels': list(self.labelnames),
+            'samples': [[list(key), value] for key, value in self.samples.items()],
+        }
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError('Un counter solo puede incrementarse')
+        key = self._key(labels)
+        with _lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+        _store.changed()
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self.samples[key] = value
+        _store.changed()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+        _store.changed()
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+        _store.changed()
+
+    @contextmanager
+    def time(self, **labels):
+        """Observa la duración del bloque en segundos (también si lanza excepción)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def dump(self) -> dict:
+        data = super().dump()
+        data['samples'] = [
+            [key, {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}]
+            for key, value in data['samples']
+        ]
+        data['buckets'] = list(self.buckets)
+        return data
+
+
+def _get_or_create(cls, name, documentation, labelnames, **kwargs):
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f'La métrica {name} ya existe con otro tipo')
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return _get_or_create(Counter, name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    return _get_or_create(Gauge, name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+# ----------------------------------------------------------------------
+# Volcado multiproceso
+# ----------------------------------------------------------------------
+
+ACCUMULATED_NAME = 'accumulated.json'
+
+
+def _process_start(pid: int) -> str | None:
+    """Instante de arranque del proceso (ticks desde el boot, Linux) o None."""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as fh:
+            stat = fh.read()
+    except OSError:
+        return None
+    # El nombre del proceso (campo 2) puede tener espacios: se parte tras el último ')'
+    return stat.rsplit(b')', 1)[1].split()[19].decode()
+
+
+def _write_json(directory: str, name: str, data: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh)
+    os.replace(tmp, os.path.join(directory, name))
+
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+class _MultiprocessStore:
+    def __init__(self):
+        self._last_flush = 0.0
+        self._registered = False
+        self._pid = None
+        self._start = None
+
+    @property
+    def directory(self) -> str:
+        return getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+
+    def identity(self) -> tuple[int, str]:
+        """``(pid, arranque)`` del proceso actual (se recalcula tras un fork)."""
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid, self._start = pid, _process_start(pid) or uuid.uuid4().hex
+        return self._pid, self._start
+
+    def changed(self) -> None:
+        if not self.directory:
+            return
+        if not self._registered:
+            self._registered = True
+            atexit.register(self.flush)
+        if time.monotonic() - self._last_flush >= getattr(settings, 'METRICS_FLUSH_SECONDS', 5):
+            self.flush()
+
+    def flush(self) -> None:
+        directory = self.directory
+        if not directory:
+            return
+        with _lock:
+            snapshot = {name: metric.dump() for name, metric in _metrics.items()}
+            self._last_flush = time.monotonic()
+        pid, start = self.identity()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _write_json(directory, f'{pid}-{start}.json', {'pid': pid, 'start': start, 'metrics': snapshot})
+        except OSError:
+            logger.exception('No se pudieron volcar las métricas en %s', directory)
+
+
+_store = _MultiprocessStore()
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_alive(data: dict) -> bool:
+    """El proceso del fichero sigue vivo (mismo pid y mismo arranque)."""
+    pid = data.get('pid', 0)
+    if not _pid_alive(pid):
+        return False
+    current = _process_start(pid)
+    return current is None or data.get('start') in (None, current)
+
+
+def _merge(merged: dict, metrics_data: dict, gauges: bool = True) -> None:
+    """Suma ``metrics_data`` (formato ``dump``) en ``merged`` (muestras por clave)."""
+    for name, metric in metrics_data.items():
+        if metric['type'] == 'gauge' and not gauges:
+            continue
+        target = merged.setdefault(name, {**metric, 'samples': {}})
+        for key, value in metric['samples']:
+            key = tuple(key)
+            current = target['samples'].get(key)
+            if metric['type'] == 'histogram':
+                if current is None:
+                    target['samples'][key] = {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+                else:
+                    current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                    current['sum'] += value['sum']
+                    current['count'] += value['count']
+            else:
+                target['samples'][key] = (current or 0) + value
+
+
+def _as_dump(merged: dict) -> dict:
+    return {
+        name: {**metric, 'samples': [[list(key), value] for key, value in metric['samples'].items()]}
+        for name, metric in merged.items()
+    }
+
+
+@contextmanager
+def _directory_lock(directory: str):
+    """Bloqueo exclusivo del directorio (un solo ``collect`` compacta a la vez)."""
+    if fcntl is None:
+        yield False
+        return
+    with open(os.path.join(directory, '.lock'), 'a') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _compact(directory: str, accumulated: dict, dead: dict) -> dict:
+    """
+    Pasa los counters e histogramas de los ficheros de procesos terminados a
+    ``accumulated.json`` y borra esos ficheros. ``merged`` guarda los nombres
+    ya sumados: si el proceso muere antes de borrarlos no se suman dos veces.
+    """
+    pending = {name: data for name, data in dead.items() if name not in accumulated['merged']}
+    if pending:
+        merged = {}
+        _merge(merged, accumulated['metrics'])
+        for data in pending.values():
+            _merge(merged, data['metrics'], gauges=False)
+        accumulated = {
+            'merged': [name for name in accumulated['merged'] if name in dead] + list(pending),
+            'metrics': _as_dump(merged),
+        }
+        _write_json(directory, ACCUMULATED_NAME, accumulated)
+    for name in dead:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+    return accumulated
+
+
+def collect() -> dict:
+    """Estado agregado de todos los procesos (o solo del actual)."""
+    if not _store.directory:
+        with _lock:
+            return {name: metric.dump() for name, metric in _metrics.items()}
+
+    directory = _store.directory
+    _store.flush()
+    merged: dict[str, dict] = {}
+    with _directory_lock(directory) as locked:
+        accumulated = _read_json(os.path.join(directory, ACCUMULATED_NAME)) or {'merged': [], 'metrics': {}}
+        live, dead = {}, {}
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.json') or filename.startswith('.') or filename == ACCUMULATED_NAME:
+                continue
+            data = _read_json(os.path.join(directory, filename))
+            if data is None:
+                continue
+            (live if _process_alive(data) else dead)[filename] = data
+        if locked:
+            accumulated = _compact(directory, accumulated, dead)
+        else:
+            for filename, data in dead.items():
+                if filename not in accumulated['merged']:
+                    _merge(merged, data['metrics'], gauges=False)
+    _merge(merged, accumulated['metrics'])
+    for data in live.values():
+        _merge(merged, data['metrics'])
+    return _as_dump(merged)
+
+
+# ----------------------------------------------------------------------
+# Formato de exposición
+# ----------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_text() -> str:
+    lines = []
+    for name, metric in sorted(collect().items()):
+        lines.append(f'# HELP {name} {_escape(metric["help"])}')
+        lines.append(f'# TYPE {name} {metric["type"]}')
+        labelnames = metric['labels']
+        for key, value in metric['samples']:
+            if metric['type'] == 'histogram':
+                bounds = [str(bound) for bound in metric['buckets']] + ['+Inf']
+                counts = list(value['buckets']) + [value['count']]
+                for bound, count in zip(bounds, counts):
+                    le = 'le="%s"' % bound
+                    lines.append(f'{name}_bucket{_labels(labelnames, key, [le])} {count}')
+                lines.append(f'{name}_sum{_labels(labelnames, key)} {_number(value["sum"])}')
+                lines.append(f'{name}_count{_labels(labelnames, key)} {value["count"]}')
+            else:
+                lines.append(f'{name}{_labels(labelnames, key)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset() -> None:
+    """Pone a cero todas las métricas del proceso (tests)."""
+    with _lock:
+        for metric in _metrics.values():
+            metric.samples.clear()
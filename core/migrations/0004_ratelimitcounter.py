@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_platformsettings_order_notification_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100)),
+                ('window', models.BigIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Rate limit counter',
+                'verbose_name_plural': 'Rate limit counters',
+                'constraints': [models.UniqueConstraint(fields=('key', 'window'), name='ratelimit_key_window_uniq')],
+            },
+        ),
+    ]
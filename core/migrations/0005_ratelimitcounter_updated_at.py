@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_ratelimitcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ratelimitcounter',
+            name='updated_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
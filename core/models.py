@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 # Import AuditLog from audit module to avoid duplication
@@ -69,5 +70,23 @@ class PlatformSettings(models.Model):
         return obj
 
 
+class RateLimitCounter(models.Model):
+    """Contador de ``core.ratelimit`` cuando no se usa (o falla) la caché."""
+    key = models.CharField(max_length=100)
+    window = models.BigIntegerField()  # índice de ventana: epoch // duración
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)  # para purge_counters
+
+    class Meta:
+        verbose_name = 'Rate limit counter'
+        verbose_name_plural = 'Rate limit counters'
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'window'], name='ratelimit_key_window_uniq'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.key}@{self.window}: {self.count}'
+
+
 # AuditLog model is now imported from audit.py
-__all__ = ['PlatformSettings', 'AuditLog']
+__all__ = ['PlatformSettings', 'AuditLog', 'RateLimitCounter']
@@ -0,0 +1,210 @@
+"""
+Paginación por cursor (keyset).
+
+``Paginator`` hace COUNT y ``OFFSET``: el coste crece con el número de filas y
+con la página pedida. ``KeysetPaginator`` filtra por los valores de la última
+fila vista (``WHERE (date_joined, id) < (...)``) y pide ``per_page + 1`` filas
+para saber si hay más, así que cada página cuesta lo mismo y aprovecha un
+índice con el mismo orden.
+
+    page = KeysetPaginator(qs, ordering=('-date_joined', '-pk'), per_page=20).page(request.GET.get('cursor'))
+    page.object_list, page.next_cursor, page.previous_cursor
+
+Los campos de ``ordering`` no pueden ser nulos y el último debe ser único
+(normalmente ``pk``). Un cursor inválido devuelve la primera página.
+
+Para mostrar "unos N resultados" sin un COUNT(*) de toda la tabla:
+``estimated_count(qs)`` usa la estimación del planificador en PostgreSQL
+(``pg_class.reltuples`` sin filtros, ``EXPLAIN`` con filtros) y en el resto
+un COUNT acotado; ``EstimatedCountPaginator`` lo aplica al admin.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    per_page: int = 0
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering=('-pk',), per_page: int = 20):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        meta = queryset.model._meta
+        self.fields = [
+            meta.pk if name == 'pk' else meta.get_field(name) for name, _desc in self.ordering
+        ]
+
+    # -- cursores --------------------------------------------------------
+
+    def _encode(self, direction: str, obj) -> str:
+        values = [field.value_to_string(obj) for field in self.fields]
+        raw = json.dumps([direction, values], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def _decode(self, cursor: str):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+            if direction not in ('n', 'p') or len(values) != len(self.fields):
+                return None
+            return direction, [field.to_python(v) for field, v in zip(self.fields, values)]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            return None
+
+    # -- consulta --------------------------------------------------------
+
+    def _seek(self, values, forward: bool) -> Q:
+        """(a, b) > (x, y) expandido: a > x OR (a = x AND b > y), según el sentido de cada campo."""
+        clauses = []
+        for i, ((name, desc), value) in enumerate(zip(self.ordering, values)):
+            lookup = 'lt' if desc == forward else 'gt'
+            equal = {self.ordering[j][0]: values[j] for j in range(i)}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': value}))
+        return reduce(or_, clauses)
+
+    def _order_by(self, forward: bool):
+        return [f'-{name}' if desc == forward else name for name, desc in self.ordering]
+
+    def page(self, cursor: str | None = None) -> KeysetPage:
+        decoded = self._decode(cursor) if cursor else None
+        forward = decoded is None or decoded[0] == 'n'
+
+        qs = self.queryset.order_by(*self._order_by(forward))
+        if decoded is not None:
+            qs = qs.filter(self._seek(decoded[1], forward))
+        rows = list(qs[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        page = KeysetPage(object_list=rows, per_page=self.per_page)
+        if rows:
+            if (more if forward else decoded is not None):
+                page.next_cursor = self._encode('n', rows[-1])
+            if (decoded is not None if forward else more):
+                page.previous_cursor = self._encode('p', rows[0])
+        return page
+
+
+# ----------------------------------------------------------------------
+# Recuentos estimados
+# ----------------------------------------------------------------------
+
+EXACT_COUNT_LIMIT = 1000
+
+
+@dataclass
+class Estimate:
+    count: int
+    exact: bool
+
+
+def estimated_count(queryset, exact_limit: int = EXACT_COUNT_LIMIT) -> Estimate:
+    """
+    Recuento exacto si hay como mucho ``exact_limit`` filas (COUNT acotado con
+    LIMIT, barato con un índice); si hay más, la estimación del planificador
+    en PostgreSQL o ``exact_limit`` como cota inferior en el resto.
+    """
+    bounded = queryset.order_by()[:exact_limit + 1].count()
+    if bounded <= exact_limit:
+        return Estimate(bounded, True)
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+            else:
+                sql, params = queryset.order_by().values('pk').query.sql_with_params()
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            row = cursor.fetchone()
+        if not queryset.query.where:
+            planned = int(row[0])
+        else:
+            plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+            planned = int(plan[0]['Plan']['Plan Rows'])
+        return Estimate(max(planned, bounded), False)
+    return Estimate(bounded, False)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    ``Paginator`` para ``ModelAdmin.paginator`` con ``estimated_count``.
+
+    El total solo se usa para mostrarlo: la estimación puede quedarse corta
+    (``reltuples`` desactualizado o -1, o la cota fuera de PostgreSQL), así
+    que ``page`` no valida el número contra ella. Pide ``per_page + 1`` filas
+    para saber si hay página siguiente y ``num_pages`` nunca queda por debajo
+    de la página pedida (más una si quedan filas).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._seen_pages = 0
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        return estimated_count(self.object_list).count
+
+    @property
+    def num_pages(self):
+        return max(super().num_pages, self._seen_pages)
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        more = len(rows) > self.per_page
+        self._seen_pages = max(self._seen_pages, number + 1 if more else number)
+        return self._get_page(rows[:self.per_page], number, self)
@@ -0,0 +1,194 @@
+"""
+Limitación de peticiones por ventana deslizante.
+
+Cada clave (``scope`` + IP o cuenta) cuenta las peticiones en ventanas fijas
+de ``window`` segundos y estima la ventana deslizante ponderando la anterior:
+
+    estimado = anterior * (1 - transcurrido / window) + actual
+
+Los contadores viven en la caché de Django (``RATELIMIT_CACHE``); si la
+caché falla, o con ``RATELIMIT_STORE = 'db'``, en ``core.RateLimitCounter``.
+Con la caché en memoria por defecto cada worker cuenta por su cuenta: con
+varios workers conviene una caché compartida o el almacén en BD (y
+``purge_ratelimit_counters`` periódico para las claves que no vuelven).
+
+    @ratelimit('login', keys={'ip': 'ip', 'account': 'username'}, on_limited=...)
+    def login_view(request): ...
+
+El decorador decide antes de ejecutar la vista, así que una petición
+rechazada no llega a validar contraseñas. Los límites se leen de
+``RATELIMIT_RATES`` (``'<scope>_<clave>': '10/5m'``).
+"""
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+REJECTIONS = metrics.counter(
+    'fenix_ratelimit_rejections_total', 'Peticiones rechazadas por límite de frecuencia', ['scope'],
+)
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """``'10/5m'`` -> (10, 300). Sin número en la unidad vale 1 (``'5/h'``)."""
+    limit, period = rate.split('/')
+    amount = period[:-1] or '1'
+    return int(limit), int(amount) * UNITS[period[-1]]
+
+
+@dataclass
+class Result:
+    allowed: bool
+    count: float
+    limit: int
+    retry_after: int
+    scope: str = ''
+    kind: str = ''
+    identifier: str = ''
+
+
+# ----------------------------------------------------------------------
+# Almacenes de contadores
+# ----------------------------------------------------------------------
+
+class CacheStore:
+    def hit(self, key: str, window: int, index: int) -> tuple[int, int]:
+        cache = caches[settings.RATELIMIT_CACHE]
+        current_key, previous_key = f'rl:{key}:{index}', f'rl:{key}:{index - 1}'
+        if cache.add(current_key, 1, timeout=window * 2):
+            current = 1
+        else:
+            try:
+                current = cache.incr(current_key)
+            except ValueError:  # caducó entre add() e incr()
+                cache.set(current_key, 1, timeout=window * 2)
+                current = 1
+        return current, cache.get(previous_key, 0)
+
+
+class DatabaseStore:
+    def hit(self, key: str, window: int, index: int) -> tuple[int, int]:
+        from .models import RateLimitCounter
+
+        counters = RateLimitCounter.objects.filter(key=key)
+        now = timezone.now()
+        if not counters.filter(window=index).update(count=F('count') + 1, updated_at=now):
+            try:
+                with transaction.atomic():
+                    RateLimitCounter.objects.create(key=key, window=index, count=1, updated_at=now)
+                # Primera petición de la ventana: se borran las anteriores a la previa
+                counters.filter(window__lt=index - 1).delete()
+            except IntegrityError:
+                counters.filter(window=index).update(count=F('count') + 1, updated_at=now)
+        values = dict(counters.filter(window__in=(index - 1, index)).values_list('window', 'count'))
+        return values.get(index, 1), values.get(index - 1, 0)
+
+
+_stores = {'cache': CacheStore(), 'db': DatabaseStore()}
+
+
+def purge_counters() -> int:
+    """
+    Borra los contadores en BD que ya no cuentan para ningún límite (sin
+    escrituras en dos ventanas de la tasa más larga). ``DatabaseStore`` solo
+    limpia las ventanas viejas de la clave que recibe peticiones, así que las
+    IPs y cuentas que no vuelven se quedarían para siempre.
+    """
+    from .models import RateLimitCounter
+
+    longest = max((parse_rate(rate)[1] for rate in settings.RATELIMIT_RATES.values()), default=0)
+    cutoff = timezone.now() - timedelta(seconds=2 * longest)
+    deleted, _ = RateLimitCounter.objects.filter(updated_at__lt=cutoff).delete()
+    return deleted
+
+
+def hit(scope: str, identifier: str, rate: str, now: float | None = None) -> Result:
+    """Cuenta una petición de ``identifier`` en ``scope`` y dice si se permite."""
+    limit, window = parse_rate(rate)
+    now = time.time() if now is None else now
+    index, elapsed = divmod(now, window)
+    index = int(index)
+    key = f'{scope}:{hashlib.sha256(identifier.encode()).hexdigest()[:32]}'
+
+    store = _stores.get(settings.RATELIMIT_STORE, _stores['cache'])
+    try:
+        current, previous = store.hit(key, window, index)
+    except Exception as exc:
+        if store is _stores['db']:
+            raise
+        logger.warning('Caché de rate limit no disponible (%s); se usa la base de datos', exc)
+        current, previous = _stores['db'].hit(key, window, index)
+
+    count = previous * (1 - elapsed / window) + current
+    return Result(
+        allowed=count <= limit,
+        count=count,
+        limit=limit,
+        retry_after=max(1, int(window - elapsed)),
+        scope=scope,
+    )
+
+
+# ----------------------------------------------------------------------
+# Decorador
+# ----------------------------------------------------------------------
+
+def client_ip(request) -> str:
+    """IP del cliente: ``RATELIMIT_IP_META`` (cabecera fijada por el proxy) o REMOTE_ADDR."""
+    return (request.META.get(settings.RATELIMIT_IP_META) or request.META.get('REMOTE_ADDR') or '').strip()
+
+
+def _identifier(request, source: str) -> str:
+    if source == 'ip':
+        return client_ip(request)
+    return (request.POST.get(source) or '').strip().lower()
+
+
+def default_on_limited(request, result: Result):
+    response = JsonResponse(
+        {'success': False, 'error': _('Demasiadas peticiones. Inténtalo más tarde.')}, status=429,
+    )
+    response['Retry-After'] = str(result.retry_after)
+    return response
+
+
+def ratelimit(scope: str, keys: dict[str, str], methods=('POST',), on_limited=default_on_limited):
+    """
+    Aplica ``RATELIMIT_RATES['<scope>_<nombre>']`` a cada clave de ``keys``
+    (``{'ip': 'ip', 'account': '<campo POST>'}``). Con la primera que se
+    supere se responde con ``on_limited(request, result)``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                for kind, source in keys.items():
+                    rate = settings.RATELIMIT_RATES.get(f'{scope}_{kind}')
+                    identifier = _identifier(request, source)
+                    if not rate or not identifier:
+                        continue
+                    result = hit(scope, f'{kind}:{identifier}', rate)
+                    if not result.allowed:
+                        result.kind, result.identifier = kind, identifier
+                        REJECTIONS.inc(scope=scope)
+                        logger.warning('Rate limit %s/%s superado (%s)', scope, kind, client_ip(request))
+                        return on_limited(request, result)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
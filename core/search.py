@@ -0,0 +1,16 @@
+"""
+Normalización de texto para columnas de búsqueda.
+
+``normalize_search`` pasa a minúsculas, quita acentos y colapsa espacios, de
+modo que ``columna__contains=normalize_search(q)`` equivale a un ``icontains``
+insensible a acentos sin funciones en el WHERE (en PostgreSQL lo resuelve un
+índice trigram ``gin_trgm_ops``).
+"""
+import unicodedata
+
+
+def normalize_search(*values) -> str:
+    text = ' '.join(str(v) for v in values if v)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
@@ -0,0 +1,468 @@
+"""
+Generador de datos sintéticos realistas (pruebas de carga y de escala).
+
+Crea empresas, usuarios con perfil operativo completo, productos bilingües
+con su saldo de apertura en el libro de stock, pedidos con líneas, eventos y
+documentos, pedidos recurrentes, notificaciones y sesiones. Todo con
+``bulk_create`` por bloques (sin señales ni ``save()`` por objeto) y un
+``random.Random(seed)`` propio: la misma configuración genera los mismos datos.
+
+Distribución temporal de los pedidos: más pedidos cuanto más recientes,
+menos en fin de semana y picos por la mañana; el estado depende de la
+antigüedad (los antiguos están entregados o cancelados). Clientes y productos
+siguen una distribución de popularidad sesgada (pocos concentran muchos
+pedidos), como en producción.
+
+Los pedidos generados no tienen el stock descontado (``stock_deducted=False``)
+para que el libro cuadre con los saldos (``reconcile_stock``).
+
+Uso desde código (el comando ``seed_fenix`` es un envoltorio):
+
+    from core.seeding import FenixSeeder, SeedConfig
+    FenixSeeder(SeedConfig(orders=100_000)).run()
+"""
+import contextlib
+import itertools
+import logging
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.models import User, UserSession
+from catalog.models import Product, StockMovement
+from notifications.models import Notification
+from orders.models import Order, OrderDocument, OrderEvent, OrderItem
+from organizations.models import Company, UserCompany
+from recurring.models import RecurringOrder, RecurringOrderItem
+
+from .search import normalize_search
+
+logger = logging.getLogger(__name__)
+
+SEED_PASSWORD = 'fenix-seed-2026'
+EMAIL_DOMAIN = 'seed.fenix.test'
+
+# (es, zh-hans)
+PRODUCT_WORDS = [
+    ('Arroz', '米'), ('Aceite de oliva', '橄榄油'), ('Tomate', '番茄'), ('Cebolla', '洋葱'),
+    ('Ajo', '大蒜'), ('Patata', '土豆'), ('Pollo', '鸡肉'), ('Cerdo', '猪肉'),
+    ('Ternera', '牛肉'), ('Gambas', '虾'), ('Calamar', '鱿鱼'), ('Salmón', '三文鱼'),
+    ('Tofu', '豆腐'), ('Fideos', '面条'), ('Salsa de soja', '酱油'), ('Vinagre', '醋'),
+    ('Harina', '面粉'), ('Azúcar', '糖'), ('Sal', '盐'), ('Huevos', '鸡蛋'),
+    ('Leche', '牛奶'), ('Queso', '奶酪'), ('Pimiento', '辣椒'), ('Jengibre', '姜'),
+    ('Setas', '蘑菇'), ('Col china', '白菜'), ('Cilantro', '香菜'), ('Sésamo', '芝麻'),
+]
+PRODUCT_FORMATS = [
+    ('500 g', '500克'), ('1 Kg', '1公斤'), ('5 Kg', '5公斤'), ('Caja', '箱'),
+    ('Unidad', '个'), ('1 L', '1升'), ('5 L', '5升'), ('Pack 6', '6件装'),
+]
+COMPANY_KINDS = ['Restaurante', 'Bar', 'Cafetería', 'Catering', 'Supermercado', 'Hotel']
+COMPANY_NAMES = ['Dragón', 'Jade', 'Loto', 'Bambú', 'Mar', 'Sol', 'Luna', 'Oriente', 'Plaza', 'Puerto']
+CITIES = [
+    ('Madrid', 'Madrid', '28'), ('Barcelona', 'Barcelona', '08'), ('Valencia', 'Valencia', '46'),
+    ('Sevilla', 'Sevilla', '41'), ('Málaga', 'Málaga', '29'), ('Bilbao', 'Bizkaia', '48'),
+]
+USER_AGENTS = [
+    ('desktop', 'Chrome', 'Windows', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/126.0'),
+    ('desktop', 'Safari', 'macOS', 'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) Safari/605.1'),
+    ('mobile', 'Chrome', 'Android', 'Mozilla/5.0 (Linux; Android 14) Chrome/126.0 Mobile'),
+    ('mobile', 'Safari', 'iOS', 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5) Safari/604.1'),
+]
+# Pedidos por hora del día (picos de 8 a 12 y de 16 a 18)
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 1, 2, 6, 12, 14, 13, 10, 6, 4, 4, 5, 7, 7, 5, 3, 2, 1, 1, 0]
+
+# Secuencia de estados por la que ha pasado un pedido según su estado final
+STATUS_PATHS = {
+    Order.STATUS_NEW: [Order.STATUS_NEW],
+    Order.STATUS_CONFIRMED: [Order.STATUS_NEW, Order.STATUS_CONFIRMED],
+    Order.STATUS_PREPARING: [Order.STATUS_NEW, Order.STATUS_CONFIRMED, Order.STATUS_PREPARING],
+    Order.STATUS_OUT_FOR_DELIVERY: [
+        Order.STATUS_NEW, Order.STATUS_CONFIRMED, Order.STATUS_PREPARING, Order.STATUS_OUT_FOR_DELIVERY,
+    ],
+    Order.STATUS_DELIVERED: [
+        Order.STATUS_NEW, Order.STATUS_CONFIRMED, Order.STATUS_PREPARING,
+        Order.STATUS_OUT_FOR_DELIVERY, Order.STATUS_DELIVERED,
+    ],
+    Order.STATUS_CANCELLED: [Order.STATUS_NEW, Order.STATUS_CONFIRMED, Order.STATUS_CANCELLED],
+}
+NOTIFICATION_EVENTS = {
+    Order.STATUS_NEW: Notification.EVENT_ORDER_CREATED,
+    Order.STATUS_CONFIRMED: Notification.EVENT_ORDER_CONFIRMED,
+    Order.STATUS_PREPARING: Notification.EVENT_ORDER_CONFIRMED,
+    Order.STATUS_OUT_FOR_DELIVERY: Notification.EVENT_ORDER_OUT_FOR_DELIVERY,
+    Order.STATUS_DELIVERED: Notification.EVENT_ORDER_DELIVERED,
+    Order.STATUS_CANCELLED: Notification.EVENT_ORDER_CANCELLED,
+}
+
+
+@dataclass
+class SeedConfig:
+    companies: int = 50
+    users: int = 500
+    products: int = 1000
+    orders: int = 10_000
+    recurring: int = 100
+    notifications: int = 5_000
+    sessions: int = 1_000
+    days: int = 365
+    seed: int = 2026
+    batch_size: int = 5_000
+
+
+@dataclass
+class SeedResult:
+    counts: dict = field(default_factory=dict)
+    staff_ids: list = field(default_factory=list)
+    customer_ids: list = field(default_factory=list)
+    product_ids: list = field(default_factory=list)
+
+
+@contextlib.contextmanager
+def manual_timestamps(*models):
+    """Desactiva ``auto_now``/``auto_now_add`` para fijar fechas históricas."""
+    saved = []
+    for model in models:
+        for f in model._meta.concrete_fields:
+            if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False):
+                saved.append((f, f.auto_now, f.auto_now_add))
+                f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def _chunks(total: int, size: int):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+def _skewed_cum_weights(n: int, exponent: float = 0.8) -> list[float]:
+    """Pesos acumulados tipo Zipf: el elemento i pesa 1 / (i + 1) ** exponent."""
+    return list(itertools.accumulate(1 / (i + 1) ** exponent for i in range(n)))
+
+
+class FenixSeeder:
+    def __init__(self, config: SeedConfig, stdout=None):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.now = timezone.now()
+        self.stdout = stdout
+        self.result = SeedResult()
+        self.email_prefix = f'seed{config.seed}-'
+
+    # ------------------------------------------------------------------
+
+    def log(self, message: str) -> None:
+        """Progreso por un solo canal: el ``stdout`` del comando o, sin él, el logger."""
+        if self.stdout is not None:
+            self.stdout.write(message)
+        else:
+            logger.info(message)
+
+    def already_seeded(self) -> bool:
+        return User.objects.filter(email__startswith=self.email_prefix).exists()
+
+    def run(self) -> SeedResult:
+        companies = self.seed_companies()
+        self.seed_users(companies)
+        self.seed_products()
+        self.seed_orders()
+        self.seed_recurring()
+        self.seed_sessions()
+        return self.result
+
+    def _count(self, key: str, n: int) -> None:
+        self.result.counts[key] = self.result.counts.get(key, 0) + n
+
+    def _random_moment(self) -> datetime:
+        """Instante en los últimos ``days`` días: sesgo a lo reciente, laborables y mañanas."""
+        rng = self.rng
+        while True:
+            day = self.now.date() - timedelta(days=int(self.config.days * rng.betavariate(1, 1.6)))
+            if day.weekday() < 5 or rng.random() < 0.35:
+                break
+        hour = rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+        moment = timezone.make_aware(
+            datetime.combine(day, time(hour, rng.randrange(60), rng.randrange(60)))
+        )
+        return min(moment, self.now - timedelta(minutes=rng.randint(1, 120)))
+
+    # ------------------------------------------------------------------
+    # Empresas, usuarios y productos
+    # ------------------------------------------------------------------
+
+    def seed_companies(self) -> list[Company]:
+        rng = self.rng
+        objs = []
+        for i in range(self.config.companies):
+            city, province, cp = rng.choice(CITIES)
+            name = f'{rng.choice(COMPANY_KINDS)} {rng.choice(COMPANY_NAMES)} {i:04d}'
+            objs.append(Company(
+                name=name,
+                slug=f'{self.email_prefix}{slugify(name)}',
+                vat_number=f'B{rng.randint(10_000_000, 99_999_999)}',
+                sector='retail' if 'Super' in name else 'services',
+                size=rng.choice(['1-10', '1-10', '11-50', '51-200']),
+                country='España', city=city, postal_code=f'{cp}{rng.randint(0, 999):03d}',
+                email=f'info{i}@{EMAIL_DOMAIN}',
+            ))
+        with transaction.atomic():
+            companies = Company.objects.bulk_create(objs, batch_size=self.config.batch_size)
+        self._count('companies', len(companies))
+        self.log(f'Empresas: {len(companies)}')
+        return companies
+
+    def seed_users(self, companies: list[Company]) -> None:
+        rng = self.rng
+        password = make_password(SEED_PASSWORD)
+        staff = max(2, self.config.users // 200)
+        for start, size in _chunks(self.config.users, self.config.batch_size):
+            objs, user_companies = [], []
+            for i in range(start, start + size):
+                city, province, cp = rng.choice(CITIES)
+                postal = f'{cp}{rng.randint(0, 999):03d}'
+                address = f'Calle {rng.choice(COMPANY_NAMES)} {rng.randint(1, 200)}'
+                company = companies[i % len(companies)] if companies and i >= staff else None
+                is_staff = i < staff
+                user_companies.append(company)
+                email = f'{self.email_prefix}{i:07d}@{EMAIL_DOMAIN}'
+                full_name = f'Usuario Seed {i:07d}'
+                company_name = company.name if company else ''
+                objs.append(User(
+                    email=email,
+                    password=password,
+                    full_name=full_name,
+                    company=company_name,
+                    search_text=normalize_search(email, full_name, company_name),
+                    telefono_empresa=f'9{rng.randint(10_000_000, 99_999_999)}',
+                    telefono_reparto=f'6{rng.randint(10_000_000, 99_999_999)}',
+                    direccion_local=address, ciudad=city, provincia=province, codigo_postal=postal,
+                    tipo_entrega=rng.choice([User.TIPO_ENTREGA_ENVIO] * 4 + [User.TIPO_ENTREGA_RECOGIDA]),
+                    direccion_entrega=address, ciudad_entrega=city,
+                    provincia_entrega=province, codigo_postal_entrega=postal,
+                    profile_completed=True,
+                    role=User.ROLE_ADMIN if is_staff else User.ROLE_USER,
+                    is_staff=is_staff,
+                    language=rng.choice(['es', 'es', 'zh-hans']),
+                    status=User.STATUS_ACTIVE if is_staff or rng.random() < 0.92 else User.STATUS_PENDING,
+                    email_verified=True,
+                    pending_approval=False,
+                ))
+            with transaction.atomic():
+                users = User.objects.bulk_create(objs, batch_size=self.config.batch_size)
+                memberships = []
+                for user, company in zip(users, user_companies):
+                    (self.result.staff_ids if user.is_staff else self.result.customer_ids).append(user.pk)
+                    if company is not None:
+                        memberships.append(UserCompany(
+                            user=user, company=company, is_company_admin=rng.random() < 0.2,
+                        ))
+                UserCompany.objects.bulk_create(memberships, batch_size=self.config.batch_size)
+            self._count('users', len(users))
+            self._count('memberships', len(memberships))
+        self.log(f'Usuarios: {self.result.counts.get("users", 0)}')
+
+    def seed_products(self) -> None:
+        rng = self.rng
+        self.product_info = []  # (pk, price, name_es, name_zh_hans)
+        for start, size in _chunks(self.config.products, self.config.batch_size):
+            objs = []
+            for i in range(start, start + size):
+                (word_es, word_zh), (fmt_es, fmt_zh) = rng.choice(PRODUCT_WORDS), rng.choice(PRODUCT_FORMATS)
+                product = Product(
+                    name_es=f'{word_es} {fmt_es} #{i:06d}',
+                    name_zh_hans=f'{word_zh} {fmt_zh} #{i:06d}',
+                    description_es=f'{word_es} de calidad profesional, formato {fmt_es}.',
+                    description_zh_hans=f'专业品质{word_zh}，规格{fmt_zh}。',
+                    price=Decimal(rng.randint(80, 15_000)) / 100,
+                    unit_display=fmt_es,
+                    is_active=rng.random() < 0.95,
+                    stock_available=rng.choice([0] + [rng.randint(1, 40)] * 2 + [rng.randint(40, 2_000)] * 7),
+                    stock_min_threshold=rng.choice([5, 10, 20]),
+                )
+                product.update_stock_status()
+                objs.append(product)
+            with transaction.atomic():
+                products = Product.objects.bulk_create(objs, batch_size=self.config.batch_size)
+                StockMovement.objects.bulk_create([
+                    StockMovement(
+                        product=p, kind=StockMovement.KIND_IMPORT,
+                        quantity=p.stock_available, note='Saldo inicial (seed_fenix)',
+                    )
+                    for p in products if p.stock_available
+                ], batch_size=self.config.batch_size)
+            self.product_info.extend(
+                (p.pk, p.price, p.name_es, p.name_zh_hans) for p in products if p.is_active
+            )
+            self._count('products', len(products))
+        self.result.product_ids = [pk for pk, *_rest in self.product_info]
+        self.log(f'Productos: {self.result.counts.get("products", 0)}')
+
+    # ------------------------------------------------------------------
+    # Pedidos
+    # ------------------------------------------------------------------
+
+    def _final_status(self, created_at: datetime) -> str:
+        age = self.now - created_at
+        r = self.rng.random()
+        if age < timedelta(days=1):
+            return Order.STATUS_NEW if r < 0.6 else Order.STATUS_CONFIRMED
+        if age < timedelta(days=3):
+            return [Order.STATUS_CONFIRMED, Order.STATUS_PREPARING, Order.STATUS_OUT_FOR_DELIVERY,
+                    Order.STATUS_DELIVERED][min(int(r * 4), 3)]
+        return Order.STATUS_CANCELLED if r < 0.07 else Order.STATUS_DELIVERED
+
+    def seed_orders(self) -> None:
+        if not (self.config.orders and self.result.customer_ids and self.product_info):
+            return
+        rng = self.rng
+        customers = self.result.customer_ids
+        staff = self.result.staff_ids or customers
+        customer_weights = _skewed_cum_weights(len(customers))
+        product_weights = _skewed_cum_weights(len(self.product_info), 0.6)
+        notifications_per_order = self.config.notifications / self.config.orders
+
+        with manual_timestamps(Order, OrderEvent, OrderDocument, Notification):
+            for start, size in _chunks(self.config.orders, self.config.batch_size):
+                plans = []
+                for customer_id in rng.choices(customers, cum_weights=customer_weights, k=size):
+                    created_at = self._random_moment()
+                    status = self._final_status(created_at)
+                    n_lines = rng.choices(range(1, 9), weights=[10, 18, 20, 16, 12, 9, 8, 7])[0]
+                    picked = {
+                        info[0]: info
+                        for info in rng.choices(self.product_info, cum_weights=product_weights, k=n_lines)
+                    }
+                    lines = [(info, rng.choice([1, 1, 2, 2, 3, 5, 10, 12, 24])) for info in picked.values()]
+                    moments = [created_at]
+                    for _status in STATUS_PATHS[status][1:]:
+                        moments.append(min(moments[-1] + timedelta(hours=rng.uniform(1, 20)), self.now))
+                    plans.append((customer_id, status, created_at, lines, moments))
+
+                with transaction.atomic():
+                    orders = Order.objects.bulk_create([
+                        Order(
+                            customer_id=customer_id,
+                            status=status,
+                            total_amount=sum((info[1] * qty for info, qty in lines), Decimal('0')),
+                            eta_start=datetime.combine(created_at.date() + timedelta(days=1), time(9), created_at.tzinfo),
+                            eta_end=datetime.combine(created_at.date() + timedelta(days=1), time(13), created_at.tzinfo),
+                            delivered_at=moments[-1] if status == Order.STATUS_DELIVERED else None,
+                            created_at=created_at,
+                            updated_at=moments[-1],
+                        )
+                        for customer_id, status, created_at, lines, moments in plans
+                    ], batch_size=self.config.batch_size)
+                    self._seed_order_children(orders, plans, staff, notifications_per_order)
+                self._count('orders', len(orders))
+                self.log(f'Pedidos: {self.result.counts["orders"]}/{self.config.orders}')
+
+    def _seed_order_children(self, orders, plans, staff, notifications_per_order) -> None:
+        rng = self.rng
+        items, events, documents, notifications = [], [], [], []
+        for order, (customer_id, status, created_at, lines, moments) in zip(orders, plans):
+            for (pk, price, name_es, name_zh), qty in lines:
+                items.append(OrderItem(
+                    order_id=order.pk, product_id=pk, product_name_es=name_es,
+                    product_name_zh_hans=name_zh, quantity=qty, unit_price=price, line_total=price * qty,
+                ))
+            for step, (event_status, moment) in enumerate(zip(STATUS_PATHS[status], moments)):
+                events.append(OrderEvent(
+                    order_id=order.pk, status=event_status, created_at=moment,
+                    created_by_id=customer_id if step == 0 else rng.choice(staff),
+                ))
+            if status == Order.STATUS_DELIVERED and rng.random() < 0.15:
+                documents.append(OrderDocument(
+                    order_id=order.pk, document_type=OrderDocument.DOC_TYPE_INVOICE,
+                    title=f'Factura pedido {order.pk}',
+                    file=f'order_documents/seed/factura-{order.pk}.pdf',
+                    uploaded_by_id=rng.choice(staff), uploaded_at=moments[-1],
+                ))
+            # Notificaciones de los últimos cambios de estado del pedido
+            n_notifications = int(notifications_per_order) + (rng.random() < notifications_per_order % 1)
+            history = list(zip(STATUS_PATHS[status], moments))
+            for event_status, moment in history[len(history) - min(n_notifications, len(history)):]:
+                notifications.append(Notification(
+                    user_id=customer_id, event_type=NOTIFICATION_EVENTS[event_status],
+                    subject_es=f'Pedido #{order.pk}', subject_zh_hans=f'订单 #{order.pk}',
+                    message_es=f'Actualización del pedido #{order.pk}.',
+                    message_zh_hans=f'订单 #{order.pk} 已更新。',
+                    is_read=moment < self.now - timedelta(days=2) or rng.random() < 0.3,
+                    created_at=moment,
+                ))
+        batch = self.config.batch_size
+        OrderItem.objects.bulk_create(items, batch_size=batch)
+        OrderEvent.objects.bulk_create(events, batch_size=batch)
+        OrderDocument.objects.bulk_create(documents, batch_size=batch)
+        Notification.objects.bulk_create(notifications, batch_size=batch)
+        self._count('order_items', len(items))
+        self._count('order_events', len(events))
+        self._count('order_documents', len(documents))
+        self._count('notifications', len(notifications))
+
+    # ------------------------------------------------------------------
+    # Recurrentes y sesiones
+    # ------------------------------------------------------------------
+
+    def seed_recurring(self) -> None:
+        if not (self.config.recurring and self.result.customer_ids and self.product_info):
+            return
+        rng = self.rng
+        with transaction.atomic():
+            recurring = RecurringOrder.objects.bulk_create([
+                RecurringOrder(
+                    customer_id=rng.choice(self.result.customer_ids),
+                    is_active=rng.random() < 0.8,
+                    frequency=rng.choice([RecurringOrder.FREQ_WEEKLY] * 3 + [
+                        RecurringOrder.FREQ_DAILY, RecurringOrder.FREQ_MONTHLY,
+                    ]),
+                    start_date=self._random_moment().date(),
+                    next_run_at=self.now + timedelta(hours=rng.randint(1, 24 * 14)),
+                )
+                for _ in range(self.config.recurring)
+            ], batch_size=self.config.batch_size)
+            items = []
+            for order in recurring:
+                for pk, _price, name_es, name_zh in rng.sample(self.product_info, min(rng.randint(1, 6), len(self.product_info))):
+                    items.append(RecurringOrderItem(
+                        recurring_order=order, product_id=pk, product_name_es=name_es,
+                        product_name_zh_hans=name_zh, quantity=rng.choice([1, 2, 5, 10]),
+                    ))
+            RecurringOrderItem.objects.bulk_create(items, batch_size=self.config.batch_size)
+        self._count('recurring_orders', len(recurring))
+        self._count('recurring_items', len(items))
+        self.log(f'Pedidos recurrentes: {len(recurring)}')
+
+    def seed_sessions(self) -> None:
+        if not (self.config.sessions and self.result.customer_ids):
+            return
+        rng = self.rng
+        users = self.result.customer_ids + self.result.staff_ids
+        with manual_timestamps(UserSession):
+            for start, size in _chunks(self.config.sessions, self.config.batch_size):
+                objs = []
+                for _ in range(size):
+                    device, browser, os_name, agent = rng.choice(USER_AGENTS)
+                    created_at = self._random_moment()
+                    last_activity = min(created_at + timedelta(minutes=rng.randint(1, 600)), self.now)
+                    expires_at = last_activity + timedelta(days=14)
+                    objs.append(UserSession(
+                        user_id=rng.choice(users),
+                        session_key=f'{rng.getrandbits(128):032x}',
+                        ip_address=f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+                        user_agent=agent, device_type=device, browser=browser, os=os_name,
+                        is_active=expires_at > self.now,
+                        created_at=created_at, last_activity=last_activity, expires_at=expires_at,
+                    ))
+                with transaction.atomic():
+                    UserSession.objects.bulk_create(objs, batch_size=self.config.batch_size)
+                self._count('sessions', len(objs))
+        self.log(f'Sesiones: {self.result.counts.get("sessions", 0)}')
@@ -0,0 +1,533 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.paginator import EmptyPage
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import metrics
+from .instrumentation import view_stats
+from .lazy import lazy_module
+
+User = get_user_model()
+
+
+@override_settings(
+    FENIX_INSTRUMENTATION=True,
+    INSTRUMENTATION_SLOW_REQUEST_MS=0,
+    INSTRUMENTATION_SLOW_QUERY_MS=10_000,
+)
+class RequestInstrumentationTests(TestCase):
+    """Tests del middleware de instrumentación (core.instrumentation)"""
+
+    def setUp(self):
+        view_stats.reset()
+        self.super_admin = User.objects.create_superuser('ops@test.com', 'testpass123')
+        self.client.force_login(self.super_admin)
+
+    def test_logs_request_metrics_and_builds_summary(self):
+        with self.assertLogs('fenix.instrumentation', level='WARNING') as logs:
+            response = self.client.get(reverse('orders:order_list'))
+        self.assertEqual(response.status_code, 200)
+
+        payload = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(payload['event'], 'slow_request')
+        self.assertEqual(payload['view'], 'orders:order_list')
+        self.assertGreater(payload['queries'], 0)
+        self.assertGreater(payload['template_ms'], 0)
+        self.assertTrue(payload['slowest'][0]['origin'])
+
+        response = self.client.get(reverse('instrumentation_summary'), {'format': 'json'})
+        views = {row['view']: row for row in response.json()['views']}
+        self.assertEqual(views['orders:order_list']['count'], 1)
+
+    def test_summary_requires_super_admin(self):
+        user = User.objects.create_user('plain@test.com', 'testpass123', status='active', email_verified=True)
+        self.client.force_login(user)
+        response = self.client.get(reverse('instrumentation_summary'))
+        self.assertEqual(response.status_code, 302)
+
+
+class MetricsTests(TestCase):
+    """Tests del registro de métricas y del endpoint /metrics (core.metrics)"""
+
+    def setUp(self):
+        metrics.reset()
+        self.counter = metrics.counter('test_events_total', 'Eventos de test', ['result'])
+        self.gauge = metrics.gauge('test_queue_size', 'Cola de test')
+        self.histogram = metrics.histogram('test_seconds', 'Duración de test', buckets=(0.1, 1.0))
+
+    def test_text_exposition(self):
+        self.counter.inc(result='ok')
+        self.counter.inc(2, result='ok')
+        self.histogram.observe(0.5)
+        self.histogram.observe(3)
+
+        text = metrics.render_text()
+        self.assertIn('# TYPE test_events_total counter', text)
+        self.assertIn('test_events_total{result="ok"} 3', text)
+        self.assertIn('test_seconds_bucket{le="0.1"} 0', text)
+        self.assertIn('test_seconds_bucket{le="1.0"} 1', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn('test_seconds_sum 3.5', text)
+        self.assertIn('test_seconds_count 2', text)
+
+        with self.assertRaises(ValueError):
+            self.counter.inc(kind='ok')
+
+    def test_multiprocess_aggregation(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_SECONDS=0):
+            # Fichero de un worker que ya terminó (pid inexistente)
+            with open(os.path.join(directory, '999999999.json'), 'w', encoding='utf-8') as fh:
+                json.dump({'pid': 999999999, 'metrics': {
+                    'test_events_total': {'type': 'counter', 'help': 'Eventos de test', 'labels': ['result'],
+                                          'samples': [[['ok'], 5]]},
+                    'test_queue_size': {'type': 'gauge', 'help': 'Cola de test', 'labels': [],
+                                        'samples': [[[], 7]]},
+                }}, fh)
+            self.counter.inc(result='ok')
+            self.gauge.set(2)
+
+            pid, start = metrics._store.identity()
+            self.assertTrue(os.path.exists(os.path.join(directory, f'{pid}-{start}.json')))
+            text = metrics.render_text()
+            # El fichero del proceso terminado se compacta y no se vuelve a sumar
+            self.assertFalse(os.path.exists(os.path.join(directory, '999999999.json')))
+            self.assertTrue(os.path.exists(os.path.join(directory, metrics.ACCUMULATED_NAME)))
+            self.assertEqual(metrics.render_text(), text)
+        self.assertIn('test_events_total{result="ok"} 6', text)
+        self.assertIn('test_queue_size 2', text)
+
+    def test_recycled_pid_does_not_overwrite_a_dead_process(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_SECONDS=0):
+            # Mismo pid que este proceso, de un arranque anterior del contenedor
+            with open(os.path.join(directory, f'{os.getpid()}-anterior.json'), 'w', encoding='utf-8') as fh:
+                json.dump({'pid': os.getpid(), 'start': 'anterior', 'metrics': {
+                    'test_events_total': {'type': 'counter', 'help': 'Eventos de test', 'labels': ['result'],
+                                          'samples': [[['ok'], 5]]},
+                    'test_queue_size': {'type': 'gauge', 'help': 'Cola de test', 'labels': [],
+                                        'samples': [[[], 7]]},
+                }}, fh)
+            with mock.patch.object(metrics, '_process_start', return_value='actual'), \
+                    mock.patch.multiple(metrics._store, _pid=None, _start=None):
+                self.counter.inc(result='ok')
+                self.gauge.set(2)
+                text = metrics.render_text()
+                self.assertEqual(sorted(os.listdir(directory)), sorted([
+                    '.lock', metrics.ACCUMULATED_NAME, f'{os.getpid()}-actual.json',
+                ]))
+                self.counter.inc(result='ok')
+                later = metrics.render_text()
+        self.assertIn('test_events_total{result="ok"} 6', text)
+        self.assertIn('test_queue_size 2', text)
+        self.assertIn('test_events_total{result="ok"} 7', later)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_endpoint_requires_token_or_super_admin(self):
+        self.counter.inc(result='ok')
+        url = reverse('metrics')
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('test_events_total{result="ok"} 1', response.content.decode())
+
+        self.client.force_login(User.objects.create_superuser('metrics@test.com', 'testpass123'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class LazyImportTests(TestCase):
+    """Tests de los imports diferidos (core.lazy)"""
+
+    def test_lazy_module_loads_on_first_use_and_forwards_patches(self):
+        lazy = lazy_module('json')
+        self.assertIn('pendiente', repr(lazy))
+        self.assertEqual(lazy.dumps([1]), '[1]')
+        self.assertIn('cargado', repr(lazy))
+
+        with mock.patch.object(lazy, 'dumps', return_value='patched'):
+            self.assertEqual(json.dumps([1]), 'patched')
+        self.assertEqual(json.dumps([1]), '[1]')
+
+    def test_worker_boot_does_not_import_heavy_dependencies(self):
+        script = (
+            'import sys, fenix.wsgi\n'
+            'from django.urls import get_resolver\n'
+            'get_resolver().url_patterns\n'
+            'print(",".join(m for m in ("xhtml2pdf", "reportlab", "deep_translator", "requests", '
+            '"user_agents", "notifications.services") if m in sys.modules))\n'
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'fenix.settings'}
+        proc = subprocess.run([sys.executable, '-c', script], cwd=settings.BASE_DIR, env=env,
+                              capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr[-1000:])
+        self.assertEqual(proc.stdout.strip(), '')
+
+
+class RateLimitTests(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_sliding_window_weights_previous_window(self):
+        from .ratelimit import hit
+
+        for _ in range(4):
+            self.assertTrue(hit('t', 'ip:1', '4/m', now=1200.0).allowed)
+        self.assertFalse(hit('t', 'ip:1', '4/m', now=1201.0).allowed)
+        # Mitad de la ventana siguiente: 5 * 0.5 + 1 = 3.5 <= 4
+        self.assertTrue(hit('t', 'ip:1', '4/m', now=1290.0).allowed)
+        self.assertFalse(hit('t', 'ip:1', '4/m', now=1290.0).allowed)
+        self.assertTrue(hit('t', 'ip:2', '4/m', now=1290.0).allowed)
+
+    def test_database_store_and_fallback_when_cache_fails(self):
+        from .models import RateLimitCounter
+        from .ratelimit import hit
+
+        with override_settings(RATELIMIT_STORE='db'):
+            results = [hit('t', 'account:a', '2/m', now=60.0).allowed for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(RateLimitCounter.objects.get().count, 3)
+
+        with mock.patch('django.core.cache.backends.locmem.LocMemCache.add', side_effect=ConnectionError), \
+                self.assertLogs('core.ratelimit', 'WARNING'):
+            self.assertFalse(hit('t', 'account:a', '2/m', now=61.0).allowed)
+        # Ventana nueva: se borran las que ya no cuentan
+        with override_settings(RATELIMIT_STORE='db'):
+            hit('t', 'account:a', '2/m', now=250.0)
+        self.assertEqual(list(RateLimitCounter.objects.values_list('window', flat=True)), [4])
+
+
+class AuditBufferTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('audit@test.com', 'testpass123', status='active', email_verified=True)
+
+    def test_entries_are_written_together_when_the_buffer_closes(self):
+        from accounts.models import ProfileAuditLog
+        from accounts.profile_views import log_profile_action
+        from .audit import AuditLog
+        from .audit_buffer import buffered
+
+        with self.assertNumQueries(2):  # un bulk_create por modelo, al cerrar el búfer
+            with buffered():
+                with self.captureOnCommitCallbacks(execute=True):
+                    for i in range(3):
+                        AuditLog.log(self.user, AuditLog.ACTION_PRODUCT_UPDATED, f'cambio {i}')
+                    log_profile_action(self.user, 'update_personal', 'first_name', 'A', 'B')
+        self.assertEqual(
+            list(AuditLog.objects.order_by('pk').values_list('description', flat=True)),
+            ['cambio 0', 'cambio 1', 'cambio 2'],
+        )
+        self.assertEqual(ProfileAuditLog.objects.get().new_value, 'B')
+
+    def test_entries_of_a_rolled_back_transaction_are_dropped(self):
+        from django.db import transaction
+        from .audit import AuditLog
+        from .audit_buffer import buffered
+
+        with buffered(), self.captureOnCommitCallbacks(execute=True):
+            AuditLog.log(self.user, AuditLog.ACTION_STOCK_UPDATED, 'confirmado')
+            with self.assertRaises(ValueError), transaction.atomic():
+                AuditLog.log(self.user, AuditLog.ACTION_STOCK_UPDATED, 'deshecho')
+                raise ValueError
+        self.assertEqual(list(AuditLog.objects.values_list('description', flat=True)), ['confirmado'])
+
+    def test_archive_command_moves_old_months_to_files(self):
+        import gzip
+        import shutil
+        from datetime import timedelta
+        from django.core.files.storage import FileSystemStorage
+        from django.core.management import CommandError, call_command
+        from django.utils import timezone
+        from .audit import AuditLog
+
+        now = timezone.now()
+        old = AuditLog.objects.bulk_create([
+            AuditLog(user=self.user, action=AuditLog.ACTION_STOCK_UPDATED, description=f'viejo {i}')
+            for i in range(3)
+        ])
+        AuditLog.objects.filter(pk__in=[e.pk for e in old]).update(created_at=now - timedelta(days=400))
+        AuditLog.objects.create(user=self.user, action=AuditLog.ACTION_STOCK_UPDATED, description='reciente')
+
+        month = timezone.localtime(now - timedelta(days=400)).strftime('%Y-%m')
+        with tempfile.TemporaryDirectory() as media_root:
+            storages = {**settings.STORAGES, 'default': {
+                'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': media_root},
+            }}
+            with override_settings(STORAGES=storages):
+                with mock.patch.object(FileSystemStorage, 'size', return_value=0), \
+                        self.assertRaises(CommandError):
+                    call_command('archive_audit_logs', 'core.AuditLog', '--batch-size', '2', stdout=open(os.devnull, 'w'))
+                # Escritura no confirmada: no se borra nada
+                self.assertEqual(AuditLog.objects.count(), 4)
+                shutil.rmtree(os.path.join(media_root, 'audit-archive'))
+
+                call_command('archive_audit_logs', 'core.AuditLog', '--batch-size', '2', stdout=open(os.devnull, 'w'))
+            folder = os.path.join(media_root, 'audit-archive', 'core.auditlog', month)
+            rows = []
+            for name in sorted(os.listdir(folder), key=lambda n: int(n.split('-')[0])):
+                with gzip.open(os.path.join(folder, name), 'rt') as fh:
+                    rows += [json.loads(line) for line in fh]
+        self.assertEqual([row['description'] for row in rows], ['viejo 0', 'viejo 1', 'viejo 2'])
+        self.assertEqual(list(AuditLog.objects.values_list('description', flat=True)), ['reciente'])
+
+
+class AuditBufferRequestTests(TransactionTestCase):
+    """Sin la transacción de TestCase: el búfer se escribe al final de la petición."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('audit@test.com', 'testpass123', status='active', email_verified=True)
+
+    def test_profile_update_writes_one_insert_for_all_changed_fields(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from accounts.models import ProfileAuditLog
+
+        self.client.force_login(self.user)
+        data = {
+            'telefono_reparto': '600000000', 'direccion_local': 'Calle 1', 'ciudad': 'Madrid',
+            'provincia': 'Madrid', 'codigo_postal': '28001', 'pais': 'España',
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse('accounts:update_operative_profile'), data)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "accounts_profileauditlog"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertGreater(ProfileAuditLog.objects.filter(action='update_operative_profile').count(), 1)
+
+    @override_settings(AUDIT_FLUSH_MODE='async')
+    def test_async_mode_writes_from_the_background_worker(self):
+        from .audit import AuditLog
+        from .audit_buffer import async_writer, buffered
+
+        with buffered():
+            AuditLog.log(self.user, AuditLog.ACTION_STOCK_UPDATED, 'en segundo plano')
+        self.assertTrue(async_writer.drain(timeout=5))
+        self.assertEqual(AuditLog.objects.get().description, 'en segundo plano')
+
+
+class AuditExplorerTests(TestCase):
+
+    def setUp(self):
+        from .audit import AuditLog
+
+        self.super_admin = User.objects.create_superuser('ops@test.com', 'testpass123')
+        self.target = User.objects.create_user('target@test.com', 'testpass123', status='active', email_verified=True)
+        AuditLog.objects.bulk_create(
+            [AuditLog(user=self.target, action=AuditLog.ACTION_STOCK_UPDATED, description=f'stock {i}') for i in range(60)]
+            + [AuditLog(user=self.target, action=AuditLog.ACTION_ORDER_CREATED, description='pedido')]
+            + [AuditLog(user=self.super_admin, action=AuditLog.ACTION_STOCK_UPDATED, description='otro')]
+        )
+        self.client.force_login(self.super_admin)
+
+    def test_filters_and_cursor_pagination(self):
+        url = reverse('audit_explorer')
+        params = {'source': 'audit', 'user': 'TARGET@test.com', 'action': 'stock_updated'}
+        response = self.client.get(url, params)
+        page = response.context['page']
+        self.assertEqual(len(page), 50)
+        self.assertEqual(response.context['estimate'].count, 60)
+        self.assertTrue(response.context['estimate'].exact)
+
+        response = self.client.get(url, {**params, 'cursor': page.next_cursor})
+        rest = response.context['page']
+        self.assertEqual(len(rest), 10)
+        self.assertFalse(rest.has_next)
+        descriptions = {e.description for e in page} | {e.description for e in rest}
+        self.assertEqual(descriptions, {f'stock {i}' for i in range(60)})
+
+        for source in ('profile', 'login'):
+            self.assertEqual(self.client.get(url, {'source': source}).status_code, 200)
+
+    def test_csv_export_streams_filtered_range(self):
+        from django.utils import timezone
+
+        today = timezone.localdate().isoformat()
+        response = self.client.get(reverse('audit_export'), {
+            'source': 'audit', 'user': 'target@test.com', 'date_from': today, 'date_to': today,
+        })
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['created_at', 'user__email', 'action'])
+        self.assertEqual(len(lines), 1 + 61)
+
+        response = self.client.get(reverse('audit_export'), {'source': 'login', 'user': 'target@test.com'})
+        self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 1)
+
+    def test_csv_export_neutralises_formulas(self):
+        from accounts.models import LoginHistory
+
+        LoginHistory.objects.create(
+            user=self.target, success=False, ip_address='10.0.0.1',
+            user_agent='=HYPERLINK("http://evil.test","x")', failure_reason='-2+3',
+        )
+        response = self.client.get(reverse('audit_export'), {'source': 'login', 'user': 'target@test.com'})
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('''"'=HYPERLINK(""http://evil.test"",""x"")"''', content)
+        self.assertIn("'-2+3", content)
+        self.assertNotIn(',=HYPERLINK', content)
+
+    def test_requires_super_admin_and_estimates_large_counts(self):
+        from .audit import AuditLog
+        from .pagination import estimated_count
+
+        estimate = estimated_count(AuditLog.objects.all(), exact_limit=10)
+        self.assertFalse(estimate.exact)
+        self.assertGreater(estimate.count, 10)
+
+        self.client.force_login(self.target)
+        self.assertEqual(self.client.get(reverse('audit_explorer')).status_code, 302)
+        self.assertEqual(self.client.get(reverse('audit_export')).status_code, 302)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+
+    def setUp(self):
+        from .audit import AuditLog
+
+        self.super_admin = User.objects.create_superuser('ops@test.com', 'testpass123')
+        AuditLog.objects.bulk_create([
+            AuditLog(action=AuditLog.ACTION_STOCK_UPDATED, description=f'stock {i}') for i in range(250)
+        ])
+
+    def test_pages_past_a_low_estimate_still_load(self):
+        from .audit import AuditLog
+        from .pagination import Estimate, EstimatedCountPaginator
+
+        with mock.patch('core.pagination.estimated_count', return_value=Estimate(15, False)):
+            paginator = EstimatedCountPaginator(AuditLog.objects.order_by('pk'), 10)
+            self.assertEqual(paginator.num_pages, 2)
+            page = paginator.page(3)
+            self.assertEqual(len(page), 10)
+            self.assertTrue(page.has_next())
+            self.assertEqual(paginator.num_pages, 4)
+            last = paginator.page(25)
+            self.assertEqual(len(last), 10)
+            self.assertFalse(last.has_next())
+            with self.assertRaises(EmptyPage):
+                paginator.page(26)
+
+    def test_admin_changelist_reaches_rows_beyond_the_estimate(self):
+        from .pagination import Estimate
+
+        self.client.force_login(self.super_admin)
+        with mock.patch('core.pagination.estimated_count', return_value=Estimate(150, False)):
+            response = self.client.get(reverse('admin:core_auditlog_changelist'), {'p': '3'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 50)
+
+
+class ExportImportFenixTests(TestCase):
+    """``export_fenix`` -> ``import_fenix`` sobre un directorio temporal."""
+
+    def setUp(self):
+        from datetime import datetime, timezone as dt_timezone
+        from django.contrib.auth.models import Permission
+        from catalog.models import Product
+
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(__import__('shutil').rmtree, self.output_dir, True)
+
+        self.admin = User.objects.create_user('admin@test.com', 'testpass123', status='active')
+        self.client_user = User.objects.create_user('cliente@test.com', 'testpass123', status='active')
+        # Auto-referencia hacia una fila posterior: se rellena al final del modelo
+        User.objects.filter(pk=self.admin.pk).update(approved_by=self.client_user)
+        User.objects.filter(pk=self.client_user.pk).update(approved_by=self.admin)
+        self.permission = Permission.objects.get(codename='view_product')
+        self.client_user.user_permissions.add(self.permission)
+
+        self.stamp = datetime(2025, 3, 4, 10, 11, 4, 223538, tzinfo=dt_timezone.utc)
+        Product.objects.bulk_create([
+            Product(name_es=f'Producto {i}', name_zh_hans=f'产品 {i}', price='1.50') for i in range(5)
+        ])
+        Product.objects.update(created_at=self.stamp, updated_at=self.stamp)
+
+    def export(self):
+        from django.core.management import call_command
+        call_command(
+            'export_fenix', 'accounts.User', 'catalog.Product',
+            '--output-dir', self.output_dir, '--chunk-size', '2', stdout=open(os.devnull, 'w'),
+        )
+
+    def import_(self, *args):
+        from django.core.management import call_command
+        call_command('import_fenix', self.output_dir, *args, stdout=open(os.devnull, 'w'))
+
+    def snapshot(self):
+        from catalog.models import Product
+        return (
+            list(User.objects.order_by('pk').values_list('pk', 'email', 'date_joined', 'updated_at', 'approved_by_id')),
+            list(Product.objects.order_by('pk').values_list('pk', 'name_es', 'created_at', 'updated_at')),
+        )
+
+    def wipe(self):
+        from catalog.models import Product
+        Product.objects.all().delete()
+        User.objects.update(approved_by=None)
+        User.objects.all().delete()
+
+    def test_round_trip_keeps_rows_timestamps_and_references(self):
+        before = self.snapshot()
+        self.export()
+        with open(os.path.join(self.output_dir, 'accounts.user.jsonl'), encoding='utf-8') as fh:
+            users = [json.loads(line) for line in fh]
+        # Permission por natural key, no por id (los ids cambian entre bases)
+        self.assertEqual(users[1]['fields']['user_permissions'], [list(self.permission.natural_key())])
+
+        self.wipe()
+        self.import_('--batch-size', '2')
+
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(before[1][0][3], self.stamp)
+        self.assertEqual(User.objects.get(pk=self.admin.pk).approved_by_id, self.client_user.pk)
+        self.assertEqual(
+            list(User.objects.get(pk=self.client_user.pk).user_permissions.all()), [self.permission],
+        )
+
+    def test_import_into_populated_tables_fails_with_a_clear_error(self):
+        from django.core.management import CommandError
+
+        self.export()
+        with self.assertRaisesMessage(CommandError, 'ya tienen datos'):
+            self.import_()
+        with self.assertRaisesMessage(CommandError, 'No hay checkpoint'):
+            self.import_('--resume')
+
+    def test_resume_skips_rows_committed_after_the_last_checkpoint(self):
+        from catalog.models import Product
+        from .management.commands import import_fenix
+
+        before = self.snapshot()
+        self.export()
+        self.wipe()
+
+        save_progress = import_fenix.Command._save_progress
+
+        def interrupted(command, file_name, rows):
+            # Corte entre el commit del 2º lote de productos y su checkpoint
+            if file_name == 'catalog.product.jsonl' and rows > 2:
+                raise KeyboardInterrupt
+            save_progress(command, file_name, rows)
+
+        with mock.patch.object(import_fenix.Command, '_save_progress', interrupted), \
+                self.assertRaises(KeyboardInterrupt):
+            self.import_('--batch-size', '2')
+        self.assertEqual(Product.objects.count(), 4)
+
+        self.import_('--batch-size', '2', '--resume')
+        self.assertEqual(self.snapshot(), before)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, import_fenix.CHECKPOINT_NAME)))
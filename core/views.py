@@ -1,19 +1,24 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, CharField
 from django.db.models.functions import Cast
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.utils.timesince import timesince
 from django.utils.translation import gettext as _
 from django.views.decorators.http import require_GET
 
 from accounts.models import User
+from accounts.permissions import is_super_admin, super_admin_required
 from catalog.models import Product
 from notifications.models import Notification
 from orders.models import Order
 
+from .search import normalize_search
+
 MAX_RESULTS = 5
 PUBLIC_CONTACT_INFO = {
     'company_name': 'Fenix Distribuciones S.L.',
@@ -62,8 +67,7 @@ def _search_orders(query: str, user: User) -> list[dict]:
         qs.annotate(id_str=Cast('id', CharField()))
         .filter(
             Q(id_str__icontains=query)
-            | Q(customer__full_name__icontains=query)
-            | Q(customer__email__icontains=query)
+            | Q(customer__search_text__contains=normalize_search(query))
         )
         .select_related('customer')[:MAX_RESULTS]
     )
@@ -149,3 +153,48 @@ def public_privacy(request):
         'contact_info': PUBLIC_CONTACT_INFO,
     }
     return render(request, 'public/privacy.html', context)
+
+
+@super_admin_required
+def instrumentation_summary(request):
+    """Resumen móvil por vista de la instrumentación (solo Super Admin)."""
+    from .instrumentation import view_stats
+
+    if request.method == 'POST' and request.POST.get('reset'):
+        view_stats.reset()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'enabled': settings.FENIX_INSTRUMENTATION, 'views': view_stats.summary()})
+    context = {
+        'enabled': settings.FENIX_INSTRUMENTATION,
+        'rows': view_stats.summary(),
+        'thresholds': {
+            'slow_request_ms': settings.INSTRUMENTATION_SLOW_REQUEST_MS,
+            'slow_query_ms': settings.INSTRUMENTATION_SLOW_QUERY_MS,
+            'max_queries': settings.INSTRUMENTATION_MAX_QUERIES,
+            'window': settings.INSTRUMENTATION_WINDOW,
+        },
+    }
+    return render(request, 'core/instrumentation_summary.html', context)
+
+
+def _metrics_token_ok(request) -> bool:
+    token = settings.METRICS_TOKEN
+    if not token:
+        return False
+    header = request.headers.get('Authorization', '')
+    supplied = header[7:] if header.startswith('Bearer ') else request.GET.get('token', '')
+    return bool(supplied) and constant_time_compare(supplied, token)
+
+
+@require_GET
+def metrics(request):
+    """
+    Métricas en formato de texto de Prometheus (``core.metrics``).
+    Requiere ``METRICS_TOKEN`` (cabecera ``Authorization: Bearer`` o ``?token=``)
+    o una sesión de Super Admin.
+    """
+    if not (_metrics_token_ok(request) or is_super_admin(request.user)):
+        return HttpResponseForbidden('Forbidden', content_type='text/plain')
+    from . import metrics as registry
+
+    return HttpResponse(registry.render_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
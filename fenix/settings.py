@@ -69,11 +69,14 @@ INSTALLED_APPS = [
     'accounts',  # Cuentas
     'core',  # Configuración de plataforma
     'whatsapp',  # Integración WhatsApp Business Cloud API
+    'api',  # API JSON para integraciones B2B (/api/v1/)
     'storages',  # Gestión de almacenamiento en la nube (GCS)
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.RequestInstrumentationMiddleware',  # Solo con FENIX_INSTRUMENTATION=1
     'django.middleware.security.SecurityMiddleware',
+    'core.audit_buffer.AuditBufferMiddleware',  # Auditoría agrupada: un bulk_create por petición
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -81,9 +84,9 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'simple_history.middleware.HistoryRequestMiddleware',  # Auditoría de cambios
+    'django.contrib.messages.middleware.MessageMiddleware',  # Antes del gate: avisa al redirigir
     'accounts.middleware.UserApprovalMiddleware',  # Dual-gate: email_verified=True AND status=ACTIVE required
     'accounts.middleware.SessionTrackingMiddleware',  # Tracking de sesiones
-    'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -170,6 +173,112 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@fenix.com')
 DEFAULT_ORDER_NOTIFICATION_EMAIL = os.getenv('DEFAULT_ORDER_NOTIFICATION_EMAIL', 'plataformafenix2026@gmail.com')
 DEFAULT_ORDER_CURRENCY = os.getenv('DEFAULT_ORDER_CURRENCY', 'EUR')
 
+# Reservas de stock al crear un pedido: caducan si el pedido no pasa a
+# PREPARANDO antes de este plazo (ver expire_stock_reservations)
+STOCK_RESERVATION_TTL_HOURS = int(os.getenv('STOCK_RESERVATION_TTL_HOURS', '72'))
+
+# Alertas de bajo stock (catalog/alerts.py): como máximo una por producto y
+# ventana; canales separados por comas: email, whatsapp
+STOCK_ALERT_WINDOW_MINUTES = int(os.getenv('STOCK_ALERT_WINDOW_MINUTES', '360'))
+STOCK_ALERT_CHANNELS = [
+    c.strip() for c in os.getenv('STOCK_ALERT_CHANNELS', 'email').split(',') if c.strip()
+]
+
+# Instrumentación por petición (core/instrumentation.py): consultas, tiempo de
+# BD y de plantillas; registra en 'fenix.instrumentation' lo que supera umbrales
+FENIX_INSTRUMENTATION = os.getenv('FENIX_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+INSTRUMENTATION_SLOW_REQUEST_MS = int(os.getenv('INSTRUMENTATION_SLOW_REQUEST_MS', '500'))
+INSTRUMENTATION_SLOW_QUERY_MS = int(os.getenv('INSTRUMENTATION_SLOW_QUERY_MS', '100'))
+INSTRUMENTATION_MAX_QUERIES = int(os.getenv('INSTRUMENTATION_MAX_QUERIES', '50'))
+INSTRUMENTATION_WINDOW = int(os.getenv('INSTRUMENTATION_WINDOW', '200'))
+
+# Métricas (core/metrics.py) expuestas en /metrics. Sin METRICS_TOKEN solo las
+# ve un Super Admin con sesión. Con gunicorn (varios workers) METRICS_MULTIPROC_DIR
+# debe apuntar a un directorio compartido (los procesos terminados se compactan).
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+
+# GET condicional de catálogo y pedidos (core/conditional.py). Cambiar la
+# versión invalida todos los ETag; en App Engine es la versión desplegada.
+CONDITIONAL_GET_VERSION = os.getenv('CONDITIONAL_GET_VERSION', os.getenv('GAE_VERSION', ''))
+
+# Límite de peticiones (core/ratelimit.py) en login, registro, reenvío de
+# confirmación y contacto por WhatsApp. Con varios workers y la caché en
+# memoria por defecto cada uno cuenta por separado: RATELIMIT_STORE=db o una
+# caché compartida. RATELIMIT_IP_META es la cabecera con la IP real que fija el
+# proxy (App Engine elimina la que envíe el cliente).
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+RATELIMIT_STORE = os.getenv('RATELIMIT_STORE', 'cache')  # 'cache' | 'db'
+RATELIMIT_CACHE = os.getenv('RATELIMIT_CACHE', 'default')
+RATELIMIT_IP_META = os.getenv('RATELIMIT_IP_META', 'HTTP_X_APPENGINE_USER_IP')
+RATELIMIT_RATES = {
+    'login_ip': os.getenv('RATELIMIT_LOGIN_IP', '30/5m'),
+    'login_account': os.getenv('RATELIMIT_LOGIN_ACCOUNT', '10/15m'),
+    'register_ip': os.getenv('RATELIMIT_REGISTER_IP', '5/h'),
+    'resend_ip': os.getenv('RATELIMIT_RESEND_IP', '10/h'),
+    'resend_account': os.getenv('RATELIMIT_RESEND_ACCOUNT', '3/h'),
+    'whatsapp_ip': os.getenv('RATELIMIT_WHATSAPP_IP', '5/10m'),
+}
+# Intentos bloqueados que se anotan en LoginHistory agrupados (un INSERT por lote)
+RATELIMIT_HISTORY_FLUSH_SECONDS = int(os.getenv('RATELIMIT_HISTORY_FLUSH_SECONDS', '30'))
+RATELIMIT_HISTORY_BATCH_SIZE = int(os.getenv('RATELIMIT_HISTORY_BATCH_SIZE', '100'))
+
+# Sesiones: 'db' (por defecto), 'cached_db' (lecturas desde la caché, escrituras
+# también en BD) o 'signed_cookies' (sin BD: todo va en la cookie firmada). Con
+# cookies firmadas no se puede modificar la sesión de otro navegador, así que
+# no hay lista de sesiones activas (SessionTrackingMiddleware) ni se cachea el
+# veredicto de aprobación en la sesión (UserApprovalMiddleware).
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_BACKEND]
+SESSIONS_SERVER_SIDE = SESSION_BACKEND != 'signed_cookies'
+
+# Auditoría (core/audit_buffer.py): los registros de una petición se escriben
+# juntos al final ('sync') o desde un hilo de fondo ('async', la respuesta no
+# espera; lo pendiente se pierde si el proceso muere). archive_audit_logs sube
+# al almacenamiento por defecto (GCS en producción), bajo AUDIT_ARCHIVE_PREFIX,
+# los meses anteriores a AUDIT_RETENTION_DAYS.
+AUDIT_BUFFER_ENABLED = os.getenv('AUDIT_BUFFER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+AUDIT_FLUSH_MODE = os.getenv('AUDIT_FLUSH_MODE', 'sync')  # 'sync' | 'async'
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '500'))
+AUDIT_RETENTION_DAYS = int(os.getenv('AUDIT_RETENTION_DAYS', '365'))
+AUDIT_ARCHIVE_PREFIX = os.getenv('AUDIT_ARCHIVE_PREFIX', 'audit-archive')
+
+# API B2B (api/): autenticación con el token de SecuritySettings (solo se
+# guarda su hash, ver accounts/api_tokens.py). Los tokens verificados se
+# recuerdan en memoria API_TOKEN_CACHE_SECONDS (una revocación tarda como mucho
+# eso en llegar a los demás workers) y el uso se vuelca a la BD en un UPDATE
+# cada API_TOKEN_TOUCH_SECONDS.
+API_TOKEN_CACHE_SIZE = int(os.getenv('API_TOKEN_CACHE_SIZE', '1024'))
+API_TOKEN_CACHE_SECONDS = int(os.getenv('API_TOKEN_CACHE_SECONDS', '30'))
+API_TOKEN_TOUCH_SECONDS = int(os.getenv('API_TOKEN_TOUCH_SECONDS', '300'))
+API_MAX_ORDERS_PER_REQUEST = int(os.getenv('API_MAX_ORDERS_PER_REQUEST', '100'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+API_IDEMPOTENCY_TTL_HOURS = int(os.getenv('API_IDEMPOTENCY_TTL_HOURS', '24'))
+# Una reserva sin respuesta más antigua que esto es de un worker caído y se puede reclamar
+API_IDEMPOTENCY_LEASE_SECONDS = int(os.getenv('API_IDEMPOTENCY_LEASE_SECONDS', '300'))
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {'handlers': ['console'], 'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'), 'propagate': False},
+        'fenix.instrumentation': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Admin email para notificaciones de aprobación
 ADMIN_APPROVAL_EMAIL = os.getenv('ADMIN_APPROVAL_EMAIL', 'plataformafenix2026@gmail.com')
 
@@ -7,7 +7,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.i18n import set_language
 
-from core.views import global_search, public_about, public_legal, public_privacy
+from core.audit_views import audit_explorer, audit_export
+from core.views import global_search, instrumentation_summary, metrics, public_about, public_legal, public_privacy
 
 # Personalizar el admin de Django
 admin.site.site_header = 'BackOffice Fenix'
@@ -18,9 +19,14 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('i18n/setlang/', set_language, name='set_language'),  # Selector de idioma
     path('api/global-search/', global_search, name='global_search'),
+    path('api/v1/', include('api.urls')),
     path('about/', public_about, name='public_about'),
     path('legal/', public_legal, name='public_legal'),
     path('privacy/', public_privacy, name='public_privacy'),
+    path('ops/instrumentation/', instrumentation_summary, name='instrumentation_summary'),
+    path('ops/audit/', audit_explorer, name='audit_explorer'),
+    path('ops/audit/export/', audit_export, name='audit_export'),
+    path('metrics', metrics, name='metrics'),
     path('', include('catalog.urls')),
     path('orders/', include('orders.urls')),
     path('accounts/', include('accounts.urls')),
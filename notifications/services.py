@@ -14,6 +14,7 @@ from notifications.models import Notification
 from django.template.loader import render_to_string
 from django.core.mail import EmailMessage
 from django.utils import timezone
+from core import metrics
 from .utils import generate_order_pdf
 
 logger = logging.getLogger(__name__)
@@ -65,6 +66,14 @@ DEFAULT_MESSAGES = {
 }
 
 
+EMAILS_TOTAL = metrics.counter(
+    'fenix_emails_total', 'Emails de notificación enviados', ['event', 'result'],
+)
+EMAIL_SEND_SECONDS = metrics.histogram(
+    'fenix_email_send_seconds', 'Duración del envío SMTP de emails de pedidos', ['event'],
+)
+
+
 def _lang(user: Optional[User]) -> str:
     """Prioridad: user.language -> platform default -> es."""
     if user and hasattr(user, 'language') and user.language:
@@ -201,9 +210,12 @@ def send_order_notification(
         if pdf_file:
             email.attach(pdf_name, pdf_file.getvalue(), "application/pdf")
             
-        email.send(fail_silently=False)
+        with EMAIL_SEND_SECONDS.time(event=event_type):
+            email.send(fail_silently=False)
+        EMAILS_TOTAL.inc(event=event_type, result='ok')
         logger.info('Email de pedido %s enviado a %s', order_id, recipients)
     except Exception as e:
+        EMAILS_TOTAL.inc(event=event_type, result='error')
         logger.warning('Error enviando email de pedido %s: %s', order_id, e)
 
     return n
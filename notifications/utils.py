@@ -1,28 +1,39 @@
 import io
 import logging
 from django.template.loader import get_template
-from xhtml2pdf import pisa
+
+from core import metrics
+from core.lazy import lazy_module
 
 logger = logging.getLogger(__name__)
 
+# xhtml2pdf arrastra reportlab, pyhanko y aiohttp: se importa en el primer PDF
+pisa = lazy_module('xhtml2pdf.pisa')
+
+PDF_RENDER_SECONDS = metrics.histogram('fenix_pdf_render_seconds', 'Generación del PDF de pedido')
+PDF_FAILURES = metrics.counter('fenix_pdf_failures_total', 'PDFs de pedido que no se pudieron generar')
+
 def generate_order_pdf(context):
     """
     Convierte la plantilla HTML de pedido en un archivo PDF.
     Retorna el archivo como un objeto BytesIO o None si falla.
     """
     try:
-        template = get_template('notifications/order_pdf.html')
-        html = template.render(context)
-        
-        result = io.BytesIO()
-        pisa_status = pisa.CreatePDF(io.BytesIO(html.encode("UTF-8")), dest=result)
+        with PDF_RENDER_SECONDS.time():
+            template = get_template('notifications/order_pdf.html')
+            html = template.render(context)
+
+            result = io.BytesIO()
+            pisa_status = pisa.CreatePDF(io.BytesIO(html.encode("UTF-8")), dest=result)
         
         if pisa_status.err:
+            PDF_FAILURES.inc()
             logger.error("Error al generar PDF: %s", pisa_status.err)
             return None
             
         result.seek(0)
         return result
     except Exception as e:
+        PDF_FAILURES.inc()
         logger.exception("Excepción durante la generación del PDF: %s", str(e))
         return None
@@ -1,5 +1,28 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.utils.text import format_lazy
+
 from .models import Order, OrderItem, OrderEvent
+from .services.transitions import bulk_transition
+
+
+def _make_status_action(status, label):
+    """Acción masiva de cambio de estado (ver orders.services.transitions)."""
+    def action(modeladmin, request, queryset):
+        result = bulk_transition(
+            queryset.values_list('pk', flat=True), status, user=request.user,
+            note='Cambio masivo desde admin', enforce=False,
+        )
+        if not result.applied:
+            modeladmin.message_user(request, 'Ningún pedido cambió de estado.', messages.WARNING)
+            return
+        modeladmin.message_user(
+            request, f'{len(result.applied)} pedidos marcados como "{label}".', messages.SUCCESS,
+        )
+
+    action.__name__ = f'mark_{status}'
+    action.short_description = format_lazy('Marcar como "{}"', label)
+    action.allowed_permissions = ('change',)
+    return action
 
 
 class OrderItemInline(admin.TabularInline):
@@ -43,6 +66,7 @@ class OrderAdmin(admin.ModelAdmin):
     readonly_fields = ('total_amount', 'stock_deducted', 'delivered_at', 'created_at', 'updated_at')
     raw_id_fields = ('customer',)
     inlines = (OrderItemInline, OrderEventInline)
+    actions = [_make_status_action(status, label) for status, label in Order.STATUS_CHOICES]
     fieldsets = (
         (None, {'fields': ('customer', 'status', 'total_amount', 'stock_deducted')}),
         ('ETA', {'fields': ('eta_start', 'eta_end')}),
@@ -1,5 +1,6 @@
+from .services.cart import cart_for
+
+
 def cart_count(request):
     """Context processor para añadir el contador del carrito a todos los templates"""
-    cart = request.session.get('cart', {})
-    count = sum(int(qty) for qty in cart.values())
-    return {'cart_count': count}
+    return {'cart_count': cart_for(request).count()}
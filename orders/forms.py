@@ -20,6 +20,48 @@ class OrderStatusUpdateForm(forms.Form):
         })
     )
 
+    def __init__(self, *args, order=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if order is not None:
+            # Solo los estados alcanzables desde el actual (Order.ALLOWED_TRANSITIONS)
+            allowed = Order.ALLOWED_TRANSITIONS.get(order.status, ())
+            self.fields['status'].choices = [
+                (value, label) for value, label in Order.STATUS_CHOICES if value in allowed
+            ]
+
+
+class OrderIdsField(forms.Field):
+    """Lista de ids de pedido; existencia y transición se validan en el servicio."""
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        try:
+            return [int(v) for v in value]
+        except (TypeError, ValueError):
+            raise forms.ValidationError(_('Ids de pedido inválidos.'))
+
+
+class OrderBulkStatusForm(forms.Form):
+    """Formulario del cambio de estado masivo (tablero de pedidos)"""
+    order_ids = OrderIdsField(label=_('Pedidos'))
+    status = forms.ChoiceField(
+        choices=Order.STATUS_CHOICES,
+        label=_('Nuevo Estado'),
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    note = forms.CharField(
+        label=_('Nota'),
+        required=False,
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': _('Nota para todos los pedidos (opcional)')
+        })
+    )
+
 
 class OrderETAForm(forms.ModelForm):
     """Formulario para asignar ETA (fechas estimadas de entrega)"""
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_alter_order_options_alter_orderevent_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'updated_at', 'id'], name='order_customer_updated_idx'),
+        ),
+    ]
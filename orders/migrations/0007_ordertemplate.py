@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_product_updated_at'),
+        ('orders', '0006_cart_cartline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nombre')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_templates', to=settings.AUTH_USER_MODEL, verbose_name='Cliente')),
+            ],
+            options={
+                'verbose_name': 'Plantilla de Pedido',
+                'verbose_name_plural': 'Plantillas de Pedido',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderTemplateItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name_es', models.CharField(max_length=200, verbose_name='Nombre (ES)')),
+                ('product_name_zh_hans', models.CharField(max_length=200, verbose_name='Nombre (中文)')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='template_items', to='catalog.product', verbose_name='Producto')),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.ordertemplate', verbose_name='Plantilla')),
+            ],
+            options={
+                'verbose_name': 'Línea de Plantilla',
+                'verbose_name_plural': 'Líneas de Plantilla',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ordertemplate',
+            constraint=models.UniqueConstraint(fields=('customer', 'name'), name='ordertemplate_customer_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='ordertemplateitem',
+            constraint=models.UniqueConstraint(fields=('template', 'product'), name='ordertemplateitem_uniq'),
+        ),
+    ]
@@ -22,6 +22,16 @@ class Order(models.Model):
         (STATUS_CANCELLED, _('Cancelado')),
     ]
 
+    # Transiciones permitidas desde cada estado (tablero y cambios masivos)
+    ALLOWED_TRANSITIONS = {
+        STATUS_NEW: (STATUS_CONFIRMED, STATUS_PREPARING, STATUS_CANCELLED),
+        STATUS_CONFIRMED: (STATUS_PREPARING, STATUS_CANCELLED),
+        STATUS_PREPARING: (STATUS_OUT_FOR_DELIVERY, STATUS_CANCELLED),
+        STATUS_OUT_FOR_DELIVERY: (STATUS_DELIVERED, STATUS_PREPARING, STATUS_CANCELLED),
+        STATUS_DELIVERED: (),
+        STATUS_CANCELLED: (),
+    }
+
     customer = models.ForeignKey(
         User,
         on_delete=models.PROTECT,
@@ -55,10 +65,17 @@ class Order(models.Model):
         verbose_name = _('Pedido')
         verbose_name_plural = _('Pedidos')
         ordering = ['-created_at']
+        indexes = [
+            # Sondeo de la API (?updated_since=): keyset por (updated_at, id) de un cliente
+            models.Index(fields=['customer', 'updated_at', 'id'], name='order_customer_updated_idx'),
+        ]
 
     def __str__(self) -> str:
         return f'Pedido {self.id} - {self.customer.email}'
 
+    def can_transition_to(self, status: str) -> bool:
+        return status in self.ALLOWED_TRANSITIONS.get(self.status, ())
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(
@@ -175,3 +192,104 @@ class OrderDocument(models.Model):
     def __str__(self):
         return f'{self.title} - Order #{self.order.id}'
 
+
+
+class Cart(models.Model):
+    """Carrito persistente de un usuario (sobrevive al logout y al cambio de dispositivo)."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='cart',
+        verbose_name=_('Usuario')
+    )
+    # Suma de cantidades de las líneas, mantenida en cada escritura (badge del carrito)
+    item_count = models.PositiveIntegerField(default=0, verbose_name=_('Unidades'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Última Actualización'))
+
+    class Meta:
+        verbose_name = _('Carrito')
+        verbose_name_plural = _('Carritos')
+
+    def __str__(self) -> str:
+        return f'Carrito de {self.user.email} ({self.item_count})'
+
+
+class CartLine(models.Model):
+    cart = models.ForeignKey(
+        Cart,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        verbose_name=_('Carrito')
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='cart_lines',
+        verbose_name=_('Producto')
+    )
+    quantity = models.PositiveIntegerField(verbose_name=_('Cantidad'))
+
+    class Meta:
+        verbose_name = _('Línea de Carrito')
+        verbose_name_plural = _('Líneas de Carrito')
+        constraints = [
+            # Un carrito por usuario: equivale a único (usuario, producto). Es el
+            # objetivo del ON CONFLICT de los upserts (orders.services.cart)
+            models.UniqueConstraint(fields=['cart', 'product'], name='cartline_cart_product_uniq'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.product_id} x {self.quantity}'
+
+
+class OrderTemplate(models.Model):
+    """Cesta guardada por un cliente para repetirla (p. ej. el pedido semanal)."""
+    customer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='order_templates',
+        verbose_name=_('Cliente')
+    )
+    name = models.CharField(max_length=100, verbose_name=_('Nombre'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Fecha Creación'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Última Actualización'))
+
+    class Meta:
+        verbose_name = _('Plantilla de Pedido')
+        verbose_name_plural = _('Plantillas de Pedido')
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'name'], name='ordertemplate_customer_name_uniq'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.customer.email})'
+
+
+class OrderTemplateItem(models.Model):
+    """Línea de una plantilla: copia del producto y la cantidad (como ``OrderItem``, sin precio)."""
+    template = models.ForeignKey(
+        OrderTemplate,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name=_('Plantilla')
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='template_items',
+        verbose_name=_('Producto')
+    )
+    product_name_es = models.CharField(max_length=200, verbose_name=_('Nombre (ES)'))
+    product_name_zh_hans = models.CharField(max_length=200, verbose_name=_('Nombre (中文)'))
+    quantity = models.PositiveIntegerField(verbose_name=_('Cantidad'))
+
+    class Meta:
+        verbose_name = _('Línea de Plantilla')
+        verbose_name_plural = _('Líneas de Plantilla')
+        constraints = [
+            models.UniqueConstraint(fields=['template', 'product'], name='ordertemplateitem_uniq'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.product_name_es} x {self.quantity}'
@@ -1 +1 @@
-from .order_notifications import enqueue_order_confirmation_email  # noqa: F401
+from .order_notifications import enqueue_order_confirmation_email, enqueue_order_status_notifications  # noqa: F401
@@ -0,0 +1,249 @@
+"""
+Carrito de compra: en la sesión para anónimos y en ``Cart``/``CartLine`` para
+usuarios autenticados, con la misma interfaz (``cart_for(request)``).
+
+Sesión (anónimos) con un formato compacto y versionado:
+
+    request.session['cart'] = 'c1:12:2,15:3'   # producto:cantidad, por id
+
+Ocupa una fracción del dict JSON anterior (``{"12": 2, "15": 3}``), lo que
+importa con sesiones en cookie firmada (``SESSION_BACKEND=signed_cookies``,
+límite de ~4 KB). El prefijo de versión permite cambiar el formato más
+adelante; los carritos guardados como dict se siguen leyendo y se reescriben
+en el formato nuevo en la siguiente modificación. ``store_cart`` solo marca
+la sesión como modificada si el carrito cambia.
+
+Base de datos (autenticados): cada escritura bloquea la fila ``Cart``, lee
+las líneas afectadas y las escribe con un único ``INSERT ... ON CONFLICT DO
+UPDATE`` (``bulk_create(update_conflicts=True)`` sobre el único
+``cart, product``); ``Cart.item_count`` se ajusta en el mismo paso, así que
+el contador del menú es una sola fila. Al iniciar sesión el carrito anónimo
+se suma al del usuario (``merge_session_cart``, señal ``user_logged_in``, o
+en el primer acceso de una sesión ya iniciada que aún lo tenga).
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+CART_SESSION_KEY = 'cart'
+CART_VERSION = 'c1'
+
+
+def encode_cart(cart: dict) -> str:
+    lines = sorted((int(pk), int(qty)) for pk, qty in cart.items() if int(qty) > 0)
+    return f'{CART_VERSION}:' + ','.join(f'{pk}:{qty}' for pk, qty in lines)
+
+
+def decode_cart(value) -> dict[str, int]:
+    """``{'<product_id>': cantidad}``; vacío si el valor no es un carrito válido."""
+    try:
+        if isinstance(value, dict):  # formato anterior
+            return {str(int(pk)): int(qty) for pk, qty in value.items() if int(qty) > 0}
+        if isinstance(value, str) and value.startswith(f'{CART_VERSION}:'):
+            body = value[len(CART_VERSION) + 1:]
+            return {pk: int(qty) for pk, qty in (line.split(':') for line in body.split(',') if line)}
+    except (TypeError, ValueError):
+        pass
+    return {}
+
+
+def load_cart(session) -> dict[str, int]:
+    return decode_cart(session.get(CART_SESSION_KEY))
+
+
+def store_cart(session, cart: dict) -> bool:
+    """Guarda ``cart`` si difiere de lo que hay en la sesión; devuelve si se escribió."""
+    encoded = encode_cart(cart)
+    if encoded == f'{CART_VERSION}:':
+        return clear_cart(session)
+    if session.get(CART_SESSION_KEY) == encoded:
+        return False
+    session[CART_SESSION_KEY] = encoded
+    return True
+
+
+def clear_cart(session) -> bool:
+    if CART_SESSION_KEY not in session:
+        return False
+    del session[CART_SESSION_KEY]
+    return True
+
+
+def cart_size(cart: dict) -> int:
+    return sum(cart.values())
+
+
+def _normalize(items: dict) -> dict[int, int]:
+    return {int(pk): int(qty) for pk, qty in items.items()}
+
+
+# ----------------------------------------------------------------------
+# Carrito de la petición
+# ----------------------------------------------------------------------
+
+class SessionCart:
+    """Carrito de un visitante anónimo, en su sesión."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def lines(self) -> dict[str, int]:
+        return load_cart(self.session)
+
+    def count(self) -> int:
+        return cart_size(self.lines())
+
+    def version(self):
+        return self.session.get(CART_SESSION_KEY) or ''
+
+    def add(self, product_id, quantity: int) -> int:
+        return self.add_many({product_id: quantity})[int(product_id)]
+
+    def add_many(self, items: dict) -> dict[int, int]:
+        """Suma cantidades a varias líneas; devuelve las cantidades finales."""
+        cart = self.lines()
+        final = {}
+        for product_id, quantity in _normalize(items).items():
+            key = str(product_id)
+            final[product_id] = max(cart.get(key, 0) + quantity, 0)
+            if final[product_id]:
+                cart[key] = final[product_id]
+            else:
+                cart.pop(key, None)
+        store_cart(self.session, cart)
+        return final
+
+    def update(self, items: dict) -> None:
+        """Fija cantidades absolutas (0 = quitar)."""
+        cart = self.lines()
+        for product_id, quantity in _normalize(items).items():
+            if quantity <= 0:
+                cart.pop(str(product_id), None)
+            else:
+                cart[str(product_id)] = quantity
+        store_cart(self.session, cart)
+
+    def clear(self) -> None:
+        clear_cart(self.session)
+
+
+class UserCart:
+    """Carrito persistente de un usuario autenticado (``Cart``/``CartLine``)."""
+
+    def __init__(self, user):
+        self.user = user
+        self._state = None
+        self._lines = None
+
+    def _load_state(self):
+        from orders.models import Cart
+
+        if self._state is None:
+            self._state = (
+                Cart.objects.filter(user=self.user).values_list('item_count', 'updated_at').first()
+                or (0, None)
+            )
+        return self._state
+
+    def lines(self) -> dict[str, int]:
+        from orders.models import CartLine
+
+        if self._lines is None:
+            self._lines = {
+                str(pk): qty
+                for pk, qty in CartLine.objects.filter(cart__user=self.user)
+                .order_by('product_id').values_list('product_id', 'quantity')
+            }
+        return dict(self._lines)
+
+    def count(self) -> int:
+        if self._lines is not None and self._state is None:  # ya leídas: sin otra consulta
+            return cart_size(self._lines)
+        return self._load_state()[0]
+
+    def version(self):
+        return self._load_state()
+
+    def add(self, product_id, quantity: int) -> int:
+        return self.add_many({product_id: quantity})[int(product_id)]
+
+    def add_many(self, items: dict) -> dict[int, int]:
+        return self._write(_normalize(items), relative=True)
+
+    def update(self, items: dict) -> None:
+        self._write(_normalize(items), relative=False)
+
+    def clear(self) -> None:
+        from orders.models import Cart, CartLine
+
+        with transaction.atomic():
+            CartLine.objects.filter(cart__user=self.user).delete()
+            Cart.objects.filter(user=self.user).update(item_count=0, updated_at=timezone.now())
+        self._state, self._lines = None, None
+
+    def _write(self, items: dict[int, int], relative: bool) -> dict[int, int]:
+        """Aplica ``items`` (sumando si ``relative``); devuelve las cantidades finales."""
+        from orders.models import Cart, CartLine
+
+        with transaction.atomic():
+            cart, _ = Cart.objects.select_for_update().get_or_create(user=self.user)
+            current = dict(
+                cart.lines.filter(product_id__in=list(items)).values_list('product_id', 'quantity')
+            )
+            final = {
+                pk: max(0, current.get(pk, 0) + qty if relative else qty) for pk, qty in items.items()
+            }
+            upserts = [
+                CartLine(cart=cart, product_id=pk, quantity=qty) for pk, qty in final.items() if qty > 0
+            ]
+            if upserts:
+                CartLine.objects.bulk_create(
+                    upserts, update_conflicts=True,
+                    unique_fields=['cart', 'product'], update_fields=['quantity'],
+                )
+            removed = [pk for pk, qty in final.items() if qty == 0 and pk in current]
+            if removed:
+                cart.lines.filter(product_id__in=removed).delete()
+            delta = sum(final.values()) - sum(current.values())
+            if delta or removed or upserts:
+                Cart.objects.filter(pk=cart.pk).update(
+                    item_count=F('item_count') + delta, updated_at=timezone.now(),
+                )
+        self._state, self._lines = None, None
+        return final
+
+
+def cart_for(request):
+    """Carrito de la petición (memorizado: el context processor y la vista lo comparten)."""
+    cart = getattr(request, '_cart', None)
+    if cart is None:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            # Sesiones iniciadas antes del carrito en BD (o sin pasar por el
+            # login) pueden traer aún un carrito en la sesión: se suma una vez
+            if CART_SESSION_KEY in request.session:
+                merge_session_cart(request, user)
+            cart = UserCart(user)
+        else:
+            cart = SessionCart(request.session)
+        request._cart = cart
+    return cart
+
+
+def merge_session_cart(request, user) -> int:
+    """Suma el carrito anónimo de la sesión al del usuario; devuelve las líneas fusionadas."""
+    from catalog.models import Product
+
+    lines = load_cart(request.session)
+    if not lines:
+        return 0
+    # Solo productos que siguen existiendo (la FK fallaría) y activos
+    valid = set(
+        Product.objects.filter(pk__in=[int(pk) for pk in lines], is_active=True).values_list('pk', flat=True)
+    )
+    items = {int(pk): qty for pk, qty in lines.items() if int(pk) in valid}
+    if items:
+        UserCart(user).add_many(items)
+    clear_cart(request.session)
+    request._cart = None
+    return len(items)
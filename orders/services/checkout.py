@@ -0,0 +1,159 @@
+"""
+Checkout: crea el pedido desde el carrito reservando stock.
+
+Todo ocurre en una transacción: pedido, líneas (``bulk_create``) y reservas
+(``catalog.reservations.reserve_stock``). Si algún producto no tiene stock
+libre se lanza ``InsufficientStock`` y no queda nada escrito.
+
+``place_orders`` monta muchos pedidos de un mismo cliente a la vez (API B2B):
+una consulta de productos, un INSERT de pedidos, las reservas de cada pedido
+en su propio savepoint (un pedido sin stock no invalida los demás) y un
+único ``bulk_create`` de líneas para todos.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+
+from catalog.models import Product
+from catalog.reservations import InsufficientStock, reserve_stock
+from core import metrics
+from orders.models import Order, OrderItem
+from .order_notifications import enqueue_order_confirmation_email, enqueue_order_confirmation_emails
+
+ORDERS_CREATED = metrics.counter('fenix_orders_created_total', 'Pedidos creados en el checkout')
+ORDER_AMOUNT_TOTAL = metrics.counter('fenix_order_amount_total', 'Importe acumulado de los pedidos creados')
+
+__all__ = ['InsufficientStock', 'OrderOutcome', 'place_order', 'place_orders']
+
+
+def _parse_cart(cart) -> dict[int, int]:
+    quantities = {}
+    for product_id, quantity in cart.items():
+        try:
+            product_id, quantity = int(product_id), int(quantity)
+        except (TypeError, ValueError):
+            continue
+        if quantity > 0:
+            quantities[product_id] = quantity
+    return quantities
+
+
+@transaction.atomic
+def place_order(customer, cart, products=None) -> Order | None:
+    """
+    Crea el pedido con los productos activos del carrito ({product_id: qty}).
+    Devuelve ``None`` si ninguno sigue disponible. ``products`` (``{pk:
+    Product}`` activos ya cargados, p. ej. por ``orders.services.reorder``)
+    evita volver a consultarlos.
+    """
+    quantities = _parse_cart(cart)
+    if products is None:
+        products = Product.objects.filter(is_active=True).in_bulk(list(quantities))
+    if not products:
+        return None
+
+    order = Order.objects.create(
+        customer=customer,
+        status=Order.STATUS_NEW,
+        total_amount=Decimal('0.00'),
+    )
+    reserve_stock(order, {pk: quantities[pk] for pk in products})
+
+    items = _build_items(order, quantities, products)
+    OrderItem.objects.bulk_create(items)
+
+    order.total_amount = sum((item.line_total for item in items), Decimal('0.00'))
+    Order.objects.filter(pk=order.pk).update(total_amount=order.total_amount)
+
+    transaction.on_commit(lambda: enqueue_order_confirmation_email(order.id))
+    transaction.on_commit(lambda: _count_order(order))
+    return order
+
+
+def _count_order(order: Order) -> None:
+    ORDERS_CREATED.inc()
+    ORDER_AMOUNT_TOTAL.inc(float(order.total_amount))
+
+
+def _build_items(order: Order, quantities: dict[int, int], products: dict) -> list[OrderItem]:
+    items = []
+    for pk, quantity in quantities.items():
+        product = products.get(pk)
+        if product is None:
+            continue
+        items.append(OrderItem(
+            order=order,
+            product=product,
+            product_name_es=product.name_es,
+            product_name_zh_hans=product.name_zh_hans,
+            quantity=quantity,
+            unit_price=product.price,
+            line_total=product.price * quantity,
+        ))
+    return items
+
+
+@dataclass
+class OrderOutcome:
+    order: Order | None = None
+    error: str = ''                 # 'empty' | 'unavailable_products' | 'insufficient_stock'
+    product_id: int | None = None   # producto que provocó el error
+
+
+@transaction.atomic
+def place_orders(customer, carts) -> list[OrderOutcome]:
+    """
+    Crea un pedido por carrito (``[{product_id: qty}, ...]``) y devuelve el
+    resultado de cada uno en el mismo orden. Un carrito con productos
+    inactivos o inexistentes se rechaza entero (``unavailable_products``).
+    """
+    parsed = [_parse_cart(cart) for cart in carts]
+    products = Product.objects.filter(is_active=True).in_bulk(
+        list({pk for quantities in parsed for pk in quantities})
+    )
+    outcomes = [OrderOutcome() for _ in parsed]
+    valid = []
+    for index, quantities in enumerate(parsed):
+        missing = next((pk for pk in quantities if pk not in products), None)
+        if not quantities:
+            outcomes[index].error = 'empty'
+        elif missing is not None:
+            outcomes[index].error, outcomes[index].product_id = 'unavailable_products', missing
+        else:
+            valid.append(index)
+    if not valid:
+        return outcomes
+
+    orders = Order.objects.bulk_create([
+        Order(
+            customer=customer,
+            status=Order.STATUS_NEW,
+            total_amount=sum(
+                (products[pk].price * qty for pk, qty in parsed[index].items()), Decimal('0.00'),
+            ),
+        )
+        for index in valid
+    ])
+
+    items, failed = [], []
+    for index, order in zip(valid, orders):
+        try:
+            with transaction.atomic():
+                reserve_stock(order, parsed[index])
+        except InsufficientStock as exc:
+            outcomes[index].error, outcomes[index].product_id = 'insufficient_stock', exc.product_id
+            failed.append(order.pk)
+            continue
+        outcomes[index].order = order
+        items += _build_items(order, parsed[index], products)
+
+    if failed:
+        Order.objects.filter(pk__in=failed).delete()
+    OrderItem.objects.bulk_create(items)
+
+    created = [outcome.order for outcome in outcomes if outcome.order is not None]
+    if created:
+        transaction.on_commit(lambda: enqueue_order_confirmation_emails([o.pk for o in created]))
+        transaction.on_commit(lambda: [_count_order(o) for o in created])
+    return outcomes
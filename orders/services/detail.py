@@ -0,0 +1,40 @@
+"""
+Carga del detalle de un pedido en un número fijo de consultas.
+
+``load_order_detail`` devuelve el pedido con el cliente (``select_related``),
+el subtotal de líneas calculado en la misma consulta (``Sum`` sobre
+``items__line_total``) y las líneas, eventos y documentos precargados con sus
+productos y autores: 4 consultas en total, independientemente del número de
+líneas, eventos o documentos.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+
+from orders.models import Order, OrderDocument, OrderEvent, OrderItem
+
+
+def order_detail_queryset():
+    return (
+        Order.objects.select_related('customer')
+        .annotate(items_subtotal=Coalesce(
+            Sum('items__line_total'),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ))
+        .prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('pk')),
+            Prefetch('events', queryset=OrderEvent.objects.select_related('created_by')),
+            Prefetch('documents', queryset=OrderDocument.objects.select_related('uploaded_by')),
+        )
+    )
+
+
+def load_order_detail(pk, customer=None) -> Order:
+    """Pedido ``pk`` (del ``customer`` indicado, si se pasa) o 404."""
+    filters = {'pk': pk}
+    if customer is not None:
+        filters['customer'] = customer
+    return get_object_or_404(order_detail_queryset(), **filters)
@@ -26,6 +26,25 @@ def enqueue_order_confirmation_email(order_id: int) -> None:
     thread.start()
 
 
+def enqueue_order_confirmation_emails(order_ids) -> None:
+    """Emails de confirmación de un lote de pedidos en un único hilo (API B2B)."""
+    order_ids = list(order_ids)
+    if not order_ids:
+        return
+    thread = threading.Thread(
+        target=_send_order_confirmation_emails_safe,
+        args=(order_ids,),
+        name=f'order-emails-{len(order_ids)}',
+        daemon=True,
+    )
+    thread.start()
+
+
+def _send_order_confirmation_emails_safe(order_ids) -> None:
+    for order_id in order_ids:
+        _send_order_confirmation_email_safe(order_id)
+
+
 def _send_order_confirmation_email_safe(order_id: int) -> None:
     try:
         _send_order_confirmation_email(order_id)
@@ -49,6 +68,47 @@ def _send_order_confirmation_email(order_id: int) -> None:
         logger.warning('Pedido %s no encontrado; no se envía email', order_id)
 
 
+def enqueue_order_status_notifications(notifications) -> None:
+    """
+    Envía en un único hilo las notificaciones de cambio de estado de un lote
+    de pedidos ([(order_id, status), ...]), p.ej. tras una acción masiva.
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return
+    thread = threading.Thread(
+        target=_send_order_status_notifications_safe,
+        args=(notifications,),
+        name=f'order-status-emails-{len(notifications)}',
+        daemon=True,
+    )
+    thread.start()
+
+
+def _send_order_status_notifications_safe(notifications) -> None:
+    from notifications.services import send_order_notification
+    from notifications.models import Notification
+
+    events = {
+        Order.STATUS_CONFIRMED: Notification.EVENT_ORDER_CONFIRMED,
+        Order.STATUS_OUT_FOR_DELIVERY: Notification.EVENT_ORDER_OUT_FOR_DELIVERY,
+        Order.STATUS_DELIVERED: Notification.EVENT_ORDER_DELIVERED,
+        Order.STATUS_CANCELLED: Notification.EVENT_ORDER_CANCELLED,
+    }
+    orders = Order.objects.select_related('customer').in_bulk(
+        [order_id for order_id, _status in notifications]
+    )
+    for order_id, status in notifications:
+        event = events.get(status)
+        order = orders.get(order_id)
+        if not event or order is None:
+            continue
+        try:
+            send_order_notification(user=order.customer, event_type=event, order_id=order_id)
+        except Exception:
+            logger.exception('Error enviando notificación del pedido %s', order_id)
+
+
 def _resolve_recipient(platform_settings: PlatformSettings) -> str:
     configured = (platform_settings.order_notification_email or '').strip()
     if configured:
@@ -86,4 +146,8 @@ def _build_email_context(order: Order) -> Dict[str, object]:
     }
 
 
-__all__ = ['enqueue_order_confirmation_email']
+__all__ = [
+    'enqueue_order_confirmation_email',
+    'enqueue_order_confirmation_emails',
+    'enqueue_order_status_notifications',
+]
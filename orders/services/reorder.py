@@ -0,0 +1,100 @@
+"""
+Repetir un pedido y plantillas de pedido (cestas guardadas).
+
+Las líneas salen de los ``OrderItem`` de un pedido o de los
+``OrderTemplateItem`` de una plantilla (una consulta agregada) y se resuelven
+contra el catálogo en una sola consulta: los productos inactivos o borrados se
+descartan y se informan, y el precio es siempre el actual (las copias no
+guardan precio). Después, todo de una vez:
+
+- al carrito: ``cart_for(request).add_many`` (un upsert en ``CartLine`` o una
+  escritura de sesión);
+- a un pedido nuevo: ``place_order`` con los productos ya resueltos;
+- a una plantilla: ``save_template`` (un ``bulk_create`` de líneas).
+
+Así la compra semanal es una petición en vez de un ``cart_add`` por producto.
+"""
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from catalog.models import Product
+from orders.models import Order, OrderItem, OrderTemplate, OrderTemplateItem
+from .cart import cart_for
+from .checkout import place_order
+
+
+@dataclass
+class ResolvedLines:
+    lines: dict[int, int] = field(default_factory=dict)     # productos activos -> cantidad
+    products: dict[int, Product] = field(default_factory=dict)
+    unavailable: list[int] = field(default_factory=list)    # inactivos o borrados
+
+    @property
+    def total(self) -> Decimal:
+        """Importe a precios actuales."""
+        return sum((self.products[pk].price * qty for pk, qty in self.lines.items()), Decimal('0.00'))
+
+
+def order_lines(order: Order) -> dict[int, int]:
+    """``{product_id: cantidad}`` del pedido, sumando líneas repetidas."""
+    return dict(
+        OrderItem.objects.filter(order=order).values('product_id')
+        .annotate(qty=Sum('quantity')).order_by('product_id').values_list('product_id', 'qty')
+    )
+
+
+def template_lines(template: OrderTemplate) -> dict[int, int]:
+    return dict(template.items.order_by('product_id').values_list('product_id', 'quantity'))
+
+
+def resolve_lines(lines: dict) -> ResolvedLines:
+    """Separa productos activos (con precio actual) de los no disponibles: una consulta."""
+    lines = {int(pk): int(qty) for pk, qty in lines.items() if int(qty) > 0}
+    products = Product.objects.filter(is_active=True).in_bulk(list(lines))
+    return ResolvedLines(
+        lines={pk: qty for pk, qty in lines.items() if pk in products},
+        products=products,
+        unavailable=[pk for pk in lines if pk not in products],
+    )
+
+
+def add_lines_to_cart(request, lines: dict) -> ResolvedLines:
+    resolved = resolve_lines(lines)
+    if resolved.lines:
+        cart_for(request).add_many(resolved.lines)
+    return resolved
+
+
+def create_order_from_lines(customer, lines: dict) -> tuple[Order | None, ResolvedLines]:
+    """Pedido nuevo con las líneas disponibles (puede lanzar ``InsufficientStock``)."""
+    resolved = resolve_lines(lines)
+    if not resolved.lines:
+        return None, resolved
+    return place_order(customer, resolved.lines, products=resolved.products), resolved
+
+
+@transaction.atomic
+def save_template(customer, name: str, lines: dict) -> tuple[OrderTemplate, ResolvedLines]:
+    """
+    Crea la plantilla ``name`` del cliente (o sustituye sus líneas si ya existe)
+    con los productos disponibles de ``lines``.
+    """
+    resolved = resolve_lines(lines)
+    template, created = OrderTemplate.objects.get_or_create(customer=customer, name=name.strip()[:100])
+    if not created:
+        template.items.all().delete()
+        template.save(update_fields=['updated_at'])
+    OrderTemplateItem.objects.bulk_create([
+        OrderTemplateItem(
+            template=template,
+            product_id=pk,
+            product_name_es=resolved.products[pk].name_es,
+            product_name_zh_hans=resolved.products[pk].name_zh_hans,
+            quantity=qty,
+        )
+        for pk, qty in resolved.lines.items()
+    ])
+    return template, resolved
@@ -0,0 +1,150 @@
+"""
+Movimientos de stock de pedidos en SQL por conjuntos.
+
+Una agregación de cantidades por pedido y producto y una llamada a
+``catalog.stock.apply_movements`` (libro ``StockMovement`` + un único UPDATE
+de saldos) para cualquier número de pedidos. Lo usan la máquina de estados
+(``orders.services.transitions``), el modo bulk (``core.bulk``) y las señales
+legacy.
+"""
+import logging
+
+from django.db.models import Sum
+
+from catalog.models import Product, StockMovement
+from catalog.reservations import convert_reservations, release_reservations
+from catalog.stock import apply_movements
+from orders.models import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+
+def _quantities(order_ids):
+    """[(order_id, product_id, qty)] agregando líneas repetidas."""
+    return [
+        (row['order_id'], row['product_id'], row['qty'])
+        for row in OrderItem.objects.filter(order_id__in=list(order_ids))
+        .values('order_id', 'product_id')
+        .annotate(qty=Sum('quantity'))
+        .order_by('order_id', 'product_id')
+    ]
+
+
+def deduct_items_stock(order_ids, user=None) -> list[int]:
+    """
+    Descuenta (mínimo 0) el stock de las líneas de los pedidos indicados, sin
+    comprobar su estado, convirtiendo sus reservas activas. Devuelve los ids
+    de los productos afectados.
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return []
+    convert_reservations(order_ids)
+    movements = apply_movements([
+        StockMovement(
+            product_id=product_id,
+            order_id=order_id,
+            kind=StockMovement.KIND_ORDER_DEDUCTION,
+            quantity=-qty,
+            created_by=user,
+        )
+        for order_id, product_id, qty in _quantities(order_ids)
+    ])
+    if movements:
+        logger.info('Stock descontado por pedidos %s (%s movimientos)', order_ids, len(movements))
+    return list({m.product_id for m in movements})
+
+
+def restock_orders(order_ids, user=None) -> list[int]:
+    """
+    Devuelve al stock lo descontado por los pedidos indicados (cancelación).
+
+    Se usa el libro: se repone el neto de descuentos y devoluciones previas del
+    pedido, así que es idempotente. Los pedidos descontados antes de existir el
+    libro (sin movimientos) reponen las cantidades de sus líneas.
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return []
+
+    net = {
+        (row['order_id'], row['product_id']): row['total']
+        for row in StockMovement.objects.filter(
+            order_id__in=order_ids,
+            kind__in=[StockMovement.KIND_ORDER_DEDUCTION, StockMovement.KIND_ORDER_CANCELLATION],
+        )
+        .values('order_id', 'product_id')
+        .annotate(total=Sum('quantity'))
+        .order_by()
+    }
+    with_ledger = {order_id for order_id, _product_id in net}
+    legacy = [pk for pk in order_ids if pk not in with_ledger]
+    returns = [
+        (order_id, product_id, -total)
+        for (order_id, product_id), total in net.items() if total < 0
+    ]
+    returns += _quantities(legacy)
+
+    movements = apply_movements([
+        StockMovement(
+            product_id=product_id,
+            order_id=order_id,
+            kind=StockMovement.KIND_ORDER_CANCELLATION,
+            quantity=qty,
+            created_by=user,
+        )
+        for order_id, product_id, qty in returns
+    ])
+    if movements:
+        logger.info('Stock repuesto por cancelación de pedidos %s (%s movimientos)', order_ids, len(movements))
+    return list({m.product_id for m in movements})
+
+
+def stock_shortages(order_ids) -> list[dict]:
+    """Productos cuyo stock no cubre la cantidad pedida en los pedidos indicados."""
+    totals: dict[int, int] = {}
+    for _order_id, product_id, qty in _quantities(order_ids):
+        totals[product_id] = totals.get(product_id, 0) + qty
+    if not totals:
+        return []
+    return [
+        {'product': product, 'stock': product.stock_available, 'qty': totals[product.pk]}
+        for product in Product.objects.filter(pk__in=totals.keys())
+        if product.stock_available < totals[product.pk]
+    ]
+
+
+def deduct_stock_for_orders(order_ids, user=None) -> list[int]:
+    """
+    Descuenta el stock de los pedidos en PREPARANDO que aún no lo tengan
+    descontado (equivale a la señal ``on_order_saved``) y los marca.
+    """
+    pending = list(
+        Order.objects.filter(
+            pk__in=list(order_ids),
+            status=Order.STATUS_PREPARING,
+            stock_deducted=False,
+        ).values_list('pk', flat=True)
+    )
+    if not pending:
+        return []
+    product_ids = deduct_items_stock(pending, user=user)
+    # Igual que la señal: solo se marca si el pedido tenía líneas
+    with_items = OrderItem.objects.filter(order_id__in=pending).values('order_id')
+    Order.objects.filter(pk__in=with_items).update(stock_deducted=True)
+    return product_ids
+
+
+def restock_cancelled_orders(order_ids, user=None) -> list[int]:
+    """
+    Libera las reservas de los pedidos CANCELADOS y repone el stock de los que
+    lo tenían descontado (desmarcándolos).
+    """
+    cancelled = Order.objects.filter(pk__in=list(order_ids), status=Order.STATUS_CANCELLED)
+    release_reservations(cancelled.values_list('pk', flat=True))
+    pending = list(cancelled.filter(stock_deducted=True).values_list('pk', flat=True))
+    if not pending:
+        return []
+    product_ids = restock_orders(pending, user=user)
+    Order.objects.filter(pk__in=pending).update(stock_deducted=False)
+    return product_ids
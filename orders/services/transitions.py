@@ -0,0 +1,230 @@
+"""
+Máquina de estados del pedido.
+
+Punto único para cambiar ``Order.status``:
+
+- La tabla de transiciones es ``Order.ALLOWED_TRANSITIONS``.
+- ``transition_updates`` calcula todos los campos que cambian con la
+  transición (``status``, ``updated_at``, ``delivered_at``, ``stock_deducted``)
+  y se aplican en una sola escritura condicionada al estado anterior
+  (``filter(pk=..., status=old).update(...)``), sin ``save()`` ni consultas
+  previas adicionales.
+- El descuento de stock al pasar a PREPARANDO (convirtiendo las reservas del
+  checkout) y la reposición al CANCELAR un pedido ya descontado se hacen por
+  conjuntos y quedan en el libro ``StockMovement`` (``orders.services.stock``);
+  al cancelar se liberan además las reservas activas.
+- Los efectos externos (notificaciones, etc.) son hooks registrados con
+  ``register_transition_hook`` que se ejecutan tras el commit.
+
+``orders.signals`` queda solo para guardados legacy (formulario del admin,
+scripts que llaman a ``save()``).
+"""
+import logging
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core import metrics
+from orders.models import Order, OrderEvent
+from catalog.reservations import release_reservations
+from .stock import deduct_items_stock, restock_orders, stock_shortages
+
+logger = logging.getLogger(__name__)
+
+TRANSITIONS_TOTAL = metrics.counter(
+    'fenix_order_transitions_total', 'Cambios de estado de pedidos', ['from_status', 'to_status'],
+)
+
+
+class InvalidTransition(Exception):
+    """La transición no está permitida o el pedido cambió de estado entretanto."""
+
+
+@dataclass(frozen=True)
+class Transition:
+    order_id: int
+    old_status: str
+    new_status: str
+    user_id: int | None = None
+
+
+@dataclass
+class BulkTransitionResult:
+    applied: list[int] = field(default_factory=list)
+    rejected: dict[int, str] = field(default_factory=dict)  # order_id -> motivo
+
+
+# ----------------------------------------------------------------------
+# Hooks post-commit
+# ----------------------------------------------------------------------
+
+_transition_hooks: list[tuple[frozenset | None, object]] = []
+
+
+def register_transition_hook(func=None, *, statuses=None):
+    """
+    Registra ``func(transitions)`` para ejecutarse tras el commit con la lista
+    de ``Transition`` aplicadas (filtrada por ``statuses`` destino si se indica).
+    Puede usarse como decorador con o sin argumentos.
+    """
+    def decorator(f):
+        _transition_hooks.append((frozenset(statuses) if statuses else None, f))
+        return f
+
+    return decorator(func) if func is not None else decorator
+
+
+def _run_hooks(transitions: list[Transition]) -> None:
+    for statuses, hook in _transition_hooks:
+        selected = [t for t in transitions if statuses is None or t.new_status in statuses]
+        if not selected:
+            continue
+        try:
+            hook(selected)
+        except Exception:
+            logger.exception('Error en hook de transición %s', getattr(hook, '__name__', hook))
+
+
+@register_transition_hook(statuses=[
+    Order.STATUS_CONFIRMED,
+    Order.STATUS_OUT_FOR_DELIVERY,
+    Order.STATUS_DELIVERED,
+    Order.STATUS_CANCELLED,
+])
+def _notify_customers(transitions):
+    from .order_notifications import enqueue_order_status_notifications
+    enqueue_order_status_notifications([(t.order_id, t.new_status) for t in transitions])
+
+
+@register_transition_hook
+def _count_transitions(transitions):
+    for t in transitions:
+        TRANSITIONS_TOTAL.inc(from_status=t.old_status, to_status=t.new_status)
+
+
+# ----------------------------------------------------------------------
+# Transiciones
+# ----------------------------------------------------------------------
+
+def is_allowed(old_status: str, new_status: str) -> bool:
+    return new_status in Order.ALLOWED_TRANSITIONS.get(old_status, ())
+
+
+def transition_updates(new_status: str, now=None) -> dict:
+    """Campos a escribir para pasar a ``new_status`` (válido para 1 o N pedidos)."""
+    now = now or timezone.now()
+    updates = {'status': new_status, 'updated_at': now}
+    if new_status == Order.STATUS_PREPARING:
+        updates['stock_deducted'] = True
+    if new_status == Order.STATUS_CANCELLED:
+        updates['stock_deducted'] = False
+    if new_status == Order.STATUS_DELIVERED:
+        updates['delivered_at'] = Coalesce(F('delivered_at'), Value(now))
+    return updates
+
+
+def transition(order: Order, new_status: str, user, note: str = '',
+               enforce: bool = True) -> list:
+    """
+    Aplica la transición a ``order`` (y actualiza la instancia en memoria);
+    ``user`` queda como autor del ``OrderEvent``.
+    Devuelve los productos con stock insuficiente al pasar a PREPARANDO
+    (el stock se descuenta igualmente, con mínimo 0).
+    """
+    old_status = order.status
+    if new_status not in dict(Order.STATUS_CHOICES):
+        raise InvalidTransition(f'Estado desconocido: {new_status}')
+    if old_status == new_status:
+        raise InvalidTransition('El pedido ya está en ese estado')
+    if enforce and not is_allowed(old_status, new_status):
+        raise InvalidTransition(f'Transición no permitida: {old_status} -> {new_status}')
+
+    now = timezone.now()
+    updates = transition_updates(new_status, now)
+    deduct = new_status == Order.STATUS_PREPARING and not order.stock_deducted
+    restock = new_status == Order.STATUS_CANCELLED and order.stock_deducted
+    shortages = []
+
+    with transaction.atomic():
+        updated = Order.objects.filter(pk=order.pk, status=old_status).update(**updates)
+        if not updated:
+            raise InvalidTransition('El pedido cambió de estado mientras se actualizaba')
+        if deduct:
+            shortages = stock_shortages([order.pk])
+            deduct_items_stock([order.pk], user=user)
+        if new_status == Order.STATUS_CANCELLED:
+            release_reservations([order.pk])
+        if restock:
+            restock_orders([order.pk], user=user)
+        OrderEvent.objects.create(order=order, status=new_status, note=note, created_by=user)
+
+        order.status = new_status
+        order.updated_at = now
+        if 'stock_deducted' in updates:
+            order.stock_deducted = updates['stock_deducted']
+        if new_status == Order.STATUS_DELIVERED and not order.delivered_at:
+            order.delivered_at = now
+
+        applied = [Transition(order.pk, old_status, new_status, user.pk)]
+        transaction.on_commit(lambda: _run_hooks(applied))
+
+    return shortages
+
+
+def bulk_transition(order_ids, new_status: str, user, note: str = '',
+                    enforce: bool = True) -> BulkTransitionResult:
+    """
+    Pasa un lote de pedidos a ``new_status`` en una transacción: validación
+    por pedido, un único UPDATE, ``OrderEvent`` con ``bulk_create`` y descuento
+    de stock por conjuntos. Con ``enforce=False`` (admin) se acepta cualquier
+    cambio salvo el que no modifica el estado.
+    """
+    if new_status not in dict(Order.STATUS_CHOICES):
+        raise ValueError(f'Estado desconocido: {new_status}')
+
+    result = BulkTransitionResult()
+    order_ids = {int(pk) for pk in order_ids}
+
+    with transaction.atomic():
+        current = {
+            pk: (status, stock_deducted)
+            for pk, status, stock_deducted in Order.objects.select_for_update()
+            .filter(pk__in=order_ids)
+            .values_list('pk', 'status', 'stock_deducted')
+        }
+        for pk in sorted(order_ids):
+            if pk not in current:
+                result.rejected[pk] = 'no existe'
+                continue
+            status = current[pk][0]
+            if status == new_status:
+                result.rejected[pk] = 'ya está en ese estado'
+            elif enforce and not is_allowed(status, new_status):
+                result.rejected[pk] = f'transición no permitida desde "{status}"'
+            else:
+                result.applied.append(pk)
+
+        if not result.applied:
+            return result
+
+        Order.objects.filter(pk__in=result.applied).update(**transition_updates(new_status))
+        if new_status == Order.STATUS_PREPARING:
+            deduct_items_stock([pk for pk in result.applied if not current[pk][1]], user=user)
+        if new_status == Order.STATUS_CANCELLED:
+            release_reservations(result.applied)
+            restock_orders([pk for pk in result.applied if current[pk][1]], user=user)
+        OrderEvent.objects.bulk_create([
+            OrderEvent(order_id=pk, status=new_status, note=note, created_by=user)
+            for pk in result.applied
+        ])
+
+        user_id = user.pk
+        applied = [
+            Transition(pk, current[pk][0], new_status, user_id) for pk in result.applied
+        ]
+        transaction.on_commit(lambda: _run_hooks(applied))
+
+    return result
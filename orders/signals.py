@@ -1,16 +1,28 @@
 """
 Señales para el ciclo de vida del pedido.
-- Descuento de stock cuando el pedido pasa a PREPARANDO.
+- Descuento de stock cuando el pedido pasa a PREPARANDO y reposición al cancelar.
 - Notificaciones por email al crear o cambiar estado.
+- Al iniciar sesión, el carrito anónimo de la sesión se suma al del usuario.
+
+Los cambios de estado de la aplicación pasan por la máquina de estados
+(``orders.services.transitions``), que escribe con ``update()`` y no dispara
+estas señales: quedan para guardados legacy (formulario del admin, scripts).
+
+Dentro de ``core.bulk.bulk_operations()`` no se ejecutan: solo se registra el
+pedido y los efectos se aplican en bloque al salir.
 """
 import logging
 
+from django.contrib.auth.signals import user_logged_in
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 
+from core.bulk import get_bulk_state
 from .models import Order
+from .services.cart import merge_session_cart
+from .services.transitions import TRANSITIONS_TOTAL
+from .services.stock import deduct_stock_for_orders, restock_cancelled_orders
 from notifications.models import Notification
-from notifications.services import send_order_notification
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +32,7 @@ _prev_order_status: dict[int, str] = {}
 
 @receiver(pre_save, sender=Order)
 def _cache_old_order_status(sender, instance: Order, **kwargs):
-    if instance.pk:
+    if instance.pk and get_bulk_state() is None:
         try:
             old = Order.objects.only('status').get(pk=instance.pk)
             _prev_order_status[instance.pk] = old.status
@@ -37,6 +49,8 @@ def _emit_order_notifications(instance: Order, created: bool):
     old = _prev_order_status.pop(instance.pk, None)
     if old == instance.status:
         return
+    if old is not None:
+        TRANSITIONS_TOTAL.inc(from_status=old, to_status=instance.status)
 
     event = None
     if instance.status == Order.STATUS_CONFIRMED:
@@ -49,6 +63,9 @@ def _emit_order_notifications(instance: Order, created: bool):
         event = Notification.EVENT_ORDER_CANCELLED
 
     if event:
+        # Import diferido: notifications.services no debe cargarse al registrar las señales
+        from notifications.services import send_order_notification
+
         send_order_notification(
             user=instance.customer,
             event_type=event,
@@ -58,17 +75,19 @@ def _emit_order_notifications(instance: Order, created: bool):
 
 @receiver(post_save, sender=Order)
 def on_order_saved(sender, instance: Order, created, **kwargs):
-    # 1. Descuento de stock al pasar a PREPARANDO
+    bulk = get_bulk_state()
+    if bulk is not None:
+        bulk.orders.add(instance.pk)
+        return
+
+    # 1. Descuento de stock al pasar a PREPARANDO / reposición al cancelar
     if instance.status == Order.STATUS_PREPARING and not instance.stock_deducted:
-        updated_products = []
-        for item in instance.items.select_related('product').all():
-            product = item.product
-            product.stock_available = max(0, product.stock_available - item.quantity)
-            product.save()
-            updated_products.append((product.id, item.quantity))
-        if updated_products:
-            Order.objects.filter(pk=instance.pk).update(stock_deducted=True)
-            logger.info('Stock descontado por pedido %s: %s', instance.pk, updated_products)
+        if deduct_stock_for_orders([instance.pk]):
+            instance.stock_deducted = True
+    elif (instance.status == Order.STATUS_CANCELLED
+          and _prev_order_status.get(instance.pk) != Order.STATUS_CANCELLED):
+        restock_cancelled_orders([instance.pk])
+        instance.stock_deducted = False
 
     # 2. Auto-set delivered_at cuando el estado cambia a DELIVERED
     if instance.status == Order.STATUS_DELIVERED and not instance.delivered_at:
@@ -78,3 +97,9 @@ def on_order_saved(sender, instance: Order, created, **kwargs):
 
     # 3. Notificaciones por email
     _emit_order_notifications(instance, created)
+
+
+@receiver(user_logged_in)
+def _merge_cart_on_login(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'):
+        merge_session_cart(request, user)
@@ -1,8 +1,10 @@
+from unittest import mock
+
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from decimal import Decimal
-from .models import Order
+from .models import Order, OrderItem
 
 User = get_user_model()
 
@@ -148,3 +150,729 @@ class OrderListViewTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn('/accounts/login/', response.url)
 
+
+
+class BulkOperationsTests(TestCase):
+    """Tests del modo bulk (core.bulk.bulk_operations)"""
+
+    def setUp(self):
+        from catalog.models import Product
+        from .models import OrderItem
+
+        self.customer = User.objects.create_user(
+            email='bulk@test.com',
+            password='testpass123',
+            status='active',
+            email_verified=True,
+        )
+        self.product = Product.objects.create(
+            name_es='Arroz', name_zh_hans='米', price=Decimal('2.00'),
+            stock_available=10, stock_min_threshold=3,
+        )
+        self.orders = []
+        for qty in (2, 5):
+            order = Order.objects.create(customer=self.customer, status=Order.STATUS_CONFIRMED)
+            OrderItem.objects.create(
+                order=order, product=self.product, product_name_es='Arroz',
+                product_name_zh_hans='米', quantity=qty, unit_price=Decimal('2.00'),
+            )
+            self.orders.append(order)
+
+    def test_deferred_stock_deduction_and_status(self):
+        """El descuento de stock y stock_status se aplican al salir del bloque"""
+        from core.bulk import bulk_operations
+
+        with bulk_operations():
+            for order in self.orders:
+                order.status = Order.STATUS_PREPARING
+                order.save()
+            self.product.refresh_from_db()
+            self.assertEqual(self.product.stock_available, 10)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_available, 3)
+        self.assertEqual(self.product.stock_status, self.product.STOCK_LOW)
+        self.assertFalse(Order.objects.filter(stock_deducted=False).exists())
+
+    def test_product_and_user_hooks_deferred(self):
+        """Product.save y User.save no recalculan por objeto en modo bulk"""
+        from core.bulk import bulk_operations
+
+        with bulk_operations():
+            self.product.stock_available = 0
+            self.product.save()
+            self.assertEqual(self.product.stock_status, self.product.STOCK_OK)
+            for field in User.PROFILE_REQUIRED_FIELDS:
+                setattr(self.customer, field, 'x')
+            self.customer.save()
+
+        self.product.refresh_from_db()
+        self.customer.refresh_from_db()
+        self.assertEqual(self.product.stock_status, self.product.STOCK_OUT)
+        self.assertTrue(self.customer.profile_completed)
+
+
+@override_settings(
+    MIDDLEWARE=[
+        'django.middleware.security.SecurityMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ]
+)
+class OrderBulkStatusTests(TestCase):
+    """Tests del cambio de estado masivo (tablero de pedidos)"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            email='dispatch@test.com',
+            password='testpass123',
+            status='active',
+            email_verified=True,
+            is_staff=True,
+        )
+        self.customer = User.objects.create_user(
+            email='customer@test.com',
+            password='testpass123',
+            status='active',
+            email_verified=True,
+        )
+        self.preparing = [
+            Order.objects.create(customer=self.customer, status=Order.STATUS_PREPARING)
+            for _ in range(3)
+        ]
+        self.new_order = Order.objects.create(customer=self.customer, status=Order.STATUS_NEW)
+        self.client.login(email='dispatch@test.com', password='testpass123')
+
+    def test_bulk_transition_validates_and_applies(self):
+        """Aplica las transiciones válidas y rechaza las no permitidas"""
+        from .models import OrderEvent
+
+        ids = [o.pk for o in self.preparing] + [self.new_order.pk]
+        response = self.client.post(
+            reverse('orders:order_bulk_status'),
+            data={'order_ids': ids, 'status': Order.STATUS_OUT_FOR_DELIVERY, 'note': 'Ruta 1'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(sorted(data['applied']), sorted(o.pk for o in self.preparing))
+        self.assertIn(str(self.new_order.pk), data['rejected'])
+        self.assertEqual(
+            Order.objects.filter(status=Order.STATUS_OUT_FOR_DELIVERY).count(), 3
+        )
+        self.assertEqual(OrderEvent.objects.filter(note='Ruta 1').count(), 3)
+
+    def test_board_requires_manager(self):
+        """El tablero se muestra a managers y no a clientes"""
+        response = self.client.get(reverse('orders:order_board'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'value="{self.new_order.pk}"')
+
+        self.client.login(email='customer@test.com', password='testpass123')
+        response = self.client.get(reverse('orders:order_board'))
+        self.assertRedirects(response, reverse('orders:order_list'), fetch_redirect_response=False)
+
+
+class OrderStateMachineTests(TestCase):
+    """Tests de la máquina de estados (orders.services.transitions)"""
+
+    def setUp(self):
+        from catalog.models import Product
+        from .models import OrderItem
+
+        self.customer = User.objects.create_user(
+            email='sm@test.com',
+            password='testpass123',
+            status='active',
+            email_verified=True,
+        )
+        self.product = Product.objects.create(
+            name_es='Aceite', name_zh_hans='油', price=Decimal('5.00'),
+            stock_available=4, stock_min_threshold=1,
+        )
+        self.order = Order.objects.create(customer=self.customer, status=Order.STATUS_CONFIRMED)
+        OrderItem.objects.create(
+            order=self.order, product=self.product, product_name_es='Aceite',
+            product_name_zh_hans='油', quantity=6, unit_price=Decimal('5.00'),
+        )
+
+    def test_preparing_deducts_stock_once_and_reports_shortage(self):
+        from .services.transitions import transition
+
+        shortages = transition(self.order, Order.STATUS_PREPARING, self.customer)
+        self.assertEqual([s['product'].pk for s in shortages], [self.product.pk])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_available, 0)
+        self.assertEqual(self.product.stock_status, self.product.STOCK_OUT)
+
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.stock_deducted)
+        self.assertEqual(self.order.events.count(), 1)
+
+    def test_cancel_restocks_what_was_deducted(self):
+        """Cancelar repone exactamente lo descontado según el libro de stock"""
+        from catalog.models import StockMovement
+        from .services.transitions import transition
+
+        transition(self.order, Order.STATUS_PREPARING, self.customer)
+        transition(self.order, Order.STATUS_CANCELLED, self.customer)
+
+        self.product.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.product.stock_available, 4)
+        self.assertFalse(self.order.stock_deducted)
+        self.assertEqual(
+            list(StockMovement.objects.filter(order=self.order)
+                 .order_by('created_at', 'pk').values_list('kind', 'quantity')),
+            [(StockMovement.KIND_ORDER_DEDUCTION, -4), (StockMovement.KIND_ORDER_CANCELLATION, 4)],
+        )
+
+    def test_invalid_transition_rejected(self):
+        from .services.transitions import InvalidTransition, transition
+
+        with self.assertRaises(InvalidTransition):
+            transition(self.order, Order.STATUS_DELIVERED, self.customer)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_CONFIRMED)
+
+    def test_stale_status_rejected(self):
+        """La escritura está condicionada al estado leído"""
+        from .services.transitions import InvalidTransition, transition
+
+        Order.objects.filter(pk=self.order.pk).update(status=Order.STATUS_CANCELLED)
+        with self.assertRaises(InvalidTransition):
+            transition(self.order, Order.STATUS_PREPARING, self.customer)
+
+    def test_delivered_sets_timestamp_and_runs_hooks_on_commit(self):
+        from unittest import mock
+        from .services import transitions
+
+        calls = []
+        transitions.register_transition_hook(calls.extend, statuses=[Order.STATUS_DELIVERED])
+        self.addCleanup(transitions._transition_hooks.pop)
+
+        Order.objects.filter(pk=self.order.pk).update(status=Order.STATUS_OUT_FOR_DELIVERY)
+        self.order.refresh_from_db()
+        with mock.patch(
+            'orders.services.order_notifications.enqueue_order_status_notifications'
+        ) as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                transitions.transition(self.order, Order.STATUS_DELIVERED, self.customer)
+                self.assertEqual(calls, [])
+
+        self.assertEqual([t.new_status for t in calls], [Order.STATUS_DELIVERED])
+        enqueue.assert_called_once_with([(self.order.pk, Order.STATUS_DELIVERED)])
+        self.order.refresh_from_db()
+        self.assertIsNotNone(self.order.delivered_at)
+
+
+class StockReservationTests(TestCase):
+    """Tests de reservas de stock en el checkout (catalog.reservations)"""
+
+    def setUp(self):
+        from catalog.models import Product
+
+        self.customer = User.objects.create_user(
+            email='res@test.com',
+            password='testpass123',
+            status='active',
+            email_verified=True,
+        )
+        self.product = Product.objects.create(
+            name_es='Jamón', name_zh_hans='火腿', price=Decimal('90.00'),
+            stock_available=3,
+        )
+
+    def test_checkout_reserves_and_prevents_overselling(self):
+        from .services.checkout import InsufficientStock, place_order
+
+        order = place_order(self.customer, {str(self.product.pk): 2})
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_reserved, 2)
+        self.assertEqual(order.total_amount, Decimal('180.00'))
+
+        with self.assertRaises(InsufficientStock):
+            place_order(self.customer, {str(self.product.pk): 2})
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_reserved, 2)
+
+    def test_preparing_converts_and_cancel_releases(self):
+        from catalog.models import StockReservation
+        from .services.checkout import place_order
+        from .services.transitions import transition
+
+        kept = place_order(self.customer, {str(self.product.pk): 2})
+        cancelled = place_order(self.customer, {str(self.product.pk): 1})
+
+        transition(cancelled, Order.STATUS_CANCELLED, self.customer)
+        transition(kept, Order.STATUS_PREPARING, self.customer)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_reserved, 0)
+        self.assertEqual(self.product.stock_available, 1)
+        self.assertEqual(
+            dict(StockReservation.objects.values_list('order_id', 'status')),
+            {kept.pk: StockReservation.STATUS_CONVERTED, cancelled.pk: StockReservation.STATUS_RELEASED},
+        )
+
+    def test_expired_holds_are_released(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from catalog.reservations import expire_reservations
+        from .services.checkout import place_order
+
+        place_order(self.customer, {str(self.product.pk): 3})
+        self.assertEqual(expire_reservations(), 0)
+        self.assertEqual(expire_reservations(now=timezone.now() + timedelta(days=30)), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_reserved, 0)
+
+
+class StockAlertTests(TestCase):
+    """Tests de alertas de bajo stock (catalog.alerts)"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from catalog.models import Product
+
+        cache.clear()
+        self.product = Product.objects.create(
+            name_es='Queso', name_zh_hans='奶酪', price=Decimal('12.00'),
+            stock_available=10, stock_min_threshold=5,
+        )
+
+    def _adjust(self, adjustment):
+        from catalog.models import Product
+        from catalog.stock import adjust_stock
+
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_stock(Product.objects.filter(pk=self.product.pk), adjustment)
+
+    def test_bouncing_product_alerts_once_per_window(self):
+        from unittest import mock
+
+        with mock.patch('catalog.alerts.threading.Thread') as thread:
+            self._adjust(-6)   # OK -> BAJO
+            self._adjust(6)    # BAJO -> OK
+            self._adjust(-6)   # OK -> BAJO (misma ventana)
+            self._adjust(-4)   # BAJO -> SIN STOCK (misma ventana)
+
+        self.assertEqual(thread.call_count, 1)
+        self.assertEqual(thread.call_args.kwargs['args'], ([(self.product.pk, 'low')],))
+
+    def test_dashboard_list_is_cached_and_invalidated(self):
+        from unittest import mock
+        from catalog.alerts import get_low_stock_products
+
+        self.assertEqual(get_low_stock_products(), [])
+        with mock.patch('catalog.alerts.threading.Thread'):
+            self._adjust(-6)
+        products = get_low_stock_products()
+        self.assertEqual([p['pk'] for p in products], [self.product.pk])
+        with self.assertNumQueries(0):
+            get_low_stock_products()
+
+        with mock.patch('catalog.alerts.threading.Thread'):
+            self._adjust(-1)
+        self.assertEqual(get_low_stock_products()[0]['stock_available'], 3)
+
+
+class OrderDetailQueryCountTests(TestCase):
+    """El detalle de pedido se carga en un número fijo de consultas"""
+
+    def setUp(self):
+        from catalog.models import Product
+
+        self.admin_user = User.objects.create_user(
+            email='detail-admin@test.com',
+            password='testpass123',
+            status='active',
+            email_verified=True,
+            is_staff=True,
+        )
+        self.customer = User.objects.create_user(
+            email='detail@test.com',
+            password='testpass123',
+            status='active',
+            email_verified=True,
+        )
+        self.product = Product.objects.create(
+            name_es='Arroz', name_zh_hans='米', price=Decimal('2.50'), stock_available=100,
+        )
+
+    def _order(self, lines):
+        from .models import OrderEvent, OrderItem
+
+        order = Order.objects.create(customer=self.customer, total_amount=Decimal('2.50') * lines)
+        for _ in range(lines):
+            OrderItem.objects.create(
+                order=order, product=self.product, product_name_es='Arroz',
+                product_name_zh_hans='米', quantity=1, unit_price=Decimal('2.50'),
+            )
+            OrderEvent.objects.create(order=order, status=Order.STATUS_NEW, created_by=self.admin_user)
+        return order
+
+    def test_loader_uses_constant_queries(self):
+        from .services.detail import load_order_detail
+
+        order = self._order(5)
+        with self.assertNumQueries(4):
+            loaded = load_order_detail(order.pk)
+            items = list(loaded.items.all())
+            [item.product.name_es for item in items]
+            [event.created_by.email for event in loaded.events.all()]
+            list(loaded.documents.all())
+        self.assertEqual(loaded.items_subtotal, Decimal('12.50'))
+
+    def test_view_query_count_does_not_grow_with_lines(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        small, large = self._order(1), self._order(8)
+        self.client.login(email='detail-admin@test.com', password='testpass123')
+        # Primera petición: registro de la sesión del usuario (middleware)
+        self.client.get(reverse('orders:order_detail', args=[small.pk]))
+        counts = []
+        for order in (small, large):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('orders:order_detail', args=[order.pk]))
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(response.context['subtotal'], Decimal('20.00'))
+
+
+class OrderConditionalGetTests(TestCase):
+    """ETag/304 en detalle y listado de pedidos (core.conditional)"""
+
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email='etag@test.com', password='testpass123', status='active', email_verified=True,
+        )
+        self.other = User.objects.create_user(
+            email='etag-otro@test.com', password='testpass123', status='active', email_verified=True,
+        )
+        self.order = Order.objects.create(customer=self.customer, total_amount=Decimal('10.00'))
+        self.client.login(email='etag@test.com', password='testpass123')
+        self.url = reverse('orders:order_detail', args=[self.order.pk])
+
+    def test_unchanged_detail_returns_304_without_rendering(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('private', first['Cache-Control'])
+        self.assertIn('Cookie', first['Vary'])
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertFalse(second.templates)
+
+    def test_new_event_or_status_change_invalidates_detail(self):
+        from .models import OrderEvent
+        from .services.transitions import transition
+
+        etag = self.client.get(self.url)['ETag']
+        OrderEvent.objects.create(order=self.order, status=Order.STATUS_NEW, created_by=self.customer)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        transition(self.order, Order.STATUS_CONFIRMED, self.customer)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_is_per_user_and_other_orders_still_404(self):
+        etag = self.client.get(reverse('orders:order_list'))['ETag']
+        self.assertEqual(self.client.get(reverse('orders:order_list'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Order.objects.create(customer=self.other, total_amount=Decimal('5.00'))
+        self.assertEqual(self.client.get(reverse('orders:order_list'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Order.objects.create(customer=self.customer, total_amount=Decimal('5.00'))
+        self.assertEqual(self.client.get(reverse('orders:order_list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.client.login(email='etag-otro@test.com', password='testpass123')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+
+class CartSessionTests(TestCase):
+    """Carrito anónimo compacto en la sesión (orders.services.cart)"""
+
+    def setUp(self):
+        from catalog.models import Product
+
+        self.customer = User.objects.create_user(
+            email='cart@test.com', password='testpass123', status='active', email_verified=True,
+        )
+        self.products = [
+            Product.objects.create(name_es=f'Producto {i}', name_zh_hans=f'产品 {i}', price=Decimal('1.50'))
+            for i in range(3)
+        ]
+
+    def _post(self, name, payload):
+        import json
+
+        return self.client.post(reverse(name), json.dumps(payload), content_type='application/json')
+
+    def test_encoding_round_trip_and_legacy_dict(self):
+        from .services.cart import decode_cart, encode_cart
+
+        self.assertEqual(encode_cart({'15': 3, '12': 2, '9': 0}), 'c1:12:2,15:3')
+        self.assertEqual(decode_cart('c1:12:2,15:3'), {'12': 2, '15': 3})
+        self.assertEqual(decode_cart({'12': '2', 15: 3}), {'12': 2, '15': 3})
+        self.assertEqual(decode_cart('c9:1:1'), {})
+        self.assertEqual(decode_cart('c1:roto'), {})
+
+    def test_legacy_session_cart_is_read_and_rewritten(self):
+        a, b = self.products[:2]
+        session = self.client.session
+        session['cart'] = {str(a.pk): 2}
+        session.save()
+
+        response = self._post('orders:cart_add', {'product_id': b.pk, 'quantity': 1})
+        self.assertEqual(response.json()['cart_count'], 3)
+        self.assertEqual(self.client.session['cart'], f'c1:{a.pk}:2,{b.pk}:1')
+
+    def test_batch_update_is_a_single_session_write(self):
+        from django.contrib.sessions.backends.db import SessionStore
+
+        a, b, c = self.products
+        self._post('orders:cart_add', {'product_id': a.pk, 'quantity': 1})
+        with mock.patch.object(SessionStore, 'save', autospec=True, side_effect=SessionStore.save) as save:
+            response = self._post('orders:cart_update', {'items': {str(a.pk): 0, str(b.pk): 4, str(c.pk): 2}})
+        self.assertEqual(response.json()['cart_count'], 6)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(self.client.session['cart'], f'c1:{b.pk}:4,{c.pk}:2')
+
+    def test_unchanged_cart_does_not_write_session(self):
+        from django.contrib.sessions.backends.db import SessionStore
+
+        a = self.products[0]
+        self._post('orders:cart_update', {'product_id': a.pk, 'quantity': 3})
+        with mock.patch.object(SessionStore, 'save', autospec=True, side_effect=SessionStore.save) as save:
+            self._post('orders:cart_update', {'product_id': a.pk, 'quantity': 3})
+        save.assert_not_called()
+
+    @override_settings(
+        SESSION_BACKEND='signed_cookies', SESSIONS_SERVER_SIDE=False,
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+    )
+    def test_signed_cookie_sessions_keep_cart_without_db_rows(self):
+        from django.contrib.sessions.models import Session
+
+        a = self.products[0]
+        self._post('orders:cart_add', {'product_id': a.pk, 'quantity': 2})
+        response = self.client.get(reverse('orders:cart'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cart_count'], 2)
+        self.assertFalse(Session.objects.exists())
+
+
+class PersistentCartTests(TestCase):
+    """Carrito en base de datos para usuarios autenticados (Cart/CartLine)"""
+
+    def setUp(self):
+        from catalog.models import Product
+
+        self.customer = User.objects.create_user(
+            email='cart-db@test.com', password='testpass123', status='active', email_verified=True,
+            full_name='Cliente Carrito',
+        )
+        self.products = [
+            Product.objects.create(
+                name_es=f'Producto {i}', name_zh_hans=f'产品 {i}', price=Decimal('2.00'), stock_available=100,
+            )
+            for i in range(3)
+        ]
+
+    def _post(self, name, payload, client=None):
+        import json
+
+        return (client or self.client).post(reverse(name), json.dumps(payload), content_type='application/json')
+
+    def test_session_cart_of_an_already_logged_in_user_is_merged_on_first_access(self):
+        from .services.cart import CART_SESSION_KEY, UserCart
+
+        a, b, _ = self.products
+        self.client.force_login(self.customer)
+        session = self.client.session
+        session[CART_SESSION_KEY] = {str(a.pk): 2, str(b.pk): 1}  # formato anterior al despliegue
+        session.save()
+
+        self.assertEqual(self.client.get(reverse('orders:cart')).status_code, 200)
+        self.assertEqual(UserCart(self.customer).lines(), {str(a.pk): 2, str(b.pk): 1})
+        self.assertNotIn(CART_SESSION_KEY, self.client.session)
+        self.client.get(reverse('orders:cart'))
+        self.assertEqual(UserCart(self.customer).count(), 3)
+
+    def test_add_upserts_lines_and_keeps_counter(self):
+        from .models import Cart, CartLine
+
+        a, b, _ = self.products
+        self.client.force_login(self.customer)
+        self._post('orders:cart_add', {'product_id': a.pk, 'quantity': 2})
+        response = self._post('orders:cart_add', {'product_id': a.pk, 'quantity': 3})
+        self.assertEqual(response.json()['product_quantity'], 5)
+        self._post('orders:cart_update', {'items': {str(b.pk): 4}})
+        response = self._post('orders:cart_remove', {'product_id': a.pk})
+
+        self.assertEqual(response.json()['cart_count'], 4)
+        self.assertEqual(Cart.objects.get(user=self.customer).item_count, 4)
+        self.assertEqual(list(CartLine.objects.values_list('product_id', 'quantity')), [(b.pk, 4)])
+        self.assertNotIn('cart', self.client.session)
+
+    def test_cart_follows_the_user_to_another_device(self):
+        from django.test import Client
+
+        a = self.products[0]
+        self.client.force_login(self.customer)
+        self._post('orders:cart_add', {'product_id': a.pk, 'quantity': 2})
+        self.client.logout()
+
+        desktop = Client()
+        desktop.login(email='cart-db@test.com', password='testpass123')
+        response = desktop.get(reverse('orders:cart'))
+        self.assertEqual(response.context['cart_count'], 2)
+        self.assertEqual([item['quantity'] for item in response.context['cart_items']], [2])
+
+    def test_anonymous_cart_merges_on_login(self):
+        from .services.cart import UserCart
+
+        a, b, c = self.products
+        UserCart(self.customer).update({a.pk: 1})
+        c.is_active = False
+        c.save()
+        self._post('orders:cart_add', {'product_id': a.pk, 'quantity': 2})
+        self._post('orders:cart_add', {'product_id': b.pk, 'quantity': 1})
+        session = self.client.session
+        session['cart'] = session['cart'] + f',{c.pk}:5'
+        session.save()
+
+        self.client.login(email='cart-db@test.com', password='testpass123')
+        self.assertEqual(UserCart(self.customer).lines(), {str(a.pk): 3, str(b.pk): 1})
+        self.assertEqual(UserCart(self.customer).count(), 4)
+        self.assertNotIn('cart', self.client.session)
+
+    def test_order_create_empties_persistent_cart(self):
+        from .services.cart import UserCart
+
+        a = self.products[0]
+        self.client.force_login(self.customer)
+        self._post('orders:cart_add', {'product_id': a.pk, 'quantity': 2})
+        with mock.patch('orders.views.place_order') as place:
+            place.return_value = Order.objects.create(customer=self.customer, total_amount=Decimal('4.00'))
+            with mock.patch.object(User, 'check_profile_completed', return_value=True):
+                self.client.post(reverse('orders:order_create'))
+        place.assert_called_once_with(self.customer, {str(a.pk): 2})
+        self.assertEqual(UserCart(self.customer).lines(), {})
+        self.assertEqual(UserCart(self.customer).count(), 0)
+
+
+class ReorderAndTemplateTests(TestCase):
+    """Repetir pedido y plantillas de pedido (orders.services.reorder)"""
+
+    def setUp(self):
+        from catalog.models import Product
+
+        self.customer = User.objects.create_user(
+            email='reorder@test.com', password='testpass123', status='active', email_verified=True,
+        )
+        self.products = [
+            Product.objects.create(
+                name_es=f'Producto {i}', name_zh_hans=f'产品 {i}', price=Decimal('2.00'), stock_available=500,
+            )
+            for i in range(40)
+        ]
+        self.client.force_login(self.customer)
+
+    def _order(self, products, quantity=2, customer=None):
+        order = Order.objects.create(customer=customer or self.customer, total_amount=Decimal('0.00'))
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order, product=p, product_name_es=p.name_es, product_name_zh_hans=p.name_zh_hans,
+                quantity=quantity, unit_price=p.price, line_total=p.price * quantity,
+            )
+            for p in products
+        ])
+        return order
+
+    def _queries(self, url, data):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, data)
+        return response, len(ctx)
+
+    def test_reorder_to_cart_skips_inactive_and_does_not_scale_with_lines(self):
+        from .services.cart import UserCart
+
+        small = self._order(self.products[:2])
+        large = self._order(self.products[2:40])
+        self.products[39].is_active = False
+        self.products[39].save()
+
+        # La primera petición registra la sesión y crea el carrito
+        response = self.client.post(reverse('orders:order_reorder', args=[small.pk]), {'target': 'cart'})
+        self.assertRedirects(response, reverse('orders:cart'), fetch_redirect_response=False)
+        _, small_queries = self._queries(reverse('orders:order_reorder', args=[small.pk]), {'target': 'cart'})
+        _, large_queries = self._queries(reverse('orders:order_reorder', args=[large.pk]), {'target': 'cart'})
+        self.assertEqual(small_queries, large_queries)
+
+        lines = UserCart(self.customer).lines()
+        self.assertEqual(len(lines), 39)
+        self.assertNotIn(str(self.products[39].pk), lines)
+        self.assertEqual(UserCart(self.customer).count(), 2 * 2 * 2 + 37 * 2)
+
+    def test_reorder_to_new_order_uses_current_prices(self):
+        order = self._order(self.products[:2], quantity=3)
+        self.products[0].price = Decimal('5.00')
+        self.products[0].save()
+
+        with mock.patch.object(User, 'check_profile_completed', return_value=True):
+            response = self.client.post(reverse('orders:order_reorder', args=[order.pk]), {'target': 'order'})
+        new_order = Order.objects.exclude(pk=order.pk).get()
+        self.assertRedirects(response, reverse('orders:order_detail', args=[new_order.pk]), fetch_redirect_response=False)
+        self.assertEqual(new_order.total_amount, Decimal('21.00'))
+        self.assertEqual(
+            sorted(new_order.items.values_list('unit_price', flat=True)), [Decimal('2.00'), Decimal('5.00')],
+        )
+
+    def test_cannot_reorder_or_use_templates_of_other_customers(self):
+        from .models import OrderTemplate
+
+        other = User.objects.create_user(email='otro-reorder@test.com', password='x', status='active')
+        order = self._order(self.products[:1], customer=other)
+        template = OrderTemplate.objects.create(customer=other, name='Ajena')
+        self.assertEqual(self.client.post(reverse('orders:order_reorder', args=[order.pk])).status_code, 404)
+        self.assertEqual(
+            self.client.post(reverse('orders:order_template_apply', args=[template.pk])).status_code, 404,
+        )
+        response = self.client.post(reverse('orders:order_template_save'), {'name': 'X', 'order_id': order.pk})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(reverse('orders:order_template_save'), {'name': 'X', 'order_id': 'abc'})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(OrderTemplate.objects.filter(customer=self.customer).exists())
+
+    def test_template_from_order_is_replaced_by_name_and_applied(self):
+        from .models import OrderTemplate
+        from .services.cart import UserCart
+
+        first = self._order(self.products[:3])
+        second = self._order(self.products[3:5], quantity=4)
+        url = reverse('orders:order_template_save')
+        self.client.post(url, {'name': 'Semanal', 'order_id': first.pk})
+        self.client.post(url, {'name': 'Semanal', 'order_id': second.pk})
+
+        template = OrderTemplate.objects.get(customer=self.customer)
+        self.assertEqual(
+            sorted(template.items.values_list('product_id', 'quantity')),
+            [(self.products[3].pk, 4), (self.products[4].pk, 4)],
+        )
+        response = self.client.get(reverse('orders:order_template_list'))
+        self.assertContains(response, 'Semanal')
+
+        self.client.post(reverse('orders:order_template_apply', args=[template.pk]), {'target': 'cart'})
+        self.assertEqual(UserCart(self.customer).count(), 8)
@@ -9,6 +9,11 @@ urlpatterns = [
     path('create/', views.order_create, name='order_create'),
     path('<int:pk>/', views.order_detail, name='order_detail'),
     path('<int:pk>/cancel/', views.order_cancel, name='order_cancel'),
+    path('<int:pk>/reorder/', views.order_reorder, name='order_reorder'),
+    path('templates/', views.order_template_list, name='order_template_list'),
+    path('templates/save/', views.order_template_save, name='order_template_save'),
+    path('templates/<int:pk>/apply/', views.order_template_apply, name='order_template_apply'),
+    path('templates/<int:pk>/delete/', views.order_template_delete, name='order_template_delete'),
     path('cart/', views.cart_view, name='cart'),
     path('cart/add/', views.cart_add, name='cart_add'),
     path('cart/remove/', views.cart_remove, name='cart_remove'),
@@ -17,6 +22,8 @@ urlpatterns = [
     # Vistas de gestión (Manager/Admin)
     path('manage/', views.order_manage_list, name='order_manage_list'),
     path('manage/dashboard/', views.order_dashboard, name='order_dashboard'),
+    path('manage/board/', views.order_board, name='order_board'),
+    path('manage/bulk-status/', views.order_bulk_status, name='order_bulk_status'),
     path('manage/<int:pk>/status/', views.order_update_status, name='order_update_status'),
     path('manage/<int:pk>/eta/', views.order_update_eta, name='order_update_eta'),
     path('manage/<int:pk>/upload-document/', views.order_document_upload, name='order_document_upload'),
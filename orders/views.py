@@ -1,12 +1,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, IntegerField, Max, OuterRef, Q, Subquery, Sum
 from django.db.models.functions import TruncMonth
 from django.core.paginator import Paginator, Page
 from decimal import Decimal
@@ -14,12 +14,19 @@ import json
 from datetime import datetime, date, timedelta
 from calendar import monthrange
 
-from .models import Order, OrderItem, OrderEvent, OrderDocument
-from .forms import OrderStatusUpdateForm, OrderETAForm, OrderDocumentForm
+from .models import Order, OrderItem, OrderEvent, OrderDocument, OrderTemplate
+from .forms import OrderStatusUpdateForm, OrderETAForm, OrderDocumentForm, OrderBulkStatusForm
 from catalog.models import Product
 from accounts.models import User
 from accounts.utils import is_manager_or_admin
-from .services import enqueue_order_confirmation_email
+from core.conditional import conditional_page
+from .services.cart import cart_for
+from .services.checkout import InsufficientStock, place_order
+from .services.detail import load_order_detail
+from .services.reorder import (
+    add_lines_to_cart, create_order_from_lines, order_lines, save_template, template_lines,
+)
+from .services.transitions import InvalidTransition, bulk_transition, transition
 
 
 # ============================================================
@@ -132,35 +139,28 @@ def filter_orders_by_month_year(queryset, month=None, year=None):
 # ============================================================
 
 def get_cart(request):
-    """Obtiene el carrito de la sesión"""
-    cart = request.session.get('cart', {})
-    return cart
-
-
-def save_cart(request, cart):
-    """Guarda el carrito en la sesión"""
-    request.session['cart'] = cart
-    request.session.modified = True
+    """Obtiene las líneas del carrito (sesión o ``Cart`` del usuario): ``{'<id>': cantidad}``"""
+    return cart_for(request).lines()
 
 
 def cart_view(request):
     """Vista del carrito de compras"""
     cart = get_cart(request)
+    products = Product.objects.filter(is_active=True).in_bulk([int(pk) for pk in cart])
     cart_items = []
     total = Decimal('0.00')
     
     for product_id, quantity in cart.items():
-        try:
-            product = Product.objects.get(pk=product_id, is_active=True)
-            item_total = product.price * Decimal(quantity)
-            total += item_total
-            cart_items.append({
-                'product': product,
-                'quantity': int(quantity),
-                'item_total': item_total,
-            })
-        except Product.DoesNotExist:
+        product = products.get(int(product_id))
+        if product is None:
             continue
+        item_total = product.price * Decimal(quantity)
+        total += item_total
+        cart_items.append({
+            'product': product,
+            'quantity': int(quantity),
+            'item_total': item_total,
+        })
     
     context = {
         'cart_items': cart_items,
@@ -174,20 +174,21 @@ def cart_add(request):
     """Añade un producto al carrito (SUMA a cantidad existente)"""
     try:
         data = json.loads(request.body)
-        product_id = str(data.get('product_id'))
+        product_id = int(data.get('product_id'))
         quantity = int(data.get('quantity', 1))
         
-        product = get_object_or_404(Product, pk=product_id, is_active=True)
-        
-        cart = get_cart(request)
-        current_quantity = cart.get(product_id, 0)
-        new_quantity = current_quantity + quantity
-        cart[product_id] = new_quantity
-        save_cart(request, cart)
-        
         # Obtener idioma del usuario para el mensaje
         lang = request.user.language if request.user.is_authenticated else 'es'
-        product_name = product.name_zh_hans if lang == 'zh-hans' else product.name_es
+        # Una consulta valida el producto y trae solo el nombre para el mensaje
+        product_name = (
+            Product.objects.filter(pk=product_id, is_active=True)
+            .values_list('name_zh_hans' if lang == 'zh-hans' else 'name_es', flat=True).first()
+        )
+        if product_name is None:
+            raise Product.DoesNotExist
+        
+        cart = cart_for(request)
+        new_quantity = cart.add(product_id, quantity)
         
         if lang == 'zh-hans':
             message = f'{product_name} 已添加到购物车'
@@ -198,7 +199,7 @@ def cart_add(request):
             'success': True,
             'message': message,
             'product_quantity': new_quantity,  # Cantidad total del producto en cesta
-            'cart_count': sum(cart.values())   # Total de items en cesta
+            'cart_count': cart.count()   # Total de items en cesta
         })
     except Exception as e:
         error_msg = _('Error al añadir producto al carrito')
@@ -210,16 +211,14 @@ def cart_remove(request):
     """Elimina un producto del carrito"""
     try:
         data = json.loads(request.body)
-        product_id = str(data.get('product_id'))
+        product_id = int(data.get('product_id'))
         
-        cart = get_cart(request)
-        if product_id in cart:
-            del cart[product_id]
-            save_cart(request, cart)
+        cart = cart_for(request)
+        cart.update({product_id: 0})
         
         return JsonResponse({
             'success': True,
-            'cart_count': sum(cart.values())
+            'cart_count': cart.count()
         })
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=400)
@@ -227,22 +226,31 @@ def cart_remove(request):
 
 @require_POST
 def cart_update(request):
-    """Actualiza la cantidad de un producto en el carrito"""
+    """
+    Actualiza la cantidad de uno o varios productos del carrito.
+
+    Acepta ``{"product_id": 12, "quantity": 3}`` o, para aplicar de una vez
+    los cambios acumulados en el navegador, ``{"items": {"12": 3, "15": 0}}``
+    (cantidad 0 = quitar). Una sola escritura por petición.
+    """
     try:
         data = json.loads(request.body)
-        product_id = str(data.get('product_id'))
-        quantity = int(data.get('quantity', 1))
-        
-        if quantity <= 0:
-            return cart_remove(request)
+        items = data.get('items')
+        if items is None:
+            items = {data.get('product_id'): data.get('quantity', 1)}
+        items = {int(pk): int(qty) for pk, qty in items.items()}
         
-        cart = get_cart(request)
-        cart[product_id] = quantity
-        save_cart(request, cart)
+        # Solo se añaden productos activos; quitar siempre se permite
+        active = set(
+            Product.objects.filter(pk__in=[pk for pk, qty in items.items() if qty > 0], is_active=True)
+            .values_list('pk', flat=True)
+        )
+        cart = cart_for(request)
+        cart.update({pk: qty for pk, qty in items.items() if qty <= 0 or pk in active})
         
         return JsonResponse({
             'success': True,
-            'cart_count': sum(cart.values())
+            'cart_count': cart.count()
         })
     except Exception as e:
         error_msg = _('Error al actualizar el carrito')
@@ -250,9 +258,8 @@ def cart_update(request):
 
 
 @login_required
-@transaction.atomic
 def order_create(request):
-    """Crea un nuevo pedido desde el carrito"""
+    """Crea un nuevo pedido desde el carrito (reservando stock)"""
     cart = get_cart(request)
     
     if not cart:
@@ -270,43 +277,176 @@ def order_create(request):
         )
         return redirect('accounts:operative_profile_edit')
     
-    # Crear el pedido
-    order = Order.objects.create(
-        customer=request.user,
-        status=Order.STATUS_NEW,
-        total_amount=Decimal('0.00')
-    )
-    
-    total = Decimal('0.00')
-    for product_id, quantity in cart.items():
-        try:
-            product = Product.objects.get(pk=product_id, is_active=True)
-            item = OrderItem.objects.create(
-                order=order,
-                product=product,
-                product_name_es=product.name_es,
-                product_name_zh_hans=product.name_zh_hans,
-                quantity=int(quantity),
-                unit_price=product.price,
-            )
-            total += item.line_total
-        except Product.DoesNotExist:
-            continue
-    
-    order.total_amount = total
-    order.save()
+    try:
+        order = place_order(request.user, cart)
+    except InsufficientStock as e:
+        _insufficient_stock_message(request, e)
+        return redirect('orders:cart')
 
-    transaction.on_commit(lambda: enqueue_order_confirmation_email(order.id))
+    if order is None:
+        messages.warning(request, _('Los productos del carrito ya no están disponibles.'))
+        return redirect('orders:cart')
     
     # Limpiar el carrito
-    request.session['cart'] = {}
-    request.session.modified = True
+    cart_for(request).clear()
     
     messages.success(request, _('Pedido #%(id)s creado exitosamente.') % {'id': order.id})
     return redirect('orders:order_detail', pk=order.pk)
 
 
+def _insufficient_stock_message(request, error):
+    product = Product.objects.filter(pk=error.product_id).first()
+    messages.error(
+        request,
+        _('No hay stock suficiente de %(product)s. Disponible: %(stock)s') % {
+            'product': product.name_es if product else error.product_id,
+            'stock': product.stock_free if product else 0,
+        }
+    )
+
+
+# ============================================================
+# Repetir pedido y plantillas (cestas guardadas)
+# ============================================================
+
+def _apply_lines(request, lines, target):
+    """
+    Copia ``lines`` al carrito (``target='cart'``) o crea directamente un
+    pedido (``target='order'``) en una sola operación.
+    """
+    if target == 'order':
+        if not request.user.check_profile_completed():
+            messages.error(request, _('Debes completar tu perfil operativo antes de crear un pedido.'))
+            return redirect('accounts:operative_profile_edit')
+        try:
+            order, resolved = create_order_from_lines(request.user, lines)
+        except InsufficientStock as e:
+            _insufficient_stock_message(request, e)
+            # Se dejan en el carrito para ajustar cantidades
+            add_lines_to_cart(request, lines)
+            return redirect('orders:cart')
+    else:
+        order, resolved = None, add_lines_to_cart(request, lines)
+
+    if resolved.unavailable:
+        messages.warning(
+            request,
+            _('%(count)s producto(s) ya no están disponibles y se han omitido.') % {'count': len(resolved.unavailable)}
+        )
+    if not resolved.lines:
+        messages.warning(request, _('Ninguno de los productos sigue disponible.'))
+        return redirect('orders:order_template_list')
+    if order is not None:
+        messages.success(request, _('Pedido #%(id)s creado exitosamente.') % {'id': order.id})
+        return redirect('orders:order_detail', pk=order.pk)
+    messages.success(
+        request, _('%(count)s producto(s) añadidos al carrito.') % {'count': len(resolved.lines)}
+    )
+    return redirect('orders:cart')
+
+
+@login_required
+@require_POST
+def order_reorder(request, pk):
+    """Repite un pedido propio: sus líneas al carrito o a un pedido nuevo (precios actuales)."""
+    order = get_object_or_404(Order, pk=pk, customer=request.user)
+    return _apply_lines(request, order_lines(order), request.POST.get('target', 'cart'))
+
+
+@login_required
+def order_template_list(request):
+    """Plantillas de pedido del cliente"""
+    templates = (
+        OrderTemplate.objects.filter(customer=request.user)
+        .annotate(units=Sum('items__quantity'))
+        .prefetch_related('items')
+    )
+    return render(request, 'orders/order_template_list.html', {'templates': templates})
+
+
+@login_required
+@require_POST
+def order_template_save(request):
+    """Guarda el carrito o un pedido propio (``order_id``) como plantilla con nombre."""
+    name = request.POST.get('name', '').strip()
+    if not name:
+        messages.error(request, _('Indica un nombre para la plantilla.'))
+        return redirect('orders:order_template_list')
+
+    order_id = request.POST.get('order_id', '').strip()
+    if order_id:
+        if not order_id.isdigit():
+            raise Http404
+        lines = order_lines(get_object_or_404(Order, pk=order_id, customer=request.user))
+    else:
+        lines = get_cart(request)
+    if not lines:
+        messages.warning(request, _('No hay productos que guardar.'))
+        return redirect('orders:order_template_list')
+
+    template, resolved = save_template(request.user, name, lines)
+    messages.success(
+        request,
+        _('Plantilla "%(name)s" guardada con %(count)s producto(s).') % {
+            'name': template.name, 'count': len(resolved.lines),
+        }
+    )
+    return redirect('orders:order_template_list')
+
+
+@login_required
+@require_POST
+def order_template_apply(request, pk):
+    template = get_object_or_404(OrderTemplate, pk=pk, customer=request.user)
+    return _apply_lines(request, template_lines(template), request.POST.get('target', 'cart'))
+
+
+@login_required
+@require_POST
+def order_template_delete(request, pk):
+    template = get_object_or_404(OrderTemplate, pk=pk, customer=request.user)
+    template.delete()
+    messages.success(request, _('Plantilla eliminada.'))
+    return redirect('orders:order_template_list')
+
+
+def _order_list_validator(request):
+    """Último cambio y número de pedidos visibles; el año por defecto depende de la fecha."""
+    if is_manager_or_admin(request.user):
+        state = Order.objects.aggregate(last=Max('updated_at'), total=Count('pk'))
+        # La vista agregada muestra nombres de clientes
+        customers = User.objects.filter(orders__isnull=False).aggregate(last=Max('updated_at'))['last']
+    else:
+        state = Order.objects.filter(customer=request.user).aggregate(last=Max('updated_at'), total=Count('pk'))
+        customers = None
+    return [state['last'], state['total'], customers, timezone.localdate()], state['last']
+
+
+def _order_detail_validator(request, pk):
+    """``updated_at`` del pedido y del cliente, último evento y documentos, en una consulta."""
+    qs = Order.objects.filter(pk=pk)
+    if not is_manager_or_admin(request.user):
+        qs = qs.filter(customer=request.user)
+    documents = OrderDocument.objects.filter(order=OuterRef('pk')).order_by().values('order')
+    row = qs.annotate(
+        last_event=Subquery(
+            OrderEvent.objects.filter(order=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+        ),
+        last_document=Subquery(documents.annotate(last=Max('uploaded_at')).values('last')),
+        document_count=Subquery(
+            documents.annotate(n=Count('pk')).values('n'), output_field=IntegerField(),
+        ),
+    ).values('updated_at', 'customer__updated_at', 'eta_start', 'last_event', 'last_document', 'document_count').first()
+    if row is None:
+        return None
+    # "Cancelar" se deshabilita a menos de 24 h del inicio de la entrega
+    row['cancel_window_closed'] = bool(row['eta_start'] and row['eta_start'] - timezone.now() < timedelta(hours=24))
+    last_modified = max(d for d in (row['updated_at'], row['last_event'], row['last_document']) if d)
+    return sorted(row.items()), last_modified
+
+
 @login_required
+@conditional_page(_order_list_validator)
 def order_list(request):
     """
     Vista unificada de pedidos con paginación y filtros.
@@ -480,33 +620,22 @@ def order_list(request):
 
 
 @login_required
+@conditional_page(_order_detail_validator)
 def order_detail(request, pk):
     """
     Detalle de un pedido.
     - Cliente: solo puede ver sus propios pedidos
     - Manager/Super Admin: pueden ver cualquier pedido
     """
-    if is_manager_or_admin(request.user):
-        # Managers y Super Admin pueden ver cualquier pedido
-        order = get_object_or_404(Order.objects.select_related('customer'), pk=pk)
-    else:
-        # Clientes solo pueden ver sus propios pedidos
-        order = get_object_or_404(Order.objects.select_related('customer'), pk=pk, customer=request.user)
-    
-    # Obtener items del pedido con información del producto
-    items = OrderItem.objects.filter(order=order).select_related('product')
-    
-    # Obtener documentos del pedido
-    documents = order.documents.all()
-    
-    # Información del cliente
+    # Managers y Super Admin pueden ver cualquier pedido; clientes solo los suyos
+    is_manager = is_manager_or_admin(request.user)
+    order = load_order_detail(pk, customer=None if is_manager else request.user)
     customer = order.customer
-    
-    # Calcular subtotal (en caso de que haya gastos de envío en el futuro)
-    subtotal = sum(item.line_total for item in items)
+
+    # Subtotal agregado en la consulta del pedido (gastos de envío en el futuro)
+    subtotal = order.items_subtotal
     shipping_cost = 0  # TODO: Implementar gastos de envío si es necesario
-    
-    is_manager = is_manager_or_admin(request.user)
+
     can_cancel_user = False
     cancel_disabled_reason = ''
     if not is_manager:
@@ -522,15 +651,16 @@ def order_detail(request, pk):
 
     context = {
         'order': order,
-        'items': items,
+        'items': order.items.all(),
         'customer': customer,
         'subtotal': subtotal,
         'shipping_cost': shipping_cost,
         'events': order.events.all(),
-        'documents': documents,
+        'documents': order.documents.all(),
         'is_manager': is_manager,
         'can_cancel_user': can_cancel_user,
         'cancel_disabled_reason': cancel_disabled_reason,
+        'can_reorder': order.customer_id == request.user.pk,
     }
     return render(request, 'orders/order_detail.html', context)
 
@@ -559,14 +689,18 @@ def order_cancel(request, pk):
             messages.error(request, _('No puedes cancelar con menos de 24 horas de antelacion.'))
             return redirect('orders:order_detail', pk=order.pk)
 
-    order.status = Order.STATUS_CANCELLED
-    order.save()
-    OrderEvent.objects.create(
-        order=order,
-        status=Order.STATUS_CANCELLED,
-        note=_('Pedido cancelado'),
-        created_by=request.user,
-    )
+    try:
+        # Los admins pueden cancelar desde cualquier estado (incluido entregado)
+        transition(
+            order,
+            Order.STATUS_CANCELLED,
+            user=request.user,
+            note=_('Pedido cancelado'),
+            enforce=not is_admin,
+        )
+    except InvalidTransition as e:
+        messages.error(request, str(e))
+        return redirect('orders:order_detail', pk=order.pk)
     messages.success(request, _('Pedido cancelado correctamente.'))
     return redirect('orders:order_detail', pk=order.pk)
 
@@ -604,56 +738,137 @@ def order_manage_list(request):
     return render(request, 'orders/order_manage_list.html', context)
 
 
+BOARD_STATUSES = [
+    Order.STATUS_NEW,
+    Order.STATUS_CONFIRMED,
+    Order.STATUS_PREPARING,
+    Order.STATUS_OUT_FOR_DELIVERY,
+]
+
+
+@login_required
+def order_board(request):
+    """Tablero de pedidos activos por estado con cambio masivo (Manager/Super Admin)"""
+    if not is_manager_or_admin(request.user):
+        messages.error(request, _('No tienes permiso para acceder a esta página.'))
+        return redirect('orders:order_list')
+
+    orders = (
+        Order.objects.filter(status__in=BOARD_STATUSES)
+        .select_related('customer')
+        .order_by('eta_start', 'created_at')
+    )
+    by_status = {status: [] for status in BOARD_STATUSES}
+    for order in orders:
+        by_status[order.status].append(order)
+
+    labels = dict(Order.STATUS_CHOICES)
+    columns = [
+        {
+            'status': status,
+            'label': labels[status],
+            'orders': by_status[status],
+            'targets': [(t, labels[t]) for t in Order.ALLOWED_TRANSITIONS[status]],
+        }
+        for status in BOARD_STATUSES
+    ]
+    context = {
+        'columns': columns,
+        'form': OrderBulkStatusForm(),
+    }
+    return render(request, 'orders/order_board.html', context)
+
+
+@login_required
+@require_POST
+def order_bulk_status(request):
+    """
+    Cambio de estado masivo. Acepta el formulario del tablero o JSON
+    ({"order_ids": [...], "status": "...", "note": "..."}); en JSON devuelve
+    el resultado por pedido.
+    """
+    is_json = request.content_type == 'application/json'
+    if not is_manager_or_admin(request.user):
+        if is_json:
+            return JsonResponse({'success': False, 'message': 'Forbidden'}, status=403)
+        messages.error(request, _('No tienes permiso para realizar esta acción.'))
+        return redirect('orders:order_list')
+
+    if is_json:
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'success': False, 'message': 'JSON inválido'}, status=400)
+        form = OrderBulkStatusForm(data)
+    else:
+        form = OrderBulkStatusForm(request.POST)
+
+    if not form.is_valid():
+        if is_json:
+            return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+        messages.error(request, _('Selecciona pedidos y un estado válido.'))
+        return redirect('orders:order_board')
+
+    result = bulk_transition(
+        form.cleaned_data['order_ids'],
+        form.cleaned_data['status'],
+        user=request.user,
+        note=form.cleaned_data['note'],
+    )
+
+    if is_json:
+        return JsonResponse({
+            'success': True,
+            'applied': result.applied,
+            'rejected': {str(pk): reason for pk, reason in result.rejected.items()},
+        })
+
+    if result.applied:
+        messages.success(request, _('%(count)s pedidos actualizados.') % {'count': len(result.applied)})
+    if result.rejected:
+        messages.warning(request, _('%(count)s pedidos no se pudieron cambiar: %(detail)s') % {
+            'count': len(result.rejected),
+            'detail': ', '.join(f'#{pk} ({reason})' for pk, reason in result.rejected.items()),
+        })
+    return redirect('orders:order_board')
+
+
 @login_required
-@transaction.atomic
 def order_update_status(request, pk):
     """Actualizar estado de un pedido (Manager/Super Admin)"""
     if not is_manager_or_admin(request.user):
         messages.error(request, _('No tienes permiso para realizar esta acción.'))
         return redirect('orders:order_list')
     
-    order = get_object_or_404(Order, pk=pk)
+    order = get_object_or_404(Order.objects.select_related('customer'), pk=pk)
     
     if request.method == 'POST':
-        form = OrderStatusUpdateForm(request.POST)
+        form = OrderStatusUpdateForm(request.POST, order=order)
         if form.is_valid():
-            new_status = form.cleaned_data['status']
-            note = form.cleaned_data['note']
-            
-            # Descontar stock si pasa a "Preparando" por primera vez
-            if new_status == Order.STATUS_PREPARING and not order.stock_deducted:
-                for item in order.items.all():
-                    product = item.product
-                    if product.stock_available >= item.quantity:
-                        product.stock_available -= item.quantity
-                        product.save()
-                    else:
-                        messages.warning(
-                            request,
-                            _('Stock insuficiente para %(product)s. Stock disponible: %(stock)s, requerido: %(qty)s') % {
-                                'product': product.name_es,
-                                'stock': product.stock_available,
-                                'qty': item.quantity
-                            }
-                        )
-                order.stock_deducted = True
-            
-            # Actualizar estado del pedido
-            order.status = new_status
-            order.save()
-            
-            # Registrar evento
-            OrderEvent.objects.create(
-                order=order,
-                status=new_status,
-                note=note,
-                created_by=request.user
-            )
-            
+            try:
+                shortages = transition(
+                    order,
+                    form.cleaned_data['status'],
+                    user=request.user,
+                    note=form.cleaned_data['note'],
+                )
+            except InvalidTransition as e:
+                messages.error(request, str(e))
+                return redirect('orders:order_update_status', pk=order.pk)
+
+            for shortage in shortages:
+                messages.warning(
+                    request,
+                    _('Stock insuficiente para %(product)s. Stock disponible: %(stock)s, requerido: %(qty)s') % {
+                        'product': shortage['product'].name_es,
+                        'stock': shortage['stock'],
+                        'qty': shortage['qty']
+                    }
+                )
             messages.success(request, _('Estado del pedido actualizado exitosamente.'))
             return redirect('orders:order_detail', pk=order.pk)
     else:
-        form = OrderStatusUpdateForm(initial={'status': order.status})
+        form = OrderStatusUpdateForm(order=order)
     
     context = {
         'form': form,
@@ -718,12 +933,9 @@ def order_dashboard(request):
     # Pedidos recientes
     recent_orders = Order.objects.select_related('customer').order_by('-created_at')[:10]
     
-    # Productos con bajo stock
-    from catalog.models import Product
-    low_stock_products = Product.objects.filter(
-        stock_status__in=[Product.STOCK_LOW, Product.STOCK_OUT],
-        is_active=True
-    )[:10]
+    # Productos con bajo stock (lista cacheada, ver catalog/alerts.py)
+    from catalog.alerts import get_low_stock_products
+    low_stock_products = get_low_stock_products()
     
     context = {
         'total_orders': total_orders,
@@ -4,6 +4,8 @@ from django.utils.text import slugify
 from simple_history.models import HistoricalRecords
 import uuid
 
+from core.bulk import get_bulk_state
+
 
 class Company(models.Model):
     """Modelo de empresa para multitenancy"""
@@ -78,7 +80,18 @@ class Company(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        bulk = get_bulk_state()
+        if bulk is None:
+            super().save(*args, **kwargs)
+            return
+        # Modo bulk: el histórico se crea al salir con bulk_history_create
+        created = self._state.adding
+        self.skip_history_when_saving = True
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            del self.skip_history_when_saving
+        bulk.record_company(self.pk, created)
 
 
 class UserCompany(models.Model):
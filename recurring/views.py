@@ -9,6 +9,7 @@ from datetime import timedelta
 from .models import RecurringOrder, RecurringOrderItem
 from .forms import RecurringOrderForm
 from catalog.models import Product
+from orders.services.cart import cart_for
 from orders.views import get_cart
 
 
@@ -63,8 +64,7 @@ def recurring_order_create(request):
                     continue
             
             # Limpiar carrito
-            request.session['cart'] = {}
-            request.session.modified = True
+            cart_for(request).clear()
             
             messages.success(request, _('Pedido recurrente creado exitosamente.'))
             return redirect('recurring:recurring_order_detail', pk=recurring_order.pk)
@@ -3,11 +3,20 @@ Servicio para enviar mensajes a través de WhatsApp Business Cloud API (Meta)
 """
 import os
 import logging
-import requests
 from typing import Optional, Dict
 
+from core import metrics
+from core.lazy import lazy_module
+
 logger = logging.getLogger(__name__)
 
+requests = lazy_module('requests')
+
+MESSAGES_TOTAL = metrics.counter(
+    'fenix_whatsapp_messages_total', 'Mensajes enviados a WhatsApp Cloud API', ['result'],
+)
+SEND_SECONDS = metrics.histogram('fenix_whatsapp_send_seconds', 'Duración de las llamadas a WhatsApp Cloud API')
+
 # Configuración desde variables de entorno
 WHATSAPP_PHONE_NUMBER_ID = os.getenv('WHATSAPP_PHONE_NUMBER_ID', '')
 WHATSAPP_ACCESS_TOKEN = os.getenv('WHATSAPP_ACCESS_TOKEN', '')
@@ -74,16 +83,18 @@ def send_whatsapp_message(text: str, recipient: Optional[str] = None) -> Dict[st
     
     try:
         # Enviar request con timeout
-        response = requests.post(
-            url,
-            json=payload,
-            headers=headers,
-            timeout=10  # 10 segundos de timeout
-        )
+        with SEND_SECONDS.time():
+            response = requests.post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=10  # 10 segundos de timeout
+            )
         
         # Verificar respuesta
         if response.status_code == 200:
             response_data = response.json()
+            MESSAGES_TOTAL.inc(result='ok')
             logger.info(f"Mensaje WhatsApp enviado exitosamente a {target}")
             return {
                 'success': True,
@@ -92,6 +103,7 @@ def send_whatsapp_message(text: str, recipient: Optional[str] = None) -> Dict[st
             }
         else:
             error_msg = f"Error al enviar mensaje: {response.status_code} - {response.text}"
+            MESSAGES_TOTAL.inc(result='http_error')
             logger.error(error_msg)
             return {
                 'success': False,
@@ -100,16 +112,19 @@ def send_whatsapp_message(text: str, recipient: Optional[str] = None) -> Dict[st
             }
     
     except requests.exceptions.Timeout:
+        MESSAGES_TOTAL.inc(result='timeout')
         error_msg = "Timeout al conectar con WhatsApp API"
         logger.error(error_msg)
         return {'success': False, 'error': 'Timeout al enviar mensaje'}
     
     except requests.exceptions.RequestException as e:
+        MESSAGES_TOTAL.inc(result='connection_error')
         error_msg = f"Error de conexión: {str(e)}"
         logger.error(error_msg)
         return {'success': False, 'error': 'Error de conexión con WhatsApp API'}
     
     except Exception as e:
+        MESSAGES_TOTAL.inc(result='error')
         error_msg = f"Error inesperado: {str(e)}"
         logger.error(error_msg, exc_info=True)
         return {'success': False, 'error': 'Error inesperado al enviar mensaje'}
@@ -8,12 +8,14 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
+from core.ratelimit import ratelimit
 from .services import send_whatsapp_message
 
 logger = logging.getLogger(__name__)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(ratelimit('whatsapp', keys={'ip': 'ip'}), name='post')
 class SendWhatsAppMessageView(View):
     """
     Endpoint para enviar mensajes de WhatsApp desde el frontend público.